@@ -0,0 +1,154 @@
+"""
+Generates the Absences Report (see "Absences Report/src/Absences.java") directly from a section's attendance,
+without exporting an absences.csv by hand and running the Java program.
+Each report date is read one at a time and diffed against the roster, so the absences are streamed row by row
+and the date-by-student matrix is never built. Two files are written, in exactly the formats the Java program uses:
+- <section> - absences.csv: the Java program's input, one "DATE,NAME,NAME,..." row per date listing who was absent
+- <section> - absences_report.txt: the Java program's output, each student's absences and when they reached three
+
+From the command line (run from the directory that contains rosters/ and reports/):
+    python absences_report.py "CS 1336.001 - MW 10am"
+    python absences_report.py --from-csv "../Absences Report/absences.csv"
+"""
+# Import modules from the standard library
+import argparse
+import os
+import re
+from typing import Iterable, Iterator
+
+# Import functions from local modules
+from storage import get_storage, set_storage_backend, ROSTER_DIR, DATABASE_PATH
+
+# Number of absences the report lists students by the date they reached
+ABSENCE_LIMIT = 3
+
+# Line that separates the dates in the report
+SEPARATOR = "----------------------------------------------------"
+
+class AbsencesReport:
+    """
+    Collects absences one date at a time and writes them in the Absences Report format.
+    Only each student's list of absent dates is kept, and the ordering follows Absences.java exactly:
+    students by number of absences (most first) and then by name, and dates in the order they were added,
+    with the "reached 3 or more absences" groups in string order of their dates, as the Java TreeMap sorts them.
+    Names and dates are compared by UTF-16 code unit, like Java's String.compareTo.
+    """
+
+    def __init__(self) -> None:
+        self.absences = {}  # Student name -> dates absent, in the order they were added
+
+    def add(self, date: str, names: Iterable[str]) -> None:
+        """Records every named student as absent on the date."""
+        for name in names:
+            self.absences.setdefault(name, []).append(date)
+
+    def lines(self) -> Iterator[str]:
+        """Yields the lines of the report, each ending with a newline."""
+        students = sorted(self.absences, key=lambda name: (-len(self.absences[name]), java_order(name)))
+        for name in students:
+            # ArrayList.toString() with every square bracket removed, as Absences.java does
+            dates = re.sub(r"[\[\]]", "", ", ".join(self.absences[name]))
+            yield f"{name} ({len(self.absences[name])}): {dates}\n"
+
+        reached = {}
+        for name in students:
+            if len(self.absences[name]) >= ABSENCE_LIMIT:
+                reached.setdefault(self.absences[name][ABSENCE_LIMIT - 1], []).append(name)
+
+        yield "\n"
+        for date in sorted(reached, key=java_order):
+            yield SEPARATOR + "\n"
+            yield f"Students who reached {ABSENCE_LIMIT} or more absences as of {date}:\n"
+            for name in reached[date]:
+                yield name + "\n"
+        yield SEPARATOR + "\n"
+
+    def write(self, output_path: str) -> None:
+        """Writes the report to output_path."""
+        with open(output_path, "w", newline="") as file:
+            file.writelines(self.lines())
+
+# Function to sort strings the way Java does
+def java_order(value: str) -> bytes:
+    """Returns a sort key that orders strings by UTF-16 code unit, like Java's String.compareTo."""
+    return value.encode("utf-16-be", "surrogatepass")
+
+# Function to write a name the way the Java program can read it
+def java_name(name: str) -> str:
+    """
+    Absences.java splits every row on commas, so a "Last, First" roster name is written as "First Last".
+    Any other commas are replaced with spaces.
+    """
+    if name.count(", ") == 1:
+        last_name, first_name = name.split(", ")
+        name = f"{first_name} {last_name}"
+    return name.replace(",", " ")
+
+# Function to find who was absent on each date
+def absence_rows(section: str, java_names: bool = True) -> Iterator[tuple[str, list[str]]]:
+    """
+    Yields (date, students absent) for each of the section's reports, oldest first,
+    diffing each report against the roster. Absent students are listed in roster order.
+    """
+    storage = get_storage()
+    roster = storage.read_roster(section)
+    for date, names in storage.read_reports(section).items():
+        attended = set(names or [])
+        absent = [name for name in roster if name not in attended]
+        yield date, [java_name(name) for name in absent] if java_names else absent
+
+# Function to read an absences.csv file
+def read_absences_csv(input_path: str) -> Iterator[tuple[str, list[str]]]:
+    """Yields (date, students absent) for each row of an absences.csv file, split the same way Absences.java splits it."""
+    with open(input_path, "r") as file:
+        for line in file:
+            # Java's \s only matches ASCII whitespace, so e.g. a non-breaking space next to a comma is kept in the name
+            cells = re.split(r"\s*,\s*", line.rstrip("\r\n"), flags=re.ASCII)
+            # Java's String.split drops trailing empty strings
+            while len(cells) > 1 and cells[-1] == "":
+                cells.pop()
+            yield cells[0], cells[1:]
+
+# Function to write the absences report files for a section
+def write_absences_report(rows: Iterable[tuple[str, list[str]]], csv_path: str = None, report_path: str = None) -> int:
+    """
+    Streams the rows to csv_path (in the absences.csv format) as they are produced, and writes the report to report_path.
+    Either path may be None to skip that file. Returns the number of rows.
+    """
+    report = AbsencesReport()
+    count = 0
+    csv_file = open(csv_path, "w", newline="") if csv_path else None
+    try:
+        for date, names in rows:
+            if csv_file:
+                csv_file.write(",".join([date] + names) + "\n")
+            report.add(date, names)
+            count += 1
+    finally:
+        if csv_file:
+            csv_file.close()
+    if report_path:
+        report.write(report_path)
+    return count
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate the Absences Report for a section, or from an existing absences.csv file.")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("section", nargs="?", help="name of the section, as in rosters/<section>.txt")
+    source.add_argument("--from-csv", help="read the absences from this absences.csv file instead of a section's reports")
+    parser.add_argument("--output-dir", default=".", help="directory to write the files to (defaults to the current directory)")
+    parser.add_argument("--roster-names", action="store_true", help="keep the roster's \"Last, First\" names in the report (the absences.csv file can then not be read by the Java program)")
+    parser.add_argument("--storage", choices=["text", "sqlite"], default="text", help="where the rosters and reports are kept (defaults to the rosters/ and reports/ text files)")
+    parser.add_argument("--database", default=DATABASE_PATH, help="database file for --storage sqlite (defaults to attendance.db)")
+    args = parser.parse_args()
+    set_storage_backend(args.storage, ROSTER_DIR, args.database)
+    os.makedirs(args.output_dir, exist_ok=True)
+
+    if args.from_csv:
+        rows = write_absences_report(read_absences_csv(args.from_csv), None, os.path.join(args.output_dir, "absences_report.txt"))
+        print(f"Read {rows} rows from {args.from_csv} and wrote {os.path.join(args.output_dir, 'absences_report.txt')}")
+    else:
+        csv_path = os.path.join(args.output_dir, f"{args.section} - absences.csv")
+        report_path = os.path.join(args.output_dir, f"{args.section} - absences_report.txt")
+        rows = write_absences_report(absence_rows(args.section, java_names=not args.roster_names), None if args.roster_names else csv_path, report_path)
+        print(f"Wrote {rows} dates of absences to {report_path}" + ("" if args.roster_names else f" and {csv_path}"))
@@ -0,0 +1,35 @@
+# Import modules from the standard library
+import os
+import threading
+
+# Function to replace a file's contents atomically
+def atomic_write(path: str, data) -> None:
+    """
+    Writes data (str or bytes) to a temporary file next to path, flushes it to disk, and renames it over path,
+    so a crash leaves either the old file or the new one, never a truncated one.
+    The temporary file's name starts with a dot and ends in .tmp, so it is never mistaken for a report.
+    """
+    directory, name = os.path.split(path)
+    temp_path = os.path.join(directory, f".{name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        with open(temp_path, "wb" if isinstance(data, bytes) else "w") as file:
+            file.write(data)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+    sync_directory(directory)
+
+# Function to flush a directory's entries to disk
+def sync_directory(directory: str) -> None:
+    """Flushes a rename or new file in the directory to disk. Directories cannot be opened for this on Windows, where it is skipped."""
+    if os.name != "posix":
+        return
+    descriptor = os.open(directory or ".", os.O_RDONLY)
+    try:
+        os.fsync(descriptor)
+    finally:
+        os.close(descriptor)
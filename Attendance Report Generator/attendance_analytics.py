@@ -0,0 +1,201 @@
+"""
+Attendance trends across every section at once: turnout on each date, each student's overall and recent attendance rate,
+streaks of consecutive absences, and the students at risk (by default, three or more absences, like the Absences Report).
+Every section is loaded into one date-by-student matrix, so all of the statistics are computed together in a single pass.
+
+From the command line (run from the directory that contains rosters/ and reports/):
+    python attendance_analytics.py --output-dir analytics
+    python attendance_analytics.py --format json --window 6 --sections "CS 1436.001" "CS 1436.003"
+"""
+# Import modules from the standard library
+import argparse
+import csv
+import json
+import os
+import time
+
+# Import modules that are in requirements.txt
+import numpy as np
+
+# Import functions from local modules
+from frequency_report import read_attendance_reports
+from report_catalog import report_key, UNDATED_KEY
+from storage import get_storage, set_storage_backend, ROSTER_DIR, DATABASE_PATH
+
+# Number of a section's most recent meetings used for the rolling attendance rates
+ROLLING_WINDOW = 4
+
+# A student with at least this many absences is at risk, and the date they reached it is reported
+AT_RISK_ABSENCES = 3
+
+# A student who has missed at least this many of their section's latest meetings in a row is at risk
+AT_RISK_STREAK = 2
+
+class AttendanceMatrix:
+    """
+    The attendance of every section in one matrix, with a row per date (oldest first) and a column per student.
+    Each section's students are contiguous columns in roster order, and column_section gives the section of every column.
+    held says which sections met on each date (a section only has a report for the dates it met),
+    so a student is only counted as absent on the dates their own section met.
+    """
+
+    def __init__(self, dates: list[str], sections: list[str], students: list[str], column_section: np.ndarray, attended: np.ndarray, held: np.ndarray) -> None:
+        self.dates = dates
+        self.sections = sections
+        self.students = students
+        self.column_section = column_section
+        self.attended = attended
+        self.held = held
+
+    def held_by_student(self) -> np.ndarray:
+        """Returns a date-by-student matrix of whether each student's section met on each date."""
+        return self.held[:, self.column_section]
+
+# Function to load every section into one matrix
+def load_attendance_matrix(sections: list[str] = None) -> AttendanceMatrix:
+    """
+    Reads every section's roster and reports (or just the given sections') into one AttendanceMatrix.
+    Students who attended but are not on their section's roster, and reports not named by a date, are left out.
+    """
+    storage = get_storage()
+    sections = sorted(storage.list_sections()) if sections is None else sections
+    rosters = {section: storage.read_roster(section) for section in sections}
+    sections = [section for section in sections if rosters[section]]
+    reports = {section: read_attendance_reports(section) for section in sections}
+
+    dates = sorted({date for section_reports in reports.values() for date in section_reports if report_key(date) != UNDATED_KEY}, key=report_key)
+    date_row = {date: row for row, date in enumerate(dates)}
+    students = [name for section in sections for name in rosters[section]]
+    column_section = np.repeat(np.arange(len(sections)), [len(rosters[section]) for section in sections])
+    attended = np.zeros((len(dates), len(students)), dtype=bool)
+    held = np.zeros((len(dates), len(sections)), dtype=bool)
+
+    offset = 0
+    for section_number, section in enumerate(sections):
+        column = {name: offset + i for i, name in enumerate(rosters[section])}
+        for date, names in reports[section].items():
+            if date in date_row:
+                held[date_row[date], section_number] = True
+                attended[date_row[date], [column[name] for name in names if name in column]] = True
+        offset += len(rosters[section])
+    return AttendanceMatrix(dates, sections, students, column_section, attended, held)
+
+# Function to compute every statistic from the matrix
+def compute_analytics(matrix: AttendanceMatrix, window: int = ROLLING_WINDOW) -> dict[str, list[dict]]:
+    """
+    Returns the statistics as lists of rows, ready to be written as CSV or JSON:
+    - turnout: for each section and date it met, the number and share of its students present, and the share over its last window meetings
+    - students: for each student, their meetings, attendance, absences, overall and last-window attendance rate,
+      current and longest streak of absences, the date they reached AT_RISK_ABSENCES absences, and whether they are at risk
+    - at_risk: the students who are at risk, most absences first
+    """
+    held = matrix.held_by_student()
+    present = matrix.attended & held
+    absent = held & ~matrix.attended
+
+    # Overall and rolling rates per student: the last window meetings are the ones whose running count of meetings is within window of the total
+    meetings = held.sum(axis=0)
+    attended = present.sum(axis=0)
+    absences = absent.sum(axis=0)
+    recent = held & (np.cumsum(held, axis=0) > meetings - window)
+    rate = attended / np.maximum(meetings, 1)
+    rolling_rate = (present & recent).sum(axis=0) / np.maximum(recent.sum(axis=0), 1)
+
+    # Streaks of absences, one date at a time for every student at once: an absence extends a streak, attending ends it,
+    # and a date the student's section did not meet leaves it alone
+    current_streak = np.zeros(len(matrix.students), dtype=np.int64)
+    longest_streak = np.zeros(len(matrix.students), dtype=np.int64)
+    for row in range(len(matrix.dates)):
+        current_streak = np.where(absent[row], current_streak + 1, np.where(held[row], 0, current_streak))
+        np.maximum(longest_streak, current_streak, out=longest_streak)
+
+    # The date each student reached AT_RISK_ABSENCES absences, if they have
+    reached = np.cumsum(absent, axis=0) >= AT_RISK_ABSENCES
+    reached_any = reached.any(axis=0)
+    reached_row = reached.argmax(axis=0)
+    at_risk = reached_any | (current_streak >= AT_RISK_STREAK)
+
+    student_rows = []
+    for column, name in enumerate(matrix.students):
+        student_rows.append({
+            "section": matrix.sections[matrix.column_section[column]],
+            "student": name,
+            "meetings": int(meetings[column]),
+            "attended": int(attended[column]),
+            "absences": int(absences[column]),
+            "attendance_rate": round(float(rate[column]), 4),
+            "rolling_rate": round(float(rolling_rate[column]), 4),
+            "current_absence_streak": int(current_streak[column]),
+            "longest_absence_streak": int(longest_streak[column]),
+            "reached_absence_limit": matrix.dates[reached_row[column]] if reached_any[column] else "",
+            "at_risk": bool(at_risk[column]),
+        })
+
+    # Turnout per section and date: the students present are summed over each section's (contiguous) columns
+    enrolled = np.bincount(matrix.column_section, minlength=len(matrix.sections))
+    starts = np.concatenate([[0], np.cumsum(enrolled)[:-1]])
+    present_by_section = np.add.reduceat(present, starts, axis=1) if matrix.students else np.zeros(matrix.held.shape, dtype=np.int64)
+    turnout = present_by_section / np.maximum(enrolled, 1)
+
+    turnout_rows = []
+    for section_number, section in enumerate(matrix.sections):
+        rows = np.flatnonzero(matrix.held[:, section_number])
+        section_turnout = turnout[rows, section_number]
+        # Rolling turnout over the section's own meetings, as a difference of running sums
+        running = np.concatenate([[0], np.cumsum(section_turnout)])
+        counts = np.minimum(np.arange(1, rows.size + 1), window)
+        rolling = (running[1:] - running[np.maximum(np.arange(1, rows.size + 1) - window, 0)]) / counts
+        for i, row in enumerate(rows):
+            turnout_rows.append({
+                "section": section,
+                "date": matrix.dates[row],
+                "present": int(present_by_section[row, section_number]),
+                "enrolled": int(enrolled[section_number]),
+                "turnout": round(float(section_turnout[i]), 4),
+                "rolling_turnout": round(float(rolling[i]), 4),
+            })
+
+    at_risk_rows = sorted((row for row in student_rows if row["at_risk"]), key=lambda row: (-row["absences"], row["section"], row["student"]))
+    return {"turnout": turnout_rows, "students": student_rows, "at_risk": at_risk_rows}
+
+# Function to write the statistics to files
+def write_analytics(analytics: dict[str, list[dict]], output_dir: str, output_format: str = "csv") -> list[str]:
+    """Writes turnout.csv, students.csv, and at_risk.csv to output_dir, or a single analytics.json, and returns the paths written."""
+    os.makedirs(output_dir, exist_ok=True)
+    if output_format == "json":
+        path = os.path.join(output_dir, "analytics.json")
+        with open(path, "w") as file:
+            json.dump(analytics, file, indent=1)
+        return [path]
+
+    paths = []
+    for name, rows in analytics.items():
+        path = os.path.join(output_dir, f"{name}.csv")
+        with open(path, "w", newline="") as file:
+            fields = list(rows[0]) if rows else []
+            writer = csv.DictWriter(file, fieldnames=fields)
+            writer.writeheader()
+            writer.writerows(rows)
+        paths.append(path)
+    return paths
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compute attendance trends for every section and write them as CSV or JSON.")
+    parser.add_argument("--sections", nargs="+", help="only include these sections (defaults to every section with a roster)")
+    parser.add_argument("--output-dir", default="analytics", help="directory to write the results to (defaults to analytics)")
+    parser.add_argument("--format", choices=["csv", "json"], default="csv", help="write three CSV files or a single JSON file (defaults to csv)")
+    parser.add_argument("--window", type=int, default=ROLLING_WINDOW, help=f"number of recent meetings in the rolling rates (defaults to {ROLLING_WINDOW})")
+    parser.add_argument("--storage", choices=["text", "sqlite"], default="text", help="where the rosters and reports are kept (defaults to the rosters/ and reports/ text files)")
+    parser.add_argument("--database", default=DATABASE_PATH, help="database file for --storage sqlite (defaults to attendance.db)")
+    args = parser.parse_args()
+    set_storage_backend(args.storage, ROSTER_DIR, args.database)
+
+    start = time.perf_counter()
+    matrix = load_attendance_matrix(args.sections)
+    loaded = time.perf_counter()
+    analytics = compute_analytics(matrix, args.window)
+    computed = time.perf_counter()
+    paths = write_analytics(analytics, args.output_dir, args.format)
+    print(f"{len(matrix.sections)} sections, {len(matrix.students)} students, {len(matrix.dates)} dates: "
+          f"loaded in {(loaded - start) * 1000:.0f} ms, computed in {(computed - loaded) * 1000:.0f} ms, written in {(time.perf_counter() - computed) * 1000:.0f} ms")
+    print(f"{len(analytics['at_risk'])} students at risk. Wrote {', '.join(paths)}")
@@ -1,11 +1,26 @@
 # Import modules from the standard library
 import tkinter as tk
 from tkinter import ttk, messagebox
-import os
 import datetime
 
+# Import functions from local modules
+from attendance_set import AttendanceSet
+from report_catalog import in_range, paginate, range_dates, report_key, REPORT_RANGES
+from report_writer import save_report_later, pending_reports
+from storage import get_storage
+
+# Entries at the ends of the report dropdown that move to the previous and next page of reports
+NEWER_REPORTS = "\u25B2 Newer reports..."
+OLDER_REPORTS = "\u25BC Older reports..."
+
+# The section, range, and page of reports each report dropdown is showing (keyed by the dropdown's Tk path)
+report_views = {}
+
+# The attendance set each attendance listbox is showing, and the listener keeping it in step (keyed by the listbox's Tk path)
+listbox_bindings = {}
+
 # Function to save attendance report
-def save_attendance(section_var: tk.StringVar, date_entry: tk.Entry, attendance_reports: dict[str, list[str]], attendance_listbox: tk.Listbox) -> None:
+def save_attendance(section_var: tk.StringVar, date_entry: tk.Entry, attendance_reports: dict[str, AttendanceSet], attendance_listbox: tk.Listbox) -> None:
     """Function to save attendance report"""
     section = section_var.get()
     if not section or section == "Select a section...":  # Check if no section is selected
@@ -30,73 +45,93 @@ def save_attendance(section_var: tk.StringVar, date_entry: tk.Entry, attendance_
         return
     
     if messagebox.askyesno("Confirm", f"Are you sure you want to save the attendance report for {section} on {date}?"):
-        report_filename = f"reports/{section}/{date}.txt"
-        
-        if not os.path.exists(f"reports/{section}"):
-            os.makedirs(f"reports/{section}")
-        
-        with open(report_filename, 'w') as file:
-            for name in attendance_reports[section]:
-                file.write(name + '\n')
+        # Journal the report and hand it to the background writer, which saves it through the storage backend
+        # (keeping the attendance store and report catalog, or the database, in step) without blocking the window
+        save_report_later(section, date, list(attendance_reports[section]))
         
         # Clear list after saving
-        attendance_reports[section] = []
+        attendance_reports[section].clear()
         update_attendance_listbox(section_var, attendance_listbox, attendance_reports)
 
 # Function to update attendance listbox
-def update_attendance_listbox(section_var: tk.StringVar, attendance_listbox: tk.Listbox, attendance_reports: dict[str, list[str]]) -> None:
-    """Updates the attendance listbox with the names of students in the current section."""
-    section = section_var.get()
-    attendance_listbox.delete(0, tk.END)
-    for name in attendance_reports[section]:
+def update_attendance_listbox(section_var: tk.StringVar, attendance_listbox: tk.Listbox, attendance_reports: dict[str, AttendanceSet]) -> None:
+    """
+    Shows the attendance of the current section in the listbox.
+    The listbox is only redrawn when it switches to a different section's attendance; from then on it subscribes to
+    that section's changes, so each add or remove updates a single row.
+    """
+    attendance_set = attendance_reports[section_var.get()]
+    binding = listbox_bindings.get(str(attendance_listbox))
+    if binding is not None and binding[0] is attendance_set:
+        return
+    if binding is not None:
+        binding[0].unsubscribe(binding[1])
+
+    def listener(event: str, name: str, row: int) -> None:
+        apply_attendance_change(attendance_listbox, attendance_set, event, name, row)
+    attendance_set.subscribe(listener)
+    listbox_bindings[str(attendance_listbox)] = (attendance_set, listener)
+    apply_attendance_change(attendance_listbox, attendance_set, "reset", None, None)
+
+# Function to apply a change in an attendance set to the listbox showing it
+def apply_attendance_change(attendance_listbox: tk.Listbox, attendance_set: AttendanceSet, event: str, name: str, row: int) -> None:
+    """Inserts or deletes the single row that changed, or redraws the listbox if the whole set was replaced."""
+    if event == "add":
         attendance_listbox.insert(tk.END, name)
+    elif event == "remove":
+        if row is None or attendance_listbox.get(row) != name:
+            row = attendance_listbox.get(0, tk.END).index(name)
+        attendance_listbox.delete(row)
+    else:
+        attendance_listbox.delete(0, tk.END)
+        if len(attendance_set):
+            attendance_listbox.insert(tk.END, *attendance_set)
 
 # Function to remove selected student from attendance list
-def remove_from_attendance(section_var: tk.StringVar, attendance_listbox: tk.Listbox, attendance_reports: dict[str, list[str]]) -> None:
+def remove_from_attendance(section_var: tk.StringVar, attendance_listbox: tk.Listbox, attendance_reports: dict[str, AttendanceSet]) -> None:
     """Removes the selected student from the attendance list."""
     section = section_var.get()
     selected_name = attendance_listbox.get(tk.ACTIVE)
-    if selected_name in attendance_reports[section]:
-        attendance_reports[section].remove(selected_name)
+    # If the listbox is showing this section, the removal deletes just the selected row, otherwise the listbox is redrawn
+    if attendance_reports[section].remove(selected_name, attendance_listbox.index(tk.ACTIVE)):
         update_attendance_listbox(section_var, attendance_listbox, attendance_reports)
 
 # Add button to submit the attendance
-def add_to_attendance(section_var: tk.StringVar, suggestion_listbox: tk.Listbox, attendance_listbox: tk.Listbox, attendance_reports: dict[str, list[str]]) -> None:
+def add_to_attendance(section_var: tk.StringVar, suggestion_listbox: tk.Listbox, attendance_listbox: tk.Listbox, attendance_reports: dict[str, AttendanceSet]) -> None:
     """Adds the selected student to the attendance list."""
     section = section_var.get()
     name = suggestion_listbox.get(tk.ACTIVE)
-    if name and name not in attendance_reports[section]:
-        attendance_reports[section].append(name)
+    # If the listbox is showing this section, the name is inserted as a single row, otherwise the listbox is redrawn
+    if name and attendance_reports[section].add(name):
         update_attendance_listbox(section_var, attendance_listbox, attendance_reports)
     
     attendance_listbox.see(tk.END)
 
 # Function to load attendance reports for a specific section
-def load_reports_for_section(section: str) -> list[str]:
-    """Loads previously saved attendance reports for a specific section."""
-    reports = []
-    section_path = f"reports/{section}"
-    
-    if os.path.exists(section_path):
-        for filename in os.listdir(section_path):
-            if filename.endswith(".txt"):
-                reports.append(filename.replace(".txt", ""))  # Remove file extension for display
-    
-    return reports
+def load_reports_for_section(section: str, report_range: str = REPORT_RANGES[0]) -> list[str]:
+    """Loads previously saved attendance reports for a specific section (optionally only those in one of REPORT_RANGES), newest first."""
+    start_date, end_date = range_dates(report_range, datetime.date.today())
+    dates = get_storage().report_dates(section, start_date, end_date)
+    # Include any reports that were just saved but are still waiting to be written, without waiting for the writer thread
+    waiting = [date for date in pending_reports(section) if in_range(date, start_date, end_date) and date not in dates]
+    if waiting:
+        dates = sorted(dates + waiting, key=lambda date: (report_key(date), date))
+    return dates[::-1]
 
 # Function to load attendance from a specific report
-def load_attendance_for_report(section_var: tk.StringVar, report_date: str, attendance_listbox: tk.Listbox, attendance_reports: dict[str, list[str]]) -> None:
-    """Loads attendance from a saved report file into the listbox."""
+def load_attendance_for_report(section_var: tk.StringVar, report_date: str, attendance_listbox: tk.Listbox, attendance_reports: dict[str, AttendanceSet]) -> None:
+    """Loads attendance from a saved report into the listbox."""
     section = section_var.get()
-    report_filename = f"reports/{section}/{report_date}.txt"
+    # A report that was just saved may still be waiting to be written, and is newer than the one in storage
+    waiting = pending_reports(section)
+    attendees = waiting[report_date] if report_date in waiting else get_storage().read_report(section, report_date)
     
-    if os.path.exists(report_filename):
-        with open(report_filename, 'r') as file:
-            attendance_reports[section] = [line.strip() for line in file.readlines()]
+    if attendees is not None:
+        attendance_reports[section].replace(attendees)
         update_attendance_listbox(section_var, attendance_listbox, attendance_reports)
 
 # Function to toggle between date entry and report selection dropdown
-def toggle_report_mode(report_mode_var: tk.StringVar, report_mode_label: tk.Label, date_entry: tk.Entry, section_var: tk.StringVar, report_dropdown: ttk.Combobox, existing_reports: list[str], save_button: tk.Button, generate_frequency_report_button: tk.Button) -> None:
+def toggle_report_mode(report_mode_var: tk.StringVar, report_mode_label: tk.Label, date_entry: tk.Entry, section_var: tk.StringVar, report_dropdown: ttk.Combobox, existing_reports: list[str], save_button: tk.Button, generate_frequency_report_button: tk.Button, report_range_dropdown: ttk.Combobox) -> None:
     """Toggles between date entry and report selection dropdown."""
     # Remoev the buttons from the section frame
     save_button.pack_forget()
@@ -105,30 +140,57 @@ def toggle_report_mode(report_mode_var: tk.StringVar, report_mode_label: tk.Labe
     if report_mode_var.get() == "Create New Report":
         report_mode_label.config(text="Enter Date (MM-DD-YYYY)")
         date_entry.pack(pady=4)
+        report_range_dropdown.pack_forget()
         report_dropdown.pack_forget()
     else:
         report_mode_label.config(text="Select Existing Report")
         date_entry.pack_forget()
         update_report_mode_dropdown(report_mode_var, report_dropdown, existing_reports, section_var)
+        report_range_dropdown.pack(pady=3)
         report_dropdown.pack(pady=3)
     
     save_button.pack(pady=15)
     generate_frequency_report_button.pack(pady=10)
 
 # Function to update the report mode dropdown
-def update_report_mode_dropdown(report_mode_var: tk.StringVar, report_dropdown: ttk.Combobox, existing_reports: list[str], section_var: tk.StringVar) -> None:
-    """Updates the report mode dropdown based on the current report mode and section."""
+def update_report_mode_dropdown(report_mode_var: tk.StringVar, report_dropdown: ttk.Combobox, existing_reports: list[str], section_var: tk.StringVar, page: int = None) -> None:
+    """
+    Updates the report mode dropdown based on the current report mode and section.
+    The dropdown shows one page of the section's reports in the selected range, newest first,
+    with entries at either end to move to newer or older reports. Switching sections goes back to the first page.
+    """
     if report_mode_var.get() == 'Modify Existing Report':
         section = section_var.get()
+        view = report_views.setdefault(str(report_dropdown), {"section": section, "range": REPORT_RANGES[0], "page": 0})
+        if page is not None:
+            view["page"] = page
+        elif view["section"] != section:
+            view["page"] = 0
+        view["section"] = section
+
+        # Load one page of reports for the selected section
+        reports, has_newer, has_older = paginate(load_reports_for_section(section, view["range"]), view["page"])
         existing_reports.clear()
-        existing_reports.extend(load_reports_for_section(section))  # Load reports for the selected section
-        report_dropdown['values'] = existing_reports
+        existing_reports.extend(reports)
+        report_dropdown['values'] = ([NEWER_REPORTS] if has_newer else []) + existing_reports + ([OLDER_REPORTS] if has_older else [])
         report_dropdown.set("Select a report..." if existing_reports else "No Reports Available")
 
+# Function to narrow the report dropdown to a range of dates
+def on_report_range_selection(report_range_dropdown: ttk.Combobox, report_mode_var: tk.StringVar, report_dropdown: ttk.Combobox, existing_reports: list[str], section_var: tk.StringVar) -> None:
+    """Shows the first page of reports in the selected range (e.g. this week) in the report dropdown."""
+    view = report_views.setdefault(str(report_dropdown), {"section": section_var.get(), "range": REPORT_RANGES[0], "page": 0})
+    view["range"] = report_range_dropdown.get()
+    update_report_mode_dropdown(report_mode_var, report_dropdown, existing_reports, section_var, page=0)
+
 # Function to load selected report's attendance into the listbox
-def on_report_selection(report_dropdown: ttk.Combobox, existing_reports: list[str], section_var: tk.StringVar, attendance_listbox: tk.Listbox, attendance_reports: dict[str, list[str]], date_entry: tk.Entry) -> None:
-    """Loads the selected report's attendance into the listbox."""
+def on_report_selection(report_dropdown: ttk.Combobox, existing_reports: list[str], section_var: tk.StringVar, attendance_listbox: tk.Listbox, attendance_reports: dict[str, AttendanceSet], date_entry: tk.Entry, report_mode_var: tk.StringVar) -> None:
+    """Loads the selected report's attendance into the listbox, or moves to the next page of reports."""
     selected_report = report_dropdown.get()
+    if selected_report in (NEWER_REPORTS, OLDER_REPORTS):
+        page = report_views[str(report_dropdown)]["page"] + (1 if selected_report == OLDER_REPORTS else -1)
+        update_report_mode_dropdown(report_mode_var, report_dropdown, existing_reports, section_var, page)
+        return
+
     if selected_report and selected_report in existing_reports:
         load_attendance_for_report(section_var, selected_report, attendance_listbox, attendance_reports)
 
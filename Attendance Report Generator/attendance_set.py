@@ -0,0 +1,64 @@
+# Import modules from the standard library
+from typing import Callable, Iterable, Iterator
+
+class AttendanceSet:
+    """
+    The students marked as attending, in the order they were added, with O(1) add, remove, and membership checks
+    (it is backed by a dict, which keeps insertion order).
+    Every change is sent to the subscribed callbacks as (event, name, row):
+    - ("add", name, row): name was appended at row
+    - ("remove", name, row): name was removed from row, or row is None if the caller did not know it
+    - ("reset", None, None): the whole set was replaced or cleared
+    so that a listbox showing the set can insert or delete a single row instead of being redrawn.
+    """
+
+    def __init__(self, names: Iterable[str] = ()) -> None:
+        self.names = dict.fromkeys(names)
+        self.listeners = []
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.names
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.names)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def subscribe(self, listener: Callable[[str, str, int], None]) -> None:
+        """Calls the listener with every change made to the set."""
+        self.listeners.append(listener)
+
+    def unsubscribe(self, listener: Callable[[str, str, int], None]) -> None:
+        """Stops calling the listener, if it was subscribed."""
+        if listener in self.listeners:
+            self.listeners.remove(listener)
+
+    def notify(self, event: str, name: str = None, row: int = None) -> None:
+        for listener in list(self.listeners):
+            listener(event, name, row)
+
+    def add(self, name: str) -> bool:
+        """Adds the name to the end of the set, returning whether it was not already in it."""
+        if name in self.names:
+            return False
+        self.names[name] = None
+        self.notify("add", name, len(self.names) - 1)
+        return True
+
+    def remove(self, name: str, row: int = None) -> bool:
+        """Removes the name, returning whether it was in the set. Pass the name's row if it is known, e.g. from a listbox selection."""
+        if name not in self.names:
+            return False
+        del self.names[name]
+        self.notify("remove", name, row)
+        return True
+
+    def replace(self, names: Iterable[str]) -> None:
+        """Replaces the whole set with the given names, e.g. when a saved report is loaded."""
+        self.names = dict.fromkeys(names)
+        self.notify("reset")
+
+    def clear(self) -> None:
+        """Removes every name."""
+        self.replace(())
@@ -0,0 +1,267 @@
+# Import modules from the standard library
+import argparse
+import io
+import os
+
+# Import modules that are in requirements.txt
+import numpy as np
+
+# Import functions from local modules
+from atomic_file import atomic_write
+
+# Name of the file, inside each section's report directory, that holds the section's attendance
+STORE_FILENAME = "attendance.npz"
+
+# Stores that have already been read, kept until their file changes on disk
+attendance_stores = {}
+
+class AttendanceStore:
+    """
+    All of a section's attendance reports in a single file.
+    Students are indexed by their position in the roster (followed by anyone who attended but is no longer on it),
+    dates are indexed by the order they were first saved, and attendance is a date-by-student boolean matrix.
+    On disk the matrix is packed into bits, so a full semester for a large lecture section is only a few kilobytes.
+    The store also keeps:
+    - orders: the students of each date (as indexes) in the order they were marked, so a report reads back in the order it was saved
+    - tallies: the number of reports each student appears in, updated by the difference whenever a date is set or removed,
+      so a frequency report never recounts the reports
+    - stamps: the (mtime, size) of each date's text report when it was last read or written, to notice edits made outside the app
+    - directory_mtime: the mtime of the section's report directory when the stamps were last compared with the report files
+      (None if they have not been), so they are only compared again once a file has been added, removed, or replaced there
+    """
+
+    def __init__(self, section: str, students: list[str] = None, dates: list[str] = None, attended: np.ndarray = None, tallies: np.ndarray = None, stamps: dict[str, tuple[int, int]] = None, orders: list[list[int]] = None) -> None:
+        self.section = section
+        self.students = list(students or [])
+        self.student_index = {name: i for i, name in enumerate(self.students)}
+        self.dates = list(dates or [])
+        self.date_index = {date: i for i, date in enumerate(self.dates)}
+        self.attended = attended if attended is not None else np.zeros((len(self.dates), len(self.students)), dtype=bool)
+        self.tallies = tallies if tallies is not None else self.attended.sum(axis=0, dtype=np.int64)
+        self.stamps = dict(stamps or {})
+        # Stores written before the order was kept read back in roster order
+        self.orders = orders if orders is not None else [np.flatnonzero(row).tolist() for row in self.attended]
+        self.directory_mtime = None
+
+    def get(self, date: str) -> list[str]:
+        """Returns the students who attended on the date, in the order they were marked, or None if there is no report for the date."""
+        row = self.date_index.get(date)
+        if row is None:
+            return None
+        return [self.students[i] for i in self.orders[row]]
+
+    def set(self, date: str, names: list[str]) -> None:
+        """Records the students who attended on the date, replacing any earlier report for it."""
+        for name in names:
+            if name not in self.student_index:
+                self.student_index[name] = len(self.students)
+                self.students.append(name)
+        if self.attended.shape[1] < len(self.students):
+            self.attended = np.pad(self.attended, ((0, 0), (0, len(self.students) - self.attended.shape[1])))
+            self.tallies = np.pad(self.tallies, (0, len(self.students) - self.tallies.size))
+
+        if date not in self.date_index:
+            self.date_index[date] = len(self.dates)
+            self.dates.append(date)
+            self.attended = np.vstack([self.attended, np.zeros((1, len(self.students)), dtype=bool)])
+            self.orders.append([])
+
+        row = self.attended[self.date_index[date]]
+        order = list(dict.fromkeys(self.student_index[name] for name in names))
+        self.orders[self.date_index[date]] = order
+        new_row = np.zeros(len(self.students), dtype=bool)
+        new_row[order] = True
+        # Add the new attendees to the tallies and subtract the ones that were removed
+        self.tallies += new_row.astype(np.int64) - row
+        row[:] = new_row
+
+    def remove(self, date: str) -> None:
+        """Removes the report for the date, if there is one."""
+        row = self.date_index.pop(date, None)
+        if row is None:
+            return
+        self.tallies -= self.attended[row]
+        self.attended = np.delete(self.attended, row, axis=0)
+        del self.orders[row]
+        del self.dates[row]
+        self.date_index = {date: i for i, date in enumerate(self.dates)}
+        self.stamps.pop(date, None)
+
+    def stamp(self, date: str) -> None:
+        """Records the current mtime and size of the date's text report, after the app has written it."""
+        stat = os.stat(f"reports/{self.section}/{date}.txt")
+        self.stamps[date] = (stat.st_mtime_ns, stat.st_size)
+
+    def frequency(self, dates: list[str] = None) -> dict[str, int]:
+        """Returns the number of reports each student appears in, from the cached tallies unless only some dates are counted."""
+        if dates is None:
+            counts = self.tallies
+        else:
+            counts = self.attended[[self.date_index[date] for date in dates]].sum(axis=0, dtype=np.int64)
+        return {name: int(count) for name, count in zip(self.students, counts)}
+
+    def as_reports(self) -> dict[str, list[str]]:
+        """Returns the reports in the same form as read_attendance_reports: a map from date to the students who attended."""
+        return {date: self.get(date) for date in self.dates}
+
+    def save(self) -> None:
+        """Writes the store to reports/<section>/attendance.npz."""
+        os.makedirs(f"reports/{self.section}", exist_ok=True)
+        path = store_path(self.section)
+        buffer = io.BytesIO()
+        np.savez(buffer,
+                 students=np.array(self.students, dtype=str),
+                 dates=np.array(self.dates, dtype=str),
+                 student_count=np.array(len(self.students)),
+                 attended=np.packbits(self.attended, axis=1),
+                 # Each date's order, one after another; a date's part is as long as its number of attendees
+                 order=np.array([i for order in self.orders for i in order], dtype=np.int64),
+                 tallies=self.tallies,
+                 stamped_dates=np.array(list(self.stamps), dtype=str),
+                 stamps=np.array(list(self.stamps.values()), dtype=np.int64).reshape(-1, 2))
+        # Replaced atomically so a crash never leaves a truncated store
+        atomic_write(path, buffer.getvalue())
+        # Writing the store changes the directory's mtime, and the store is up to date with the directory as it now is
+        self.directory_mtime = os.stat(f"reports/{self.section}").st_mtime_ns
+        attendance_stores[self.section] = (os.stat(path).st_mtime_ns, self)
+
+# Function to get the path of a section's store
+def store_path(section: str) -> str:
+    """Returns the path of the file that holds the section's attendance."""
+    return os.path.join("reports", section, STORE_FILENAME)
+
+# Function to load the attendance store for a section
+def load_attendance_store(section: str) -> AttendanceStore:
+    """
+    Returns the attendance store for the section, reading it from disk only if it has changed since it was last read.
+    If there is no store yet, it is built from the section's text reports.
+    If the report directory has changed since the store was last checked against it (a report file was added, removed, or replaced,
+    as saving a file does in most editors), the report files that were added, edited, or removed by hand are synced into it.
+    A report edited in place leaves the directory's mtime as it was, and is picked up by verify_tallies.
+    """
+    path = store_path(section)
+    if not os.path.exists(path):
+        return import_text_reports(section)
+
+    store_mtime = os.stat(path).st_mtime_ns
+    cached = attendance_stores.get(section)
+    if cached is not None and cached[0] == store_mtime:
+        store = cached[1]
+    else:
+        with np.load(path) as data:
+            students = data["students"].tolist()
+            attended = np.unpackbits(data["attended"], axis=1, count=int(data["student_count"])).astype(bool)
+            stamps = {date: (int(mtime), int(size)) for date, (mtime, size) in zip(data["stamped_dates"].tolist(), data["stamps"])}
+            orders = None
+            if "order" in data.files:
+                orders = [order.tolist() for order in np.split(data["order"], np.cumsum(attended.sum(axis=1))[:-1])]
+            store = AttendanceStore(section, students, data["dates"].tolist(), attended, data["tallies"], stamps, orders)
+        attendance_stores[section] = (store_mtime, store)
+
+    # Comparing every report's stamp takes a stat of every report file, so it is only done once the directory has changed
+    if store.directory_mtime != os.stat(f"reports/{section}").st_mtime_ns:
+        sync_text_reports(store)
+    return store
+
+# Function to bring a store up to date with the text reports
+def sync_text_reports(store: AttendanceStore) -> bool:
+    """
+    Compares the stamp of every text report with the one recorded in the store, using only os.scandir and no file reads,
+    and rereads just the reports that were added or edited outside the app (and drops the ones that were deleted).
+    Returns whether anything changed, in which case the store is saved.
+    """
+    section_path = f"reports/{store.section}"
+    if not os.path.exists(section_path):
+        return False
+
+    # Taken before the directory is listed, so a change made while it is being listed is noticed the next time
+    directory_mtime = os.stat(section_path).st_mtime_ns
+    found = {}
+    with os.scandir(section_path) as entries:
+        for entry in entries:
+            if entry.name.endswith(".txt"):
+                stat = entry.stat()
+                found[os.path.splitext(entry.name)[0]] = (stat.st_mtime_ns, stat.st_size)
+
+    changed = [date for date, stamp in found.items() if store.stamps.get(date) != stamp]
+    removed = [date for date in store.dates if date not in found]
+    for date in changed:
+        with open(f"{section_path}/{date}.txt", "r") as report_file:
+            store.set(date, [line.strip() for line in report_file])
+        store.stamps[date] = found[date]
+    for date in removed:
+        store.remove(date)
+
+    if changed or removed or not os.path.exists(store_path(store.section)):
+        store.save()
+    else:
+        store.directory_mtime = directory_mtime
+    return bool(changed or removed)
+
+# Function to build a store from the text reports
+def import_text_reports(section: str) -> AttendanceStore:
+    """Builds the section's store from its reports/<section>/<date>.txt files and saves it, if the section has any reports."""
+    # Index the students in roster order, so that students who are on the roster keep their position in the matrix
+    students = []
+    if os.path.exists(f"rosters/{section}.txt"):
+        with open(f"rosters/{section}.txt", "r") as roster_file:
+            students = [line.strip() for line in roster_file]
+    store = AttendanceStore(section, students)
+    sync_text_reports(store)
+    return store
+
+# Function to check the cached tallies against a full recount
+def verify_tallies(section: str) -> dict[str, tuple[int, int]]:
+    """
+    Recounts every text report of the section from scratch and compares the result with the store's cached tallies.
+    Returns the students whose counts differ, mapped to (cached count, recounted count).
+    The store is then checked against every report file's stamp, so reports edited in place (which loading the store does not notice)
+    are synced into it and its tallies match again.
+    """
+    store = load_attendance_store(section)
+    recount = {}
+    section_path = f"reports/{section}"
+    if os.path.exists(section_path):
+        for filename in os.listdir(section_path):
+            if filename.endswith(".txt"):
+                with open(f"{section_path}/{filename}", "r") as report_file:
+                    for name in set(line.strip() for line in report_file):
+                        recount[name] = recount.get(name, 0) + 1
+
+    cached = store.frequency()
+    mismatches = {}
+    for name in set(cached) | set(recount):
+        if cached.get(name, 0) != recount.get(name, 0):
+            mismatches[name] = (cached.get(name, 0), recount.get(name, 0))
+    sync_text_reports(store)
+    return mismatches
+
+# Function to write a store back out as text reports
+def export_text_reports(section: str, output_dir: str = None) -> None:
+    """Writes one <date>.txt file per report in the section's store, to reports/<section> unless another directory is given."""
+    store = load_attendance_store(section)
+    output_dir = output_dir or f"reports/{section}"
+    os.makedirs(output_dir, exist_ok=True)
+    for date in store.dates:
+        with open(os.path.join(output_dir, f"{date}.txt"), "w") as file:
+            for name in store.get(date):
+                file.write(name + "\n")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Convert a section's attendance between the text reports and the attendance store.")
+    parser.add_argument("command", choices=["import", "export", "verify"], help="import the text reports into the store, export the store as text reports, or verify its tallies against a full recount")
+    parser.add_argument("section", help="name of the section, as in reports/<section>")
+    parser.add_argument("--output-dir", help="directory to export the text reports to (defaults to reports/<section>)")
+    args = parser.parse_args()
+
+    if args.command == "import":
+        store = import_text_reports(args.section)
+        print(f"Imported {len(store.dates)} reports for {len(store.students)} students into {store_path(args.section)}")
+    elif args.command == "export":
+        export_text_reports(args.section, args.output_dir)
+        print(f"Exported the reports for {args.section}")
+    else:
+        mismatches = verify_tallies(args.section)
+        for name, (cached, recounted) in sorted(mismatches.items()):
+            print(f"{name}: cached {cached}, recounted {recounted}")
+        print("Tallies match a full recount" if not mismatches else f"{len(mismatches)} tallies differed from a full recount; the store has been synced with the report files")
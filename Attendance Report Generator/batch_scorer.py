@@ -0,0 +1,239 @@
+# Import modules from the standard library
+from collections import defaultdict
+
+# Import modules that are in requirements.txt
+import numpy as np
+from fuzzywuzzy import utils
+
+# Number of roster rows whose partial ratio windows are scored together, to keep memory bounded
+PARTIAL_CHUNK_ROWS = 4096
+
+# Same scales that fuzzywuzzy's WRatio applies to the token and partial scores
+UNBASE_SCALE = .95
+PARTIAL_SCALE = .90
+
+class BatchScorer:
+    """
+    Scores a query against a whole roster at once with NumPy instead of one name at a time.
+    The roster is encoded once as padded uint32 code point matrices (the processed names, their sorted tokens and their sorted token sets),
+    and every score is computed from the same vectorized indel distance that python-Levenshtein uses for its ratio.
+    Scorers:
+    - ratio: identical to fuzz.ratio on the processed strings
+    - token_sort_ratio: identical to fuzz.token_sort_ratio
+    - token_set_ratio: identical to fuzz.token_set_ratio
+    - partial_ratio: the best ratio of the shorter string against every window of the longer string,
+      which is never lower than fuzz.partial_ratio and matches it whenever fuzzywuzzy's matching blocks find the best window
+    - wratio: fuzz.WRatio, which is used for ranking suggestions. It is identical for names of similar length to the query;
+      for names at least 1.5 times longer or shorter its partial terms can score higher than fuzzywuzzy's, like partial_ratio,
+      so those names may rank above where fuzzywuzzy puts them (benchmarks/bench_batch_scorer.py reports how often)
+    """
+
+    def __init__(self, names: list[str]) -> None:
+        self.names = names
+        self.processed = [utils.full_process(name, force_ascii=True) for name in names]
+        self.codes, self.lengths = encode(self.processed)
+        sorted_names = [" ".join(sorted(name.split())) for name in self.processed]
+        self.sorted_codes, self.sorted_lengths = encode(sorted_names)
+
+        # A name without repeated tokens has the same sorted token set as sorted tokens, so the matrices are usually shared
+        set_names = [" ".join(sorted(set(name.split()))) for name in self.processed]
+        if set_names == sorted_names:
+            self.set_codes, self.set_lengths = self.sorted_codes, self.sorted_lengths
+        else:
+            self.set_codes, self.set_lengths = encode(set_names)
+
+        # Rows of the names containing each token, since only those share part of their token set with a query
+        self.token_rows = defaultdict(list)
+        for row, name in enumerate(self.processed):
+            for token in set(name.split()):
+                self.token_rows[token].append(row)
+
+    def scores(self, query: str, scorer: str = "wratio") -> np.ndarray:
+        """Returns the score (0 to 100) of the query against every name, in roster order."""
+        processed = utils.full_process(query, force_ascii=True)
+        query_codes, query_length = encode([processed])
+        sorted_codes, sorted_length = encode([" ".join(sorted(processed.split()))])
+
+        if scorer == "ratio":
+            return ratio(query_codes, query_length, self.codes, self.lengths)
+        if scorer == "partial_ratio":
+            return partial_ratio(query_codes, query_length, self.codes, self.lengths)
+        if scorer == "token_sort_ratio":
+            return ratio(sorted_codes, sorted_length, self.sorted_codes, self.sorted_lengths)
+        if scorer == "token_set_ratio":
+            scores = self.token_set(processed, np.arange(len(self.names)), partial=False)
+            scores[(self.lengths == 0) | (query_length[0] == 0)] = 0
+            return scores
+        if scorer == "wratio":
+            return self.wratio(processed, query_codes, query_length, sorted_codes, sorted_length)
+        raise ValueError(f"Unknown scorer: {scorer}")
+
+    def wratio(self, processed: str, query_codes: np.ndarray, query_length: np.ndarray, sorted_codes: np.ndarray, sorted_length: np.ndarray) -> np.ndarray:
+        """Combines the scores the same way fuzz.WRatio does."""
+        base = ratio(query_codes, query_length, self.codes, self.lengths).astype(np.float64)
+        longer = np.maximum(self.lengths, query_length[0])
+        shorter = np.minimum(self.lengths, query_length[0])
+        length_ratio = longer / np.maximum(shorter, 1)
+
+        # Names of similar length to the query are compared by their sorted tokens and token sets
+        best = base.copy()
+        similar = length_ratio < 1.5
+        if similar.any():
+            token_sort = ratio(sorted_codes, sorted_length, self.sorted_codes[similar], self.sorted_lengths[similar])
+            token_set = self.token_set(processed, np.flatnonzero(similar), partial=False)
+            best[similar] = np.maximum.reduce([base[similar], token_sort * UNBASE_SCALE, token_set * UNBASE_SCALE])
+
+        # Names much longer or shorter than the query are compared by their best matching window
+        different = ~similar
+        if different.any():
+            scale = np.where(length_ratio[different] > 8, .6, PARTIAL_SCALE)
+            partial = partial_ratio(query_codes, query_length, self.codes[different], self.lengths[different])
+            partial_token_sort = partial_ratio(sorted_codes, sorted_length, self.sorted_codes[different], self.sorted_lengths[different])
+            partial_token_set = self.token_set(processed, np.flatnonzero(different), partial=True)
+            best[different] = np.maximum.reduce([base[different], partial * scale,
+                                                 partial_token_sort * UNBASE_SCALE * scale, partial_token_set * UNBASE_SCALE * scale])
+
+        best[(self.lengths == 0) | (query_length[0] == 0)] = 0
+        return np.round(best).astype(np.int64)
+
+    def token_set(self, processed: str, rows: np.ndarray, partial: bool) -> np.ndarray:
+        """
+        Computes fuzz.token_set_ratio (or partial_token_set_ratio) between the processed query and the given rows.
+        fuzzywuzzy takes the best score of the pairs (intersection, intersection + query's other tokens),
+        (intersection, intersection + name's other tokens) and (query side, name side), each side sorted.
+        """
+        score = partial_ratio if partial else ratio
+        query_tokens = set(processed.split())
+
+        # With no token in common the intersection is empty and scores 0, leaving only the two sorted token sets
+        query_codes, query_length = encode([" ".join(sorted(query_tokens))])
+        scores = score(query_codes, query_length, self.set_codes[rows], self.set_lengths[rows])
+
+        shares_token = np.zeros(len(self.names), dtype=bool)
+        for token in query_tokens:
+            shares_token[self.token_rows.get(token, [])] = True
+        shared = shares_token[rows]
+        if not shared.any():
+            return scores
+
+        intersections, query_sides, name_sides = [], [], []
+        for row in rows[shared]:
+            tokens = set(self.processed[row].split())
+            intersection = " ".join(sorted(query_tokens & tokens))
+            intersections.append(intersection)
+            query_sides.append(f"{intersection} {' '.join(sorted(query_tokens - tokens))}".strip())
+            name_sides.append(f"{intersection} {' '.join(sorted(tokens - query_tokens))}".strip())
+        intersection_codes, intersection_lengths = encode(intersections)
+        query_codes, query_lengths = encode(query_sides)
+        name_codes, name_lengths = encode(name_sides)
+        scores[shared] = np.maximum.reduce([score(intersection_codes, intersection_lengths, query_codes, query_lengths),
+                                            score(intersection_codes, intersection_lengths, name_codes, name_lengths),
+                                            score(query_codes, query_lengths, name_codes, name_lengths)])
+        return scores
+
+    def rank(self, query: str, scorer: str = "wratio") -> list[str]:
+        """Returns the names from most to least similar to the query, breaking ties by roster order."""
+        order = np.argsort(-self.scores(query, scorer), kind="stable")
+        return [self.names[i] for i in order]
+
+# Function to encode strings as a padded code point matrix
+def encode(strings: list[str]) -> tuple[np.ndarray, np.ndarray]:
+    """Encodes the strings as a zero padded (len(strings), longest) uint32 matrix and an array of their lengths."""
+    lengths = np.fromiter(map(len, strings), dtype=np.int64, count=len(strings))
+    width = max(int(lengths.max(initial=0)), 1)
+    codes = np.zeros((len(strings), width), dtype=np.uint32)
+    codes[np.arange(width) < lengths[:, None]] = np.frombuffer("".join(strings).encode("utf-32-le"), dtype=np.uint32)
+    return codes, lengths
+
+# Function to compute the indel distance between rows of two code point matrices
+def indel_distance(a: np.ndarray, a_lengths: np.ndarray, b: np.ndarray, b_lengths: np.ndarray) -> np.ndarray:
+    """
+    Computes the insertion/deletion distance between each row of a and the matching row of b
+    (a may have a single row, which is compared against every row of b).
+    Each character of a is one vectorized step of the dynamic program: the left-to-right dependency within a step,
+    new[j] = min(A[j], new[j - 1] + 1), is solved for every row at once as j + cumulative minimum of (A[k] - k).
+    """
+    rows = b.shape[0]
+    a_lengths = np.broadcast_to(a_lengths, (rows,))
+    steps = np.arange(b.shape[1] + 1, dtype=np.int32)
+    previous = np.broadcast_to(steps, (rows, steps.size))
+    distances = b_lengths.astype(np.int32)  # Distance from an empty string
+
+    for i in range(1, a.shape[1] + 1):
+        # Substituting a character costs a deletion plus an insertion
+        cost = np.where(a[:, i - 1:i] == b, 0, 2).astype(np.int32)
+        current = np.empty((rows, steps.size), dtype=np.int32)
+        current[:, 0] = i
+        np.minimum(previous[:, :-1] + cost, previous[:, 1:] + 1, out=current[:, 1:])
+        current = np.minimum.accumulate(current - steps, axis=1) + steps
+
+        done = a_lengths == i
+        if done.any():
+            distances[done] = current[done, b_lengths[done]]
+        previous = current
+
+    return distances
+
+# Function to compute fuzz.ratio for every row
+def ratio(query_codes: np.ndarray, query_length: np.ndarray, codes: np.ndarray, lengths: np.ndarray) -> np.ndarray:
+    """
+    Computes fuzz.ratio between the query and every row, with 0 for empty strings like fuzzywuzzy.
+    The query may also have one row per row, which compares them pairwise.
+    """
+    distances = indel_distance(query_codes, query_length, codes, lengths)
+    total = lengths + query_length
+    similarity = 1.0 - distances / np.maximum(total, 1)
+    scores = np.round(100 * similarity).astype(np.int64)
+    scores[(lengths == 0) | (query_length == 0)] = 0
+    scores[(lengths == 0) & (query_length == 0)] = 100  # Two empty strings are equal
+    return scores
+
+# Function to compute fuzz.partial_ratio for every row
+def partial_ratio(query_codes: np.ndarray, query_length: np.ndarray, codes: np.ndarray, lengths: np.ndarray) -> np.ndarray:
+    """
+    Computes the best ratio of the shorter of the query and each row against every window of the longer one.
+    The query may also have one row per row, which compares them pairwise.
+    """
+    rows = codes.shape[0]
+    query_codes = np.broadcast_to(query_codes, (rows, query_codes.shape[1]))
+    query_length = np.broadcast_to(query_length, (rows,))
+    scores = np.zeros(rows, dtype=np.int64)
+    for start in range(0, rows, PARTIAL_CHUNK_ROWS):
+        stop = min(start + PARTIAL_CHUNK_ROWS, rows)
+        scores[start:stop] = partial_ratio_chunk(query_codes[start:stop], query_length[start:stop], codes[start:stop], lengths[start:stop])
+    return scores
+
+def partial_ratio_chunk(query: np.ndarray, query_length: np.ndarray, codes: np.ndarray, lengths: np.ndarray) -> np.ndarray:
+    """Computes partial_ratio for a chunk of (query, row) pairs by expanding every (pair, window) into its own row."""
+    rows = codes.shape[0]
+    width = max(codes.shape[1], query.shape[1])
+    padded_query = np.zeros((rows, width), dtype=np.uint32)
+    padded_query[:, :query.shape[1]] = query
+    padded_codes = np.zeros((rows, width), dtype=np.uint32)
+    padded_codes[:, :codes.shape[1]] = codes
+
+    # fuzzywuzzy slides the shorter string (the query when lengths are equal) over the longer one
+    query_is_shorter = query_length <= lengths
+    shorter = np.where(query_is_shorter[:, None], padded_query, padded_codes)
+    longer = np.where(query_is_shorter[:, None], padded_codes, padded_query)
+    shorter_lengths = np.minimum(lengths, query_length)
+    longer_lengths = np.maximum(lengths, query_length)
+
+    # Like fuzzywuzzy, windows may start anywhere in the longer string and are cut short at its end
+    windows = np.maximum(longer_lengths, 1)
+    first_window = np.cumsum(windows) - windows
+    pair_rows = np.repeat(np.arange(rows), windows)
+    offsets = np.arange(pair_rows.size) - np.repeat(first_window, windows)
+
+    window_width = max(int(shorter_lengths.max(initial=0)), 1)
+    columns = np.minimum(offsets[:, None] + np.arange(window_width), width - 1)
+    pair_lengths = shorter_lengths[pair_rows]
+    window_lengths = np.minimum(pair_lengths, longer_lengths[pair_rows] - offsets)
+    distances = indel_distance(shorter[pair_rows, :window_width], pair_lengths, longer[pair_rows[:, None], columns], window_lengths)
+
+    similarity = 1.0 - distances / np.maximum(pair_lengths + window_lengths, 1)
+    best = np.maximum.reduceat(similarity, first_window)
+    scores = np.where(best > .995, 100, np.round(100 * best)).astype(np.int64)
+    scores[shorter_lengths == 0] = 0
+    scores[longer_lengths == 0] = 100  # Two empty strings are equal
+    return scores
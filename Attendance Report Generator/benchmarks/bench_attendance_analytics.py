@@ -0,0 +1,82 @@
+"""
+Times attendance_analytics over a synthetic department's term: many sections, each meeting two or three times a week.
+The data is written to a temporary directory with both storage backends, and the analytics are run cold (nothing cached) and warm.
+Run from the "Attendance Report Generator" directory: python benchmarks/bench_attendance_analytics.py
+"""
+# Import modules from the standard library
+import datetime
+import os
+import random
+import sys
+import tempfile
+import time
+
+# Allow the benchmark to import the application modules
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+# Import functions from local modules
+from attendance_analytics import load_attendance_matrix, compute_analytics
+from attendance_store import attendance_stores
+from report_catalog import report_catalogs
+from storage import TextBackend, set_storage_backend, migrate_text_to_sqlite
+from synthetic import synthetic_roster
+
+SECTIONS = 80
+STUDENTS_PER_SECTION = 300
+WEEKS = 16
+TERM_START = datetime.date(2025, 1, 13)
+
+# Function to write a synthetic term of attendance
+def write_department(seed: int = 0) -> int:
+    """Writes every section's roster and reports with the text backend, and returns the number of reports written."""
+    rng = random.Random(seed)
+    text = TextBackend()
+    reports = 0
+    for section_number in range(SECTIONS):
+        section = f"CS {1000 + section_number}.001"
+        roster = synthetic_roster(STUDENTS_PER_SECTION, seed=section_number)
+        text.write_roster(section, roster)
+        # Half the sections meet Monday/Wednesday and half Tuesday/Thursday, and some also meet on Friday
+        days = [0, 2] if section_number % 2 == 0 else [1, 3]
+        if section_number % 5 == 0:
+            days.append(4)
+        # Each student has their own chance of attending, so some of them fall behind
+        chances = {name: rng.uniform(.5, 1) for name in roster}
+        section_reports = {}
+        for week in range(WEEKS):
+            for day in days:
+                date = (TERM_START + datetime.timedelta(weeks=week, days=day)).strftime("%m-%d-%Y")
+                section_reports[date] = [name for name in roster if rng.random() < chances[name]]
+        text.save_reports(section, section_reports)
+        reports += len(section_reports)
+    return reports
+
+# Function to time the analytics once
+def time_analytics() -> tuple[float, float, int]:
+    """Returns the seconds taken to load the matrix and to compute the analytics, and the number of students at risk."""
+    start = time.perf_counter()
+    matrix = load_attendance_matrix()
+    loaded = time.perf_counter()
+    analytics = compute_analytics(matrix)
+    return loaded - start, time.perf_counter() - loaded, len(analytics["at_risk"])
+
+def main() -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        os.chdir(directory)
+        start = time.perf_counter()
+        reports = write_department()
+        print(f"{SECTIONS} sections, {SECTIONS * STUDENTS_PER_SECTION} students, {reports} reports (written in {time.perf_counter() - start:.1f} s)")
+        migrate_text_to_sqlite()
+
+        print(f"{'backend':>8} {'run':>5} {'load (ms)':>10} {'compute (ms)':>13} {'total (ms)':>11} {'at risk':>8}")
+        for backend in ["text", "sqlite"]:
+            set_storage_backend(backend)
+            attendance_stores.clear()
+            report_catalogs.clear()
+            for run in ["cold", "warm"]:
+                load, compute, at_risk = time_analytics()
+                print(f"{backend:>8} {run:>5} {load * 1000:>10.0f} {compute * 1000:>13.0f} {(load + compute) * 1000:>11.0f} {at_risk:>8}")
+        os.chdir(os.path.dirname(os.path.abspath(__file__)))
+
+if __name__ == "__main__":
+    main()
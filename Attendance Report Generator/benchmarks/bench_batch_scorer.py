@@ -0,0 +1,112 @@
+"""
+Verifies the numpy batch scorer against fuzzywuzzy and reports its per-query latency and memory at several roster sizes.
+Run from the "Attendance Report Generator" directory: python benchmarks/bench_batch_scorer.py
+"""
+# Import modules from the standard library
+import os
+import sys
+import time
+import tracemalloc
+
+# Allow the benchmark to import the application modules
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+# Import modules that are in requirements.txt
+from fuzzywuzzy import fuzz, process, utils
+
+# Import functions from local modules
+from batch_scorer import BatchScorer
+from synthetic import synthetic_roster, synthetic_queries
+
+ROSTER_SIZES = [100, 1_000, 10_000, 100_000]
+QUERIES_PER_SIZE = 5
+PARITY_ROSTER_SIZE = 1_000
+PARITY_QUERIES = 20
+PARITY_TOP = 5
+
+# Function to check the batch scores against fuzzywuzzy
+def verify() -> None:
+    """Compares every batch scorer with the fuzzywuzzy scorer it replaces on a synthetic roster."""
+    student_list = synthetic_roster(PARITY_ROSTER_SIZE)
+    queries = synthetic_queries(student_list, PARITY_QUERIES)
+    scorer = BatchScorer(student_list)
+    processed = [utils.full_process(name, force_ascii=True) for name in student_list]
+
+    exact = {"ratio": 0, "token_sort_ratio": 0, "token_set_ratio": 0, "partial_ratio": 0, "wratio": 0}
+    partial_lower = 0
+    wratio_lower = 0
+    wratio_similar_differs = 0
+    same_top_match = 0
+    same_top_ranking = 0
+    for query in queries:
+        processed_query = utils.full_process(query, force_ascii=True)
+        ratio = scorer.scores(query, "ratio")
+        token_sort = scorer.scores(query, "token_sort_ratio")
+        token_set = scorer.scores(query, "token_set_ratio")
+        partial = scorer.scores(query, "partial_ratio")
+        wratio = scorer.scores(query, "wratio")
+        for i, name in enumerate(processed):
+            exact["ratio"] += ratio[i] == fuzz.ratio(processed_query, name)
+            exact["token_sort_ratio"] += token_sort[i] == fuzz.token_sort_ratio(processed_query, name)
+            expected_partial = fuzz.partial_ratio(processed_query, name)
+            exact["partial_ratio"] += partial[i] == expected_partial
+            partial_lower += partial[i] < expected_partial
+            exact["token_set_ratio"] += token_set[i] == fuzz.token_set_ratio(processed_query, name)
+            expected_wratio = fuzz.WRatio(processed_query, name)
+            exact["wratio"] += wratio[i] == expected_wratio
+            wratio_lower += wratio[i] < expected_wratio
+            # Only the partial terms, used for names at least 1.5 times longer or shorter than the query, may differ
+            lengths = sorted([len(processed_query), len(name)])
+            wratio_similar_differs += wratio[i] != expected_wratio and lengths[1] < 1.5 * lengths[0]
+
+        ranking = scorer.rank(query)
+        expected_ranking = [name for name, score in process.extract(query, student_list, limit=PARITY_TOP)]
+        same_top_match += ranking[0] == expected_ranking[0]
+        same_top_ranking += ranking[:PARITY_TOP] == expected_ranking
+
+    pairs = len(queries) * len(student_list)
+    print(f"Parity with fuzzywuzzy over {pairs} (query, name) pairs:")
+    for name, count in exact.items():
+        print(f"  {name:<17} {count / pairs:7.2%} identical")
+    print(f"  partial_ratio lower than fuzzywuzzy: {partial_lower} (it checks every window, fuzzywuzzy only some)")
+    print(f"  wratio lower than fuzzywuzzy: {wratio_lower}, different for names of similar length: {wratio_similar_differs}")
+    print(f"  same top suggestion as WRatio: {same_top_match}/{len(queries)}")
+    print(f"  same top {PARITY_TOP} suggestions as WRatio: {same_top_ranking}/{len(queries)}")
+    assert exact["ratio"] == pairs and exact["token_sort_ratio"] == pairs and exact["token_set_ratio"] == pairs
+    assert partial_lower == 0 and wratio_lower == 0 and wratio_similar_differs == 0
+
+def main() -> None:
+    verify()
+    print()
+    print(f"{'names':>8} {'encode (ms)':>12} {'roster (MB)':>12} {'query (ms)':>11} {'query peak (MB)':>16} {'fuzzywuzzy (ms)':>16}")
+    for size in ROSTER_SIZES:
+        student_list = synthetic_roster(size)
+        queries = synthetic_queries(student_list, QUERIES_PER_SIZE)
+
+        start = time.perf_counter()
+        scorer = BatchScorer(student_list)
+        encode_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for query in queries:
+            scorer.rank(query)
+        query_time = (time.perf_counter() - start) / len(queries)
+
+        # Measure memory separately, since tracing allocations slows down the timings
+        tracemalloc.start()
+        scorer = BatchScorer(student_list)
+        roster_memory = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        scorer.rank(queries[0])
+        query_peak = tracemalloc.get_traced_memory()[1] - roster_memory
+        tracemalloc.stop()
+
+        start = time.perf_counter()
+        for query in queries:
+            process.extract(query, student_list, limit=len(student_list))
+        fuzzywuzzy_time = (time.perf_counter() - start) / len(queries)
+
+        print(f"{size:>8} {encode_time * 1000:>12.1f} {roster_memory / 2**20:>12.2f} {query_time * 1000:>11.2f} {query_peak / 2**20:>16.2f} {fuzzywuzzy_time * 1000:>16.2f}")
+
+if __name__ == "__main__":
+    main()
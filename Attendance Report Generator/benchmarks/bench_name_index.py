@@ -0,0 +1,53 @@
+"""
+Compares suggest_names using the trigram/prefix index against the original full fuzzy scan.
+Run from the "Attendance Report Generator" directory: python benchmarks/bench_name_index.py
+"""
+# Import modules from the standard library
+import os
+import sys
+import time
+
+# Allow the benchmark to import the application modules
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+# Import modules that are in requirements.txt
+from fuzzywuzzy import process
+
+# Import functions from local modules
+from name_suggestion import suggest_names, index_section, name_indexes
+from synthetic import synthetic_roster, synthetic_queries
+
+ROSTER_SIZES = [100, 1_000, 10_000, 100_000]
+QUERIES_PER_SIZE = 10
+
+# Function to run the original full scan
+def full_scan(query: str, student_list: list[str]) -> list[str]:
+    """The original implementation of suggest_names, which scores and sorts the whole roster."""
+    return [name for name, score in process.extract(query, student_list, limit=len(student_list))]
+
+def main() -> None:
+    print(f"{'names':>8} {'build (ms)':>11} {'full scan (ms)':>15} {'indexed (ms)':>13} {'speedup':>8} {'same top match':>15}")
+    for size in ROSTER_SIZES:
+        section = f"benchmark-{size}"
+        student_list = synthetic_roster(size)
+        queries = synthetic_queries(student_list, QUERIES_PER_SIZE)
+        students = {section: student_list}
+
+        start = time.perf_counter()
+        index_section(section, student_list)
+        build_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        full_results = [full_scan(query, student_list) for query in queries]
+        full_time = (time.perf_counter() - start) / len(queries)
+
+        start = time.perf_counter()
+        indexed_results = [suggest_names(query, section, students) for query in queries]
+        indexed_time = (time.perf_counter() - start) / len(queries)
+
+        same_top = sum(full[:1] == indexed[:1] for full, indexed in zip(full_results, indexed_results))
+        print(f"{size:>8} {build_time * 1000:>11.1f} {full_time * 1000:>15.2f} {indexed_time * 1000:>13.2f} {full_time / indexed_time:>7.1f}x {same_top:>9}/{len(queries)}")
+        name_indexes.clear()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""
+Measures what the phonetic and nickname index saves when suggesting names, on a synthetic corpus of names typed from a sign-in sheet:
+nicknames ("Bill" for William), names spelled the way they sound, names with a typo, and names typed as "First Last".
+Each name is typed one keystroke at a time, and for every prefix the suggestions are computed with and without the index.
+Reported for each roster size:
+- names scored: how many names went through the fuzzy scorer per keystroke
+- keystrokes: how many keystrokes it took for the student to become the top suggestion (and how often they never did)
+Run from the "Attendance Report Generator" directory: python benchmarks/bench_phonetic_index.py
+"""
+# Import modules from the standard library
+import os
+import random
+import statistics
+import sys
+import time
+
+# Allow the benchmark to import the application modules
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+# Import functions from local modules
+import name_suggestion
+from name_index import NICKNAMES
+from name_suggestion import suggest_names, set_phonetic_matching, index_section, suggestion_cache
+from synthetic import synthetic_name_part
+
+ROSTER_SIZES = [60, 300, 3_000]
+QUERIES_PER_SIZE = 150
+
+# Formal first names that have nicknames, and the nicknames of each
+FORMAL_NAMES = sorted({formal for formal_names in NICKNAMES.values() for formal in formal_names})
+NICKNAMES_OF = {formal: [nickname for nickname, formal_names in NICKNAMES.items() if formal in formal_names] for formal in FORMAL_NAMES}
+
+# Spellings that sound alike, used to misspell names the way they sound
+SOUND_ALIKES = [("ph", "f"), ("f", "ph"), ("c", "k"), ("k", "c"), ("y", "i"), ("i", "y"), ("ee", "ea"), ("s", "z"), ("on", "un"), ("er", "ur")]
+
+# Function to create a roster with real first names
+def named_roster(size: int, rng: random.Random) -> list[str]:
+    """Creates a "Last, First" roster where half of the first names have common nicknames."""
+    return [f"{synthetic_name_part(rng)}, {rng.choice(FORMAL_NAMES).capitalize() if rng.random() < .5 else synthetic_name_part(rng)}" for _ in range(size)]
+
+# Function to misspell a name the way it sounds
+def sound_alike(token: str, rng: random.Random) -> str:
+    """Rewrites one spelling in the token with one that sounds the same, or doubles a letter if none applies."""
+    options = [(spelling, sound) for spelling, sound in SOUND_ALIKES if spelling in token.lower()[1:]]
+    if options:
+        spelling, sound = rng.choice(options)
+        i = token.lower().index(spelling, 1)
+        return token[:i] + sound + token[i + len(spelling):]
+    i = rng.randrange(1, len(token))
+    return token[:i] + token[i] + token[i:]
+
+# Function to create what a student's name looks like on a sign-in sheet
+def typed_name(name: str, rng: random.Random) -> tuple[str, str]:
+    """Returns (kind, typed name) for a roster name, written the way a student might have signed in."""
+    last_name, first_name = name.split(", ")
+    kinds = ["sound", "typo", "first last"] + (["nickname"] * 2 if first_name.lower() in NICKNAMES_OF else [])
+    kind = rng.choice(kinds)
+    if kind == "nickname":
+        return kind, f"{rng.choice(NICKNAMES_OF[first_name.lower()]).capitalize()} {last_name}"
+    if kind == "sound":
+        return kind, f"{first_name} {sound_alike(last_name, rng)}"
+    if kind == "typo":
+        i = rng.randrange(len(last_name) - 1)
+        return kind, f"{first_name} {last_name[:i] + last_name[i + 1] + last_name[i] + last_name[i + 2:]}"
+    return kind, f"{first_name} {last_name}"
+
+# Function to type a name one keystroke at a time
+def type_name(typed: str, target: str, section: str, students: dict, scored: list[int]) -> int:
+    """
+    Calls suggest_names for every keystroke of the typed name (appending the number of names scored by each call to scored),
+    and returns the number of keystrokes after which the target first became the top suggestion, or None if it never did.
+    """
+    matched_at = None
+    for length in range(1, len(typed) + 1):
+        if typed[length - 1] == " ":
+            continue
+        scored.append(0)
+        # Score every keystroke, rather than reusing the suggestions of a prefix another name was typed with
+        suggestion_cache.clear()
+        suggestions = suggest_names(typed[:length], section, students)
+        if matched_at is None and suggestions and suggestions[0] == target:
+            matched_at = length
+    return matched_at
+
+def main() -> None:
+    # Count the names that go through the fuzzy scorer
+    scored = []
+    rank_names = name_suggestion.rank_names
+
+    def counting_rank_names(query: str, candidates: list[str]) -> list:
+        scored[-1] += len(candidates)
+        return rank_names(query, candidates)
+    name_suggestion.rank_names = counting_rank_names
+
+    print("Keystrokes to match count a name that never became the top suggestion as every keystroke of it.")
+    print(f"{'names':>6} {'index':>6} {'scored/key':>11} {'ms/key':>7} {'keys to match':>14} {'never':>6}   keys to match by kind")
+    for size in ROSTER_SIZES:
+        rng = random.Random(size)
+        section = f"benchmark-{size}"
+        roster = named_roster(size, rng)
+        students = {section: roster}
+        index_section(section, roster)
+        queries = [(name, *typed_name(name, rng)) for name in rng.sample(roster, min(QUERIES_PER_SIZE, size))]
+
+        for enabled in [False, True]:
+            set_phonetic_matching(enabled)
+            scored.clear()
+            keys = []
+            never = 0
+            by_kind = {}
+            start = time.perf_counter()
+            for target, kind, typed in queries:
+                matched_at = type_name(typed, target, section, students, scored)
+                never += matched_at is None
+                keys.append(matched_at or len(typed))
+                by_kind.setdefault(kind, []).append(keys[-1])
+            elapsed = time.perf_counter() - start
+            kinds = ", ".join(f"{kind} {statistics.mean(counts):.1f}" for kind, counts in sorted(by_kind.items()))
+            print(f"{size:>6} {'on' if enabled else 'off':>6} {statistics.mean(scored):>11.1f} {elapsed * 1000 / len(scored):>7.2f} "
+                  f"{statistics.mean(keys):>14.2f} {never:>6}   {kinds}")
+    name_suggestion.rank_names = rank_names
+    set_phonetic_matching(False)
+
+if __name__ == "__main__":
+    main()
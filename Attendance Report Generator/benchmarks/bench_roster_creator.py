@@ -0,0 +1,66 @@
+"""
+Compares roster_creator's streaming extraction with the BeautifulSoup path on a synthetic registrar export,
+checking that both write the same rosters and reporting the time and peak traced memory of each.
+Run from the "Attendance Report Generator" directory: python benchmarks/bench_roster_creator.py [rows]
+"""
+# Import modules from the standard library
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+# Allow the benchmark to import the application modules
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+# Import functions from local modules
+from roster_creator import create_rosters, create_rosters_streaming
+from synthetic import write_synthetic_export
+
+DEFAULT_ROWS = 100_000
+SECTION_IDS = [f"2252-UTDAL-CS-4349-SEC00{i}-2300{i}" for i in range(1, 5)]
+
+# Function to time one extraction path
+def measure(create, input_file_name: str, sections: dict, output_dir_names: dict) -> tuple[float, float]:
+    """Runs the extraction once untraced for its time and once traced for its peak memory, returning (seconds, MB)."""
+    start = time.perf_counter()
+    create(input_file_name, sections, output_dir_names)
+    seconds = time.perf_counter() - start
+
+    tracemalloc.start()
+    create(input_file_name, sections, output_dir_names)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return seconds, peak / 2**20
+
+# Function to read every roster written by a run
+def read_rosters(output_dir_names: dict) -> dict[str, str]:
+    """Returns the contents of every roster file."""
+    contents = {}
+    for section_name, file_name in output_dir_names.items():
+        with open(file_name, "r") as file:
+            contents[section_name] = file.read()
+    return contents
+
+def main() -> None:
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_ROWS
+    sections = {section_id: f"Section {i}" for i, section_id in enumerate(SECTION_IDS, start=1)}
+
+    with tempfile.TemporaryDirectory() as directory:
+        input_file_name = os.path.join(directory, "export.html")
+        write_synthetic_export(input_file_name, rows, SECTION_IDS)
+        print(f"Synthetic export: {rows} rows, {os.path.getsize(input_file_name) / 2**20:.1f} MB")
+
+        results = {}
+        outputs = {}
+        for label, create in [("BeautifulSoup", create_rosters), ("streaming", create_rosters_streaming)]:
+            output_dir_names = {name: os.path.join(directory, f"{label} - {name}.txt") for name in sections.values()}
+            results[label] = measure(create, input_file_name, sections, output_dir_names)
+            outputs[label] = list(read_rosters(output_dir_names).values())
+
+        assert outputs["BeautifulSoup"] == outputs["streaming"], "the two paths wrote different rosters"
+        for label, (seconds, peak) in results.items():
+            print(f"{label:>14}: {seconds:7.2f} s, peak {peak:8.1f} MB")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+"""
+Measures how many sign-in sheet names resolve_sign_ins resolves per second, in this process and with a pool of worker processes.
+It also reports how many names were added without review, and how many of those were matched to the right student.
+Run from the "Attendance Report Generator" directory: python benchmarks/bench_sign_in_import.py
+"""
+# Import modules from the standard library
+import os
+import random
+import sys
+import time
+
+# Allow the benchmark to import the application modules
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+# Import functions from local modules
+from sign_in_import import resolve_sign_ins
+from synthetic import synthetic_roster, synthetic_query
+
+ROSTER_SIZES = [300, 5_000]
+SIGN_INS = 5_000
+WORKER_COUNTS = [1, None]  # None uses one worker process per CPU
+
+def main() -> None:
+    print(f"{os.cpu_count()} CPUs, {SIGN_INS} sign-ins per run")
+    print(f"{'roster':>7} {'workers':>8} {'seconds':>8} {'names/s':>9} {'no review':>10} {'correct':>8}")
+    for size in ROSTER_SIZES:
+        student_list = synthetic_roster(size)
+        rng = random.Random(size)
+        expected = [rng.choice(student_list) for _ in range(SIGN_INS)]
+        typed_names = [synthetic_query(name, rng) for name in expected]
+
+        for workers in WORKER_COUNTS:
+            start = time.perf_counter()
+            resolutions = resolve_sign_ins(typed_names, student_list, workers=workers)
+            seconds = time.perf_counter() - start
+
+            confident = [(resolution, name) for resolution, name in zip(resolutions, expected) if resolution.confident]
+            correct = sum(resolution.match == name for resolution, name in confident)
+            label = workers or os.cpu_count()
+            print(f"{size:>7} {label:>8} {seconds:>8.2f} {SIGN_INS / seconds:>9.0f} {len(confident) / SIGN_INS:>9.1%} {correct / max(len(confident), 1):>7.1%}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""
+Measures how long the app takes to start with hundreds of sections, with and without the fast-start snapshot (see startup.py).
+Each run is a fresh Python process that goes through main.py's startup up to creating the window
+(which needs a display): the imports, loading the sections, and starting the report writer.
+It then opens some of the sections the way selecting them does (reading the roster and the report dates) and closes,
+saving the snapshot in fast-start mode.
+Reported for each mode is the median of every phase, the time to open the sections, the whole process's wall time,
+and which of the modules that are slow to import were imported by the end of startup.
+Run from the "Attendance Report Generator" directory: python benchmarks/bench_startup.py [--sections 300] [--opened 20]
+"""
+# Import modules from the standard library
+import argparse
+import datetime
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+# Allow the benchmark to import the application modules
+APP_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, APP_DIR)
+
+# Modules that should not be imported until they are used
+SLOW_MODULES = ["numpy", "fuzzywuzzy.process", "sqlite3", "multiprocessing", "pstats"]
+
+# Weeks of Monday/Wednesday reports written for each section
+REPORT_WEEKS = 16
+
+# Function to start the app without its window, in the process the benchmark started
+def run_child(fast_start: bool, opened: int) -> None:
+    """Goes through main.py's startup, opens the first sections, closes, and prints the timings as JSON."""
+    started = time.perf_counter()
+    # The same modules main.py imports
+    import tkinter as tk
+    from tkinter import ttk, messagebox
+    import attendance_report_file_manager, report_catalog, name_suggestion, name_index, suggestion_engine, matching_service
+    import attendance_frequency, sign_in_import, virtual_listbox
+    from attendance_set import AttendanceSet
+    from instrumentation import configure_instrumentation
+    from report_writer import start_report_writer, stop_report_writer
+    from section_manager import RosterCache, load_sections
+    from startup import StartupTimer, load_snapshot, restore_snapshot, save_snapshot
+    from storage import get_storage, set_storage_backend
+    configure_instrumentation([])
+    timer = StartupTimer(started)
+    timer.mark("imports")
+
+    set_storage_backend("text", roster_dir="rosters")
+    students = RosterCache()
+    load_sections(students)
+    snapshot = load_snapshot() if fast_start else None
+    if snapshot:
+        restore_snapshot(students, snapshot)
+    attendance_reports = {section: AttendanceSet() for section in students}
+    timer.mark("sections")
+    start_report_writer(attendance_reports)
+    timer.mark("services")
+    slow_modules = [module for module in SLOW_MODULES if module in sys.modules]
+
+    start = time.perf_counter()
+    for section in sorted(students)[:opened]:
+        students[section]
+        get_storage().report_dates(section)
+    open_ms = (time.perf_counter() - start) * 1000
+
+    stop_report_writer()
+    if fast_start:
+        save_snapshot(students, snapshot)
+    print(json.dumps({"phases": timer.phases, "total_ms": timer.total_ms(), "open_ms": open_ms, "slow_modules": slow_modules}))
+
+# Function to time one run of the app's startup
+def run_once(directory: str, fast_start: bool, opened: int) -> dict:
+    """Runs the startup in a new process and returns its timings, with the process's wall time added."""
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, os.path.abspath(__file__), "--child", "fast" if fast_start else "slow", "--opened", str(opened)],
+                            cwd=directory, capture_output=True, text=True, check=True)
+    timings = json.loads(result.stdout.splitlines()[-1])
+    timings["wall_ms"] = (time.perf_counter() - start) * 1000
+    return timings
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sections", type=int, default=300)
+    parser.add_argument("--students", type=int, default=60)
+    parser.add_argument("--opened", type=int, default=20, help="sections opened after startup")
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--child", choices=["fast", "slow"], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        run_child(args.child == "fast", args.opened)
+        return
+
+    from storage import TextBackend
+    from synthetic import synthetic_roster, synthetic_meeting_dates
+    with tempfile.TemporaryDirectory() as directory:
+        os.chdir(directory)
+        print(f"Writing {args.sections} sections of {args.students} students with {REPORT_WEEKS} weeks of reports each...")
+        storage = TextBackend("rosters")
+        dates = synthetic_meeting_dates(datetime.date(2025, 1, 13), REPORT_WEEKS, [0, 2])
+        for section_number in range(args.sections):
+            roster = synthetic_roster(args.students, seed=section_number)
+            storage.write_roster(f"CS {1000 + section_number}.001", roster)
+            storage.save_reports(f"CS {1000 + section_number}.001", {date: roster[section_number % 2::2] for date in dates})
+        os.chdir(APP_DIR)
+
+        # The first fast start has no snapshot yet, and writes one when it closes
+        first_run = run_once(directory, True, args.opened)
+        for label, fast_start in [("no snapshot", False), ("snapshot", True)]:
+            runs = [run_once(directory, fast_start, args.opened) for _ in range(args.repeats)]
+            phases = ", ".join(f"{phase} {statistics.median(run['phases'][phase] for run in runs):.1f}" for phase in runs[0]["phases"])
+            print(f"{label:>12}: {phases} ms; startup {statistics.median(run['total_ms'] for run in runs):.1f} ms, "
+                  f"process {statistics.median(run['wall_ms'] for run in runs):.1f} ms; "
+                  f"opening {args.opened} sections {statistics.median(run['open_ms'] for run in runs):.1f} ms")
+        print(f"Slow modules imported during startup: {', '.join(first_run['slow_modules']) or 'none'}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""
+Checks that absences_report.py writes the same absences_report.txt as "Absences Report/src/Absences.java".
+Synthetic absences.csv files (including awkward rows: extra spaces around commas, trailing commas, blank lines,
+square brackets, and names outside the Basic Multilingual Plane) are run through both, and the outputs are compared byte for byte.
+It also checks that a report streamed from a section's reports matches one read back from the absences.csv written alongside it.
+The golden cases in benchmarks/absences_golden/ (an absences.csv and the absences_report.txt Absences.java writes for it,
+with a JDK 18 or later on Linux or macOS: UTF-8 files and "\n" line endings) are compared without Java, so they always run.
+The comparison with synthetic files needs javac and java on the PATH, and is skipped otherwise;
+when it runs, the golden reports are also checked against the Java program's output.
+Run from the "Attendance Report Generator" directory: python benchmarks/check_absences_parity.py
+"""
+# Import modules from the standard library
+import datetime
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+
+# Allow the script to import the application modules
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+# Import functions from local modules
+from absences_report import absence_rows, read_absences_csv, write_absences_report
+from storage import TextBackend
+from synthetic import synthetic_roster
+
+JAVA_SOURCE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "Absences Report", "src", "Absences.java")
+GOLDEN_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "absences_golden")
+CASES = 20
+
+# Function to create a synthetic absences.csv
+def write_absences_csv(path: str, rng: random.Random) -> None:
+    """Writes rows of dates and absent names, with the irregular spacing and punctuation a hand-made file can have."""
+    names = [name.replace(", ", " ") for name in synthetic_roster(rng.randint(1, 40), seed=rng.randrange(1000))]
+    names += ["Ana [TA]", "Zoë Ünal", "\U0001F600 Smile", "Ｚenkaku Name"]
+    start = datetime.date(2025, rng.randint(1, 12), 1)
+    with open(path, "w", newline="") as file:
+        for day in range(rng.randint(0, 25)):
+            date = (start + datetime.timedelta(days=day * rng.randint(1, 3))).strftime("%m-%d-%Y")
+            absent = rng.sample(names, rng.randint(0, min(len(names), 12)))
+            if absent and rng.random() < .1:
+                absent.append(absent[0])  # The same name twice on one row counts twice
+            separator = rng.choice([",", ", ", " , ", ",  "])
+            line = separator.join([date] + absent)
+            if rng.random() < .1:
+                line += ",,"
+            file.write(line + "\n")
+            if rng.random() < .05:
+                file.write("\n")
+
+# Function to run the Java program
+def run_java(build_dir: str, work_dir: str) -> bytes:
+    """Runs the compiled Absences program on the absences.csv in work_dir and returns the report it writes."""
+    subprocess.run(["java", "-cp", build_dir, "Absences"], cwd=work_dir, check=True)
+    with open(os.path.join(work_dir, "absences_report.txt"), "rb") as file:
+        return file.read()
+
+# Function to compare a section's streamed report with its absences.csv
+def check_section_round_trip(directory: str) -> bool:
+    """Writes a section's report straight from its reports, then from the absences.csv written with it, and compares the two."""
+    os.chdir(directory)
+    rng = random.Random(1)
+    roster = synthetic_roster(120)
+    text = TextBackend()
+    text.write_roster("S", roster)
+    text.save_reports("S", {(datetime.date(2025, 1, 13) + datetime.timedelta(days=2 * i)).strftime("%m-%d-%Y"): rng.sample(roster, 90) for i in range(30)})
+    write_absences_report(absence_rows("S"), "absences.csv", "streamed.txt")
+    write_absences_report(read_absences_csv("absences.csv"), None, "from_csv.txt")
+    with open("streamed.txt", "rb") as streamed, open("from_csv.txt", "rb") as from_csv:
+        return streamed.read() == from_csv.read()
+
+# Function to compare the reports with the golden reports
+def check_golden_reports(directory: str) -> tuple[int, int]:
+    """Writes a report from each golden case's absences.csv and compares it with the case's absences_report.txt byte for byte."""
+    cases = sorted(case for case in os.listdir(GOLDEN_DIR) if os.path.isdir(os.path.join(GOLDEN_DIR, case)))
+    matches = 0
+    for case in cases:
+        output_path = os.path.join(directory, f"golden-{case}.txt")
+        write_absences_report(read_absences_csv(os.path.join(GOLDEN_DIR, case, "absences.csv")), None, output_path)
+        with open(output_path, "rb") as output, open(os.path.join(GOLDEN_DIR, case, "absences_report.txt"), "rb") as golden:
+            if output.read() == golden.read():
+                matches += 1
+            else:
+                print(f"Golden case {case} differs: compare {output_path} with {os.path.join(GOLDEN_DIR, case, 'absences_report.txt')}")
+    return matches, len(cases)
+
+def main() -> None:
+    rng = random.Random(0)
+    with tempfile.TemporaryDirectory() as directory:
+        print("Section report matches its absences.csv:", check_section_round_trip(directory))
+        matches, cases = check_golden_reports(directory)
+        print(f"{matches} of {cases} golden reports match byte for byte")
+
+        if shutil.which("javac") is None or shutil.which("java") is None:
+            print("javac/java not found, so the comparison with Absences.java was skipped")
+            return
+        build_dir = os.path.join(directory, "build")
+        os.makedirs(build_dir)
+        subprocess.run(["javac", "-encoding", "UTF-8", "-d", build_dir, JAVA_SOURCE], check=True)
+
+        # Make sure the golden reports are still what the Java program writes
+        for case in sorted(os.listdir(GOLDEN_DIR)):
+            if not os.path.isdir(os.path.join(GOLDEN_DIR, case)):
+                continue
+            work_dir = os.path.join(directory, f"golden-{case}")
+            os.makedirs(work_dir)
+            shutil.copy(os.path.join(GOLDEN_DIR, case, "absences.csv"), work_dir)
+            with open(os.path.join(GOLDEN_DIR, case, "absences_report.txt"), "rb") as golden:
+                if run_java(build_dir, work_dir) != golden.read():
+                    print(f"Golden case {case} no longer matches Absences.java: compare it with {work_dir}/absences_report.txt")
+
+        matches = 0
+        for case in range(CASES):
+            work_dir = os.path.join(directory, f"case-{case}")
+            os.makedirs(work_dir)
+            write_absences_csv(os.path.join(work_dir, "absences.csv"), rng)
+            java_output = run_java(build_dir, work_dir)
+            write_absences_report(read_absences_csv(os.path.join(work_dir, "absences.csv")), None, os.path.join(work_dir, "python_report.txt"))
+            with open(os.path.join(work_dir, "python_report.txt"), "rb") as file:
+                if file.read() == java_output:
+                    matches += 1
+                else:
+                    print(f"Case {case} differs: compare {work_dir}/absences_report.txt with python_report.txt")
+        print(f"{matches} of {CASES} reports match Absences.java byte for byte")
+
+if __name__ == "__main__":
+    main()
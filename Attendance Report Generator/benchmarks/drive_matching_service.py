@@ -0,0 +1,90 @@
+"""
+Drives the MatchingService without Tk or a display, using a small stand-in for root.after.
+It types a name one character at a time into a large roster, checks that no results are delivered after a newer query's
+and that the final results match suggest_names, and reports how long the stand-in main loop was ever blocked.
+Run from the "Attendance Report Generator" directory: python benchmarks/drive_matching_service.py
+"""
+# Import modules from the standard library
+import heapq
+import itertools
+import os
+import sys
+import time
+
+# Allow the script to import the application modules
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+# Import functions from local modules
+from matching_service import MatchingService
+from name_suggestion import suggest_names, index_section
+from synthetic import synthetic_roster
+
+ROSTER_SIZE = 50_000
+TICK_MS = 5
+
+class HeadlessScheduler:
+    """A minimal event loop with the same after(milliseconds, callback) signature as a Tk widget."""
+
+    def __init__(self) -> None:
+        self.events = []
+        self.counter = itertools.count()
+
+    def after(self, milliseconds: int, callback) -> None:
+        heapq.heappush(self.events, (time.perf_counter() + milliseconds / 1000, next(self.counter), callback))
+
+    def run_until(self, done) -> None:
+        while not done():
+            due, _, callback = heapq.heappop(self.events)
+            time.sleep(max(0.0, due - time.perf_counter()))
+            callback()
+
+def main() -> None:
+    section = "benchmark"
+    student_list = synthetic_roster(ROSTER_SIZE)
+    students = {section: student_list}
+    index_section(section, student_list)
+
+    scheduler = HeadlessScheduler()
+    service = MatchingService(students, scheduler.after)
+    delivered = []
+
+    # Type the name one keystroke per tick, submitting every prefix without waiting for results
+    name = student_list[ROSTER_SIZE // 2]
+    last_name, first_name = name.split(", ")
+    typed = f"{first_name} {last_name}"
+    for length in range(1, len(typed) + 1):
+        scheduler.after(length * TICK_MS, lambda query=typed[:length]: service.submit(query, section, lambda results, query=query: delivered.append((query, results))))
+
+    # Done once the whole name has been typed and its results delivered (queries that finish before the next keystroke are delivered too)
+    def finished() -> bool:
+        return bool(delivered) and delivered[-1][0] == typed and not service.outstanding
+
+    # A heartbeat standing in for the rest of the Tk event loop, to measure how long it was ever blocked
+    gaps = []
+    last_beat = [time.perf_counter()]
+    def heartbeat() -> None:
+        now = time.perf_counter()
+        gaps.append(now - last_beat[0])
+        last_beat[0] = now
+        if not finished():
+            scheduler.after(TICK_MS, heartbeat)
+    scheduler.after(TICK_MS, heartbeat)
+
+    start = time.perf_counter()
+    scheduler.run_until(finished)
+    elapsed = time.perf_counter() - start
+    service.shutdown()
+
+    start = time.perf_counter()
+    expected = suggest_names(typed, section, students)
+    blocking = time.perf_counter() - start
+
+    lengths = [len(query) for query, results in delivered]
+    assert lengths == sorted(lengths), f"superseded results were delivered: {[query for query, results in delivered]}"
+    assert delivered[-1][1] == expected, "background results differ from suggest_names"
+    print(f"{len(typed)} queries submitted, {len(delivered)} delivered, {service.discarded} discarded")
+    print(f"time to final results: {elapsed * 1000:.1f} ms")
+    print(f"longest main loop stall: {max(gaps) * 1000:.1f} ms (scoring on the main loop blocks for {blocking * 1000:.1f} ms per query)")
+
+if __name__ == "__main__":
+    main()
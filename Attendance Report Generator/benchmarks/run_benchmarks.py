@@ -0,0 +1,235 @@
+"""
+Reproducible benchmark suite for the app's non-GUI core, so every performance change can be measured the same way.
+A synthetic department (rosters of "Last, First" names and years of attendance reports) is generated in a temporary directory
+at the chosen scale, and each benchmark is run several times; the median, fastest, and slowest runs are reported in milliseconds.
+The results are written as JSON and, if a baseline is given (or benchmarks/baseline.json exists), compared against it:
+a benchmark whose median is more than --tolerance slower than the baseline's is a regression, and the script exits with status 1.
+
+Run from the "Attendance Report Generator" directory:
+    python benchmarks/run_benchmarks.py --scale small --save-baseline
+    python benchmarks/run_benchmarks.py --scale small --output results.json
+    python benchmarks/run_benchmarks.py --scale medium --storage sqlite --only suggest_names frequency
+"""
+# Import modules from the standard library
+import argparse
+import datetime
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+# Allow the benchmarks to import the application modules
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+# Import functions from local modules
+from frequency_report import read_attendance_reports, write_frequency_report
+from attendance_store import attendance_stores, store_path
+from name_suggestion import suggest_names, name_indexes, batch_scorers, suggestion_cache
+from report_catalog import report_catalogs, catalog_path
+from roster_creator import create_rosters, create_rosters_streaming
+from section_manager import load_sections, RosterCache
+from storage import TextBackend, get_storage, set_storage_backend, migrate_text_to_sqlite
+from synthetic import synthetic_queries, write_synthetic_sections, write_synthetic_export
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+BASELINE_PATH = os.path.join(BENCHMARK_DIR, "baseline.json")
+
+# Size of the synthetic department at each scale
+SCALES = {
+    "small": {"sections": 4, "students": 60, "years": 1, "queries": 50, "export_rows": 2_000},
+    "medium": {"sections": 20, "students": 300, "years": 2, "queries": 200, "export_rows": 20_000},
+    "large": {"sections": 60, "students": 1_000, "years": 4, "queries": 500, "export_rows": 100_000},
+}
+
+# Default number of times each benchmark is run
+REPEATS = 5
+
+# A median this much slower (as a fraction) than the baseline's is a regression, and this much faster is an improvement
+TOLERANCE = .2
+
+# Function to clear every in-memory cache
+def clear_caches() -> None:
+    """Forgets the loaded attendance stores, report catalogs, name indexes, and cached suggestions, as if the app had just started."""
+    attendance_stores.clear()
+    report_catalogs.clear()
+    name_indexes.clear()
+    batch_scorers.clear()
+    suggestion_cache.clear()
+
+# Function to remove the files derived from the text reports
+def remove_derived_files(sections: list[str]) -> None:
+    """Removes every section's attendance store and report catalog, so the next read has to rebuild them from the text reports."""
+    clear_caches()
+    if isinstance(get_storage(), TextBackend):
+        for section in sections:
+            for path in [store_path(section), catalog_path(section)]:
+                if os.path.exists(path):
+                    os.remove(path)
+
+# Function to time a benchmark
+def measure(function, repeats: int, setup=None, per: int = 1) -> dict:
+    """
+    Runs setup (untimed) and then function the given number of times, and returns the median, fastest, and slowest run in milliseconds.
+    If per is given, each time is divided by it (e.g. to report the time per query of a run over many queries).
+    """
+    times = []
+    for _ in range(repeats):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        function()
+        times.append((time.perf_counter() - start) * 1000 / per)
+    return {"median_ms": round(statistics.median(times), 4), "min_ms": round(min(times), 4), "max_ms": round(max(times), 4), "repeats": repeats}
+
+# Function to describe the run
+def run_metadata(scale: str, config: dict, storage_backend: str, seed: int) -> dict:
+    """Returns what the results depend on: the scale, the storage backend, the seed, the commit, and the machine."""
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BENCHMARK_DIR, capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "scale": scale,
+        **config,
+        "storage": storage_backend,
+        "seed": seed,
+        "commit": commit,
+        "time": datetime.datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "processor": platform.processor() or platform.machine(),
+    }
+
+# Function to run every benchmark
+def run_benchmarks(config: dict, storage_backend: str, repeats: int, seed: int, only: list[str] = None) -> dict[str, dict]:
+    """Generates the synthetic department in the current directory and runs the benchmarks (or only those named), returning their timings by name."""
+    rosters = write_synthetic_sections(TextBackend(), config["sections"], config["students"], config["years"], seed)
+    if storage_backend == "sqlite":
+        migrate_text_to_sqlite()
+    set_storage_backend(storage_backend)
+    clear_caches()
+    sections = list(rosters)
+    students = {section: rosters[section] for section in sections}
+    queries = synthetic_queries(rosters[sections[0]], config["queries"], seed)
+
+    export_sections = {f"2252-UTDAL-CS-{1000 + i}-SEC001-2300{i}": f"Export {i}" for i in range(min(config["sections"], 8))}
+    write_synthetic_export("export.html", config["export_rows"], list(export_sections), seed)
+    export_outputs = {name: os.path.join("raw_rosters", f"{name}.txt") for name in export_sections.values()}
+    os.makedirs("raw_rosters", exist_ok=True)
+
+    benchmarks = {
+        # Name suggestions for one section, per query, with its index already built but nothing in the suggestion cache
+        "suggest_names": (lambda: [suggest_names(query, sections[0], students) for query in queries], suggestion_cache.clear, len(queries)),
+        # The same queries again, as when backspacing and retyping, answered from the suggestion cache
+        "suggest_names_cached": (lambda: [suggest_names(query, sections[0], students) for query in queries], None, len(queries)),
+        # Reading every roster (what load_students_from_file used to do)
+        "read_roster": (lambda: [get_storage().read_roster(section) for section in sections], None, 1),
+        # Loading every section into a plain dict, which reads and indexes every roster
+        "load_sections": (lambda: load_sections({}), clear_caches, 1),
+        # Loading every section into the app's RosterCache, which only lists the rosters until a section is used
+        "load_sections_lazy": (lambda: load_sections(RosterCache()), clear_caches, 1),
+        # Reading every report of every section, with the attendance stores and catalogs rebuilt from the text reports
+        "read_attendance_reports_cold": (lambda: [read_attendance_reports(section) for section in sections], lambda: remove_derived_files(sections), 1),
+        # Reading every report of every section again, as the app does after the first time
+        "read_attendance_reports_warm": (lambda: [read_attendance_reports(section) for section in sections], None, 1),
+        # Writing every section's frequency report
+        "frequency": (lambda: [write_frequency_report(section, "frequency_report.csv") for section in sections], None, 1),
+        # Extracting rosters from a registrar export, with BeautifulSoup and with the streaming parser
+        "create_rosters": (lambda: create_rosters("export.html", export_sections, export_outputs), None, 1),
+        "create_rosters_streaming": (lambda: create_rosters_streaming("export.html", export_sections, export_outputs), None, 1),
+    }
+
+    results = {}
+    for name, (function, setup, per) in benchmarks.items():
+        if only and name not in only:
+            continue
+        # Run once first so that the warm benchmarks start warm
+        if setup is not None:
+            setup()
+        function()
+        results[name] = measure(function, repeats, setup, per)
+        print(f"{name:>30} {results[name]['median_ms']:>12.3f} {results[name]['min_ms']:>12.3f} {results[name]['max_ms']:>12.3f}", flush=True)
+    return results
+
+# Function to compare results with a baseline
+def compare_with_baseline(results: dict[str, dict], baseline: dict, tolerance: float = TOLERANCE) -> dict[str, dict]:
+    """
+    Compares each benchmark's median with the baseline's, returning the ratio (current / baseline) and a status for each
+    benchmark in both: "regression", "improvement", or "unchanged" (within the tolerance).
+    """
+    comparison = {}
+    for name, result in results.items():
+        if name not in baseline["results"]:
+            continue
+        ratio = result["median_ms"] / max(baseline["results"][name]["median_ms"], 1e-9)
+        status = "regression" if ratio > 1 + tolerance else "improvement" if ratio < 1 - tolerance else "unchanged"
+        comparison[name] = {"baseline_ms": baseline["results"][name]["median_ms"], "median_ms": result["median_ms"], "ratio": round(ratio, 3), "status": status}
+    return comparison
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Run the benchmark suite on a synthetic department and compare the results with a baseline.")
+    parser.add_argument("--scale", choices=list(SCALES), default="small", help="size of the synthetic department (defaults to small)")
+    parser.add_argument("--sections", type=int, help="override the scale's number of sections")
+    parser.add_argument("--students", type=int, help="override the scale's number of students per section")
+    parser.add_argument("--years", type=int, help="override the scale's years of reports")
+    parser.add_argument("--storage", choices=["text", "sqlite"], default="text", help="storage backend to benchmark (defaults to text)")
+    parser.add_argument("--repeats", type=int, default=REPEATS, help=f"number of timed runs of each benchmark (defaults to {REPEATS})")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the synthetic data (defaults to 0)")
+    parser.add_argument("--only", nargs="+", help="only run these benchmarks")
+    parser.add_argument("--output", help="write the results to this JSON file")
+    parser.add_argument("--baseline", help=f"compare with this results file (defaults to {os.path.relpath(BASELINE_PATH)} if it exists)")
+    parser.add_argument("--save-baseline", action="store_true", help="save the results as the baseline instead of comparing with it")
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE, help=f"fraction a median may slow down before it is a regression (defaults to {TOLERANCE})")
+    args = parser.parse_args()
+
+    config = dict(SCALES[args.scale])
+    for key in ["sections", "students", "years"]:
+        if getattr(args, key) is not None:
+            config[key] = getattr(args, key)
+    output_path = os.path.abspath(args.output) if args.output else None
+    baseline_path = os.path.abspath(args.baseline or BASELINE_PATH)
+
+    print(f"{args.scale}: {config['sections']} sections, {config['students']} students each, {config['years']} years of reports ({args.storage} storage)")
+    print(f"{'benchmark':>30} {'median (ms)':>12} {'min (ms)':>12} {'max (ms)':>12}")
+    working_dir = os.getcwd()
+    with tempfile.TemporaryDirectory() as directory:
+        os.chdir(directory)
+        try:
+            results = run_benchmarks(config, args.storage, args.repeats, args.seed, args.only)
+        finally:
+            os.chdir(working_dir)
+    report = {"metadata": run_metadata(args.scale, config, args.storage, args.seed), "results": results}
+
+    regressions = []
+    if args.save_baseline:
+        with open(baseline_path, "w") as file:
+            json.dump(report, file, indent=1)
+        print(f"Baseline saved to {baseline_path}")
+    elif os.path.exists(baseline_path):
+        with open(baseline_path, "r") as file:
+            baseline = json.load(file)
+        # Results are only comparable at the same scale and with the same backend
+        for key in ["sections", "students", "years", "storage", "seed"]:
+            if baseline["metadata"].get(key) != report["metadata"][key]:
+                print(f"Warning: the baseline's {key} is {baseline['metadata'].get(key)!r}, not {report['metadata'][key]!r}")
+        report["comparison"] = compare_with_baseline(results, baseline, args.tolerance)
+        report["baseline"] = {"path": baseline_path, "commit": baseline["metadata"].get("commit"), "time": baseline["metadata"].get("time")}
+        print(f"\nCompared with {baseline_path} (commit {baseline['metadata'].get('commit')}):")
+        for name, row in report["comparison"].items():
+            print(f"{name:>30} {row['baseline_ms']:>12.3f} -> {row['median_ms']:>10.3f} ms  {row['ratio']:>6.2f}x  {row['status']}")
+        regressions = [name for name, row in report["comparison"].items() if row["status"] == "regression"]
+        if regressions:
+            print(f"{len(regressions)} regression(s): {', '.join(regressions)}")
+
+    if output_path:
+        with open(output_path, "w") as file:
+            json.dump(report, file, indent=1)
+        print(f"Results written to {output_path}")
+    return 1 if regressions else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
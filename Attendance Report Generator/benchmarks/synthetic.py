@@ -0,0 +1,91 @@
+# Import modules from the standard library
+import datetime
+import random
+
+# Syllables used to build synthetic first and last names
+SYLLABLES = ["an", "be", "car", "da", "el", "fa", "gor", "ha", "is", "jo", "ka", "li", "mar", "ne", "o", "pa", "quin", "ro", "sa", "ta", "u", "ve", "wil", "xa", "ya", "zo", "son", "ton", "ley", "ez"]
+
+# Function to create a single synthetic name part
+def synthetic_name_part(rng: random.Random) -> str:
+    """Creates a capitalized name part made of two to four syllables."""
+    return "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))).capitalize()
+
+# Function to create a synthetic roster
+def synthetic_roster(size: int, seed: int = 0) -> list[str]:
+    """Creates a roster of the given size with names in the form of "Last, First"."""
+    rng = random.Random(seed)
+    return [f"{synthetic_name_part(rng)}, {synthetic_name_part(rng)}" for _ in range(size)]
+
+# Function to create a misspelled query for a name
+def synthetic_query(name: str, rng: random.Random) -> str:
+    """Creates a query like one typed from a sign-in sheet: "First Last", a partial last name, or a name with a typo."""
+    last_name, first_name = name.split(", ")
+    kind = rng.randint(0, 2)
+    if kind == 0:
+        return f"{first_name} {last_name}"
+    if kind == 1:
+        return last_name[:max(3, len(last_name) // 2)]
+    # Swap two neighbouring characters to simulate a typo
+    i = rng.randrange(len(last_name) - 1)
+    typo = last_name[:i] + last_name[i + 1] + last_name[i] + last_name[i + 2:]
+    return f"{typo} {first_name}"
+
+# Function to create a list of queries for a roster
+def synthetic_queries(student_list: list[str], count: int, seed: int = 0) -> list[str]:
+    """Creates the given number of queries for randomly chosen names in the roster."""
+    rng = random.Random(seed)
+    return [synthetic_query(rng.choice(student_list), rng) for _ in range(count)]
+
+# Function to create a synthetic registrar export
+def write_synthetic_export(path: str, rows: int, section_ids: list[str], seed: int = 0) -> None:
+    """
+    Writes an HTML table laid out like the registrar's roster export that roster_creator reads:
+    one <tr> per student with whitespace between the cells, the first and last name in the third and fourth cells,
+    and the course ID in the ninth cell, each padded with the whitespace that roster_creator strips off.
+    """
+    rng = random.Random(seed)
+    with open(path, "w") as file:
+        file.write("<html><body><table>\n")
+        for i in range(rows):
+            first_name = synthetic_name_part(rng)
+            last_name = synthetic_name_part(rng)
+            cells = [
+                f"{i}",
+                f"{2021000000 + i}",
+                "\n" + " " * 13 + first_name + "\n",
+                "\n" + " " * 12 + last_name + "\n",
+                f"{first_name.lower()}.{last_name.lower()}@example.edu",
+                "Undergraduate",
+                "Computer Science",
+                "Enrolled",
+                "\n" + " " * 18 + rng.choice(section_ids) + "\n ",
+            ]
+            file.write("<tr>\n" + "\n".join(f"<td>{cell}</td>" for cell in cells) + "\n</tr>\n")
+        file.write("</table></body></html>\n")
+
+# Function to create the meeting dates of a synthetic schedule
+def synthetic_meeting_dates(start: datetime.date, weeks: int, days: list[int]) -> list[str]:
+    """Returns the dates (in the MM-DD-YYYY format of the report files) a section meets on the given weekdays (0 is the start's weekday) for the given number of weeks."""
+    return [(start + datetime.timedelta(weeks=week, days=day)).strftime("%m-%d-%Y") for week in range(weeks) for day in days]
+
+# Function to create a synthetic department of sections
+def write_synthetic_sections(storage, sections: int, students: int, years: int, seed: int = 0, start: datetime.date = datetime.date(2022, 1, 10)) -> dict[str, list[str]]:
+    """
+    Writes the rosters and years of attendance reports of the given number of sections through a storage backend, and returns each section's roster.
+    Sections alternate between Monday/Wednesday and Tuesday/Thursday meetings, every fifth one also meets on Friday,
+    and each student has their own chance of attending, so some attend nearly always and some fall behind.
+    """
+    rng = random.Random(seed)
+    rosters = {}
+    for section_number in range(sections):
+        section = f"CS {1000 + section_number}.001"
+        roster = synthetic_roster(students, seed=seed * 100_003 + section_number)
+        storage.write_roster(section, roster)
+        days = [0, 2] if section_number % 2 == 0 else [1, 3]
+        if section_number % 5 == 0:
+            days.append(4)
+        chances = {name: rng.uniform(.5, 1) for name in roster}
+        dates = synthetic_meeting_dates(start, 52 * years, days)
+        storage.save_reports(section, {date: [name for name in roster if rng.random() < chances[name]] for date in dates})
+        rosters[section] = roster
+    return rosters
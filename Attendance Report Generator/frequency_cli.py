@@ -0,0 +1,84 @@
+"""
+Generates frequency reports for every section under reports/ from the command line, without the GUI.
+Sections are processed in parallel by a pool of worker processes, and the time each one took is printed as it finishes.
+
+Examples (run from the directory that contains rosters/ and reports/):
+    python frequency_cli.py
+    python frequency_cli.py --start 01-13-2025 --end 03-14-2025 --output-dir midterm_reports
+    python frequency_cli.py --sections "CS 4349.001 - MW 11_30am" --workers 1
+    python frequency_cli.py --storage sqlite --database attendance.db
+"""
+# Import modules from the standard library
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import argparse
+import datetime
+import os
+import time
+
+# Import functions from local modules
+from frequency_report import write_frequency_report
+from storage import get_storage, set_storage_backend, ROSTER_DIR, DATABASE_PATH
+
+# Function to find every section that has reports
+def find_sections() -> list[str]:
+    """Returns the names of every section that has both a roster and at least one report."""
+    storage = get_storage()
+    return sorted(section for section in storage.list_sections() if storage.report_dates(section))
+
+# Function to generate one section's report in a worker process
+def run_section(section: str, output_dir: str, start_date: datetime.date, end_date: datetime.date) -> tuple[str, int, float, str]:
+    """Writes the section's frequency report and returns (section, students written, seconds taken, error message or None)."""
+    start = time.perf_counter()
+    try:
+        if section not in get_storage().list_sections():
+            return section, 0, time.perf_counter() - start, "no roster found"
+        output_path = os.path.join(output_dir, f"{section}.csv") if output_dir else None
+        rows = write_frequency_report(section, output_path, start_date, end_date)
+        return section, rows, time.perf_counter() - start, None
+    except Exception as error:
+        return section, 0, time.perf_counter() - start, str(error)
+
+# Function to parse a date argument
+def parse_date(value: str) -> datetime.date:
+    """Parses a date in the same MM-DD-YYYY format that the reports are named with."""
+    try:
+        return datetime.datetime.strptime(value, "%m-%d-%Y").date()
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"'{value}' is not a date in the format MM-DD-YYYY")
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Generate attendance frequency reports for every section, without the GUI.")
+    parser.add_argument("--sections", nargs="+", help="only generate reports for these sections (defaults to every section under reports/)")
+    parser.add_argument("--start", type=parse_date, help="only count reports on or after this date (MM-DD-YYYY)")
+    parser.add_argument("--end", type=parse_date, help="only count reports on or before this date (MM-DD-YYYY)")
+    parser.add_argument("--output-dir", help="write <section>.csv files here instead of reports/<section>/frequency_report.csv")
+    parser.add_argument("--workers", type=int, default=None, help="number of worker processes (defaults to the number of CPUs)")
+    parser.add_argument("--storage", choices=["text", "sqlite"], default="text", help="where the rosters and reports are kept (defaults to the rosters/ and reports/ text files)")
+    parser.add_argument("--database", default=DATABASE_PATH, help="database file for --storage sqlite (defaults to attendance.db)")
+    args = parser.parse_args()
+    set_storage_backend(args.storage, database=args.database)
+
+    sections = args.sections or find_sections()
+    if not sections:
+        print("No sections with both a roster and reports found")
+        return
+    if args.output_dir:
+        os.makedirs(args.output_dir, exist_ok=True)
+
+    start = time.perf_counter()
+    failures = 0
+    # Each worker process opens the same storage backend
+    with ProcessPoolExecutor(max_workers=args.workers, initializer=set_storage_backend, initargs=(args.storage, ROSTER_DIR, args.database)) as executor:
+        futures = [executor.submit(run_section, section, args.output_dir, args.start, args.end) for section in sections]
+        for future in as_completed(futures):
+            section, rows, seconds, error = future.result()
+            if error:
+                failures += 1
+                print(f"{seconds * 1000:9.1f} ms  {section}: FAILED ({error})")
+            else:
+                print(f"{seconds * 1000:9.1f} ms  {section}: {rows} students")
+
+    print(f"Generated {len(sections) - failures} of {len(sections)} reports in {time.perf_counter() - start:.2f} s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""
+Frequency reports without the GUI, so they can be written on a Python built without Tk (see frequency_cli.py).
+attendance_frequency.py wraps write_frequency_report with the GUI's confirmation dialogs.
+"""
+# Import modules from the standard library
+from collections import Counter
+import os
+import datetime
+
+# Import functions from local modules
+from report_catalog import in_range
+from report_writer import pending_reports
+from storage import get_storage
+
+# Function to write a section's frequency report without any dialogs
+def write_frequency_report(section: str, output_path: str = None, start_date: datetime.date = None, end_date: datetime.date = None) -> int:
+    """
+    Writes the frequency report (CSV file) for the section to output_path, or to reports/<section>/frequency_report.csv.
+    If a start or end date is given, only the reports from that range (inclusive) are counted.
+    Reports that were saved in the GUI but are still waiting on the report writer thread are counted in place of the stored ones.
+    Returns the number of students written to the report.
+    """
+    storage = get_storage()
+    # The writer thread cannot write while the backend's lock is held, so the waiting reports, the tallies,
+    # and the stored reports they replace are all read as of the same moment
+    with storage.lock:
+        # Counted by the storage backend: from the attendance store's running tallies, or a single GROUP BY query in the database
+        frequency = storage.frequency(section, start_date, end_date)
+        pending = pending_reports(section)
+        if pending:
+            frequency = Counter(frequency)
+            for date, names in pending.items():
+                if in_range(date, start_date, end_date):
+                    frequency.subtract(storage.read_report(section, date) or [])
+                    frequency.update(names)
+
+    rows = 0
+    if output_path is None:
+        # The database backend may not have a report directory for the section
+        os.makedirs(f"reports/{section}", exist_ok=True)
+    # Open a file to write the report to
+    with open(output_path or f"reports/{section}/frequency_report.csv", "w") as file:
+        # Write the header row
+        file.write("Last Name,First Name,Frequency\n")
+
+        # Write the frequency report for each student in the same order as in the original roster
+        for name in get_storage().read_roster(section):
+            # Name is in form of "Last Name, First Name", and students without any attendance simply have a frequency of 0
+            last_name, first_name = name.split(", ", 1)
+            file.write(f"{last_name},{first_name},{frequency.get(name, 0)}\n")
+            rows += 1
+    return rows
+
+def read_attendance_reports(section: str) -> dict[str, list[str]]:
+    """Reads all of the attendance reports for a given section and returns them as a dictionary."""
+    return get_storage().read_reports(section)
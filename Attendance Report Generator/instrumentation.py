@@ -0,0 +1,247 @@
+"""
+Optional instrumentation for the GUI app, off unless it is switched on when the app starts:
+    python main.py --instrument                       (or ATTENDANCE_INSTRUMENT=1)
+    python main.py --instrument-log timings.csv       (or ATTENDANCE_INSTRUMENT_LOG=timings.csv)
+    python main.py --profile session.prof             (or ATTENDANCE_PROFILE=session.prof)
+
+When it is on, the app's hot-path functions (the handlers wired up in main.py and the scoring, repainting, and file reading they call)
+are wrapped to record a latency histogram per function and count the files each one opens, scans, renames, or removes.
+A snapshot of every histogram is appended to a rolling JSON lines or CSV log once a minute and when the app closes,
+along with the app's own counters (startup phases, suggestion latency, and the suggestion cache) recorded with record_stats,
+and the log is rotated to <log>.1 once it grows past LOG_MAX_BYTES.
+--profile runs the whole session under cProfile and dumps the stats when the app closes.
+"""
+# Import modules from the standard library
+import argparse
+import csv
+import functools
+import importlib
+import json
+import os
+import sys
+import threading
+import time
+
+# Functions that are instrumented, by the module that defines them ("Class.method" for methods).
+# Keystrokes in the name entry go to SuggestionEngine, whose run_query is the debounced handler that scores and repaints each query
+INSTRUMENTED_FUNCTIONS = {
+    "suggestion_engine": ["SuggestionEngine.run_query"],
+    "name_suggestion": ["suggest_names", "update_suggestion_listbox"],
+    "attendance_report_file_manager": ["add_to_attendance", "remove_from_attendance", "save_attendance", "load_reports_for_section", "load_attendance_for_report"],
+    "attendance_frequency": ["generate_frequency_report"],
+    "frequency_report": ["write_frequency_report", "read_attendance_reports"],
+    "section_manager": ["load_sections", "add_new_roster", "remove_roster"],
+}
+
+# Upper bounds (in milliseconds) of the latency histogram buckets; anything slower goes in a final overflow bucket
+BUCKET_BOUNDS_MS = [0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000]
+
+# Audit events that count as I/O, and the counter each one is added to
+IO_EVENTS = {"open": "opens", "os.scandir": "scans", "os.listdir": "scans", "os.rename": "renames", "os.remove": "removes"}
+
+# Directory of the app's modules, which are the only ones searched for imported copies of the instrumented functions
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Default log file, and the size at which it is rotated
+LOG_PATH = "instrumentation.jsonl"
+LOG_MAX_BYTES = 1 << 20
+
+# Milliseconds between snapshots written to the log while the app is running
+LOG_INTERVAL_MS = 60_000
+
+class Histogram:
+    """Latencies of one function, counted in BUCKET_BOUNDS_MS buckets, along with its I/O counters."""
+
+    def __init__(self) -> None:
+        self.buckets = [0] * (len(BUCKET_BOUNDS_MS) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.io = dict.fromkeys(sorted(set(IO_EVENTS.values())), 0)
+
+    def record(self, latency_ms: float) -> None:
+        bucket = next((i for i, bound in enumerate(BUCKET_BOUNDS_MS) if latency_ms <= bound), len(BUCKET_BOUNDS_MS))
+        self.buckets[bucket] += 1
+        self.count += 1
+        self.total_ms += latency_ms
+        self.max_ms = max(self.max_ms, latency_ms)
+
+    def percentile(self, fraction: float) -> float:
+        """Returns the upper bound of the bucket holding the given fraction of calls, or the slowest call if that is lower."""
+        seen = 0
+        for i, count in enumerate(self.buckets):
+            seen += count
+            if count and seen >= fraction * self.count:
+                return round(min(BUCKET_BOUNDS_MS[i], self.max_ms), 3) if i < len(BUCKET_BOUNDS_MS) else round(self.max_ms, 3)
+        return 0.0
+
+    def summary(self) -> dict:
+        return {
+            "calls": self.count,
+            "mean_ms": round(self.total_ms / self.count, 3) if self.count else 0.0,
+            "p50_ms": self.percentile(.5),
+            "p95_ms": self.percentile(.95),
+            "max_ms": round(self.max_ms, 3),
+            **self.io,
+        }
+
+# Histograms of every instrumented function, by its qualified name (e.g. "name_suggestion.suggest_names")
+histograms = {}
+
+# The latest counters recorded by the app with record_stats, by name (e.g. "startup")
+app_stats = {}
+
+# The instrumented calls running on each thread, innermost last, so that I/O is counted against every one of them
+active_calls = threading.local()
+
+# Settings chosen by configure_instrumentation, and the profiler if --profile was given
+settings = {"enabled": False, "log_path": LOG_PATH, "profile_path": None}
+profiler = None
+
+# Function to wrap a function with a latency histogram
+def instrument_function(name: str, function):
+    """Returns a wrapper that records the latency of every call to the function in histograms[name]."""
+    histogram = histograms.setdefault(name, Histogram())
+
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        calls = active_calls.__dict__.setdefault("calls", [])
+        calls.append(histogram)
+        start = time.perf_counter()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            histogram.record((time.perf_counter() - start) * 1000)
+            calls.pop()
+    wrapper.instrumented = True
+    return wrapper
+
+# Audit hook that counts I/O against the calls that are running
+def count_io(event: str, args: tuple) -> None:
+    counter = IO_EVENTS.get(event)
+    if counter is not None:
+        for histogram in getattr(active_calls, "calls", ()):
+            histogram.io[counter] += 1
+
+# Function to instrument every hot-path function
+def install() -> None:
+    """
+    Wraps every function in INSTRUMENTED_FUNCTIONS, replacing it both in the module that defines it
+    and in every loaded module that imported it by name (including main.py), so every caller goes through the wrapper.
+    Methods are replaced on their class, so every instance (including ones already created) goes through the wrapper.
+    """
+    for module_name, function_names in INSTRUMENTED_FUNCTIONS.items():
+        module = importlib.import_module(module_name)
+        for function_name in function_names:
+            if "." in function_name:
+                class_name, method_name = function_name.split(".")
+                cls = getattr(module, class_name)
+                if not getattr(cls.__dict__[method_name], "instrumented", False):
+                    setattr(cls, method_name, instrument_function(f"{module_name}.{function_name}", cls.__dict__[method_name]))
+                continue
+            function = getattr(module, function_name)
+            if getattr(function, "instrumented", False):
+                continue
+            wrapper = instrument_function(f"{module_name}.{function_name}", function)
+            for loaded in list(sys.modules.values()):
+                loaded_file = getattr(loaded, "__file__", None)
+                if loaded_file and os.path.dirname(os.path.abspath(loaded_file)) == APP_DIR and getattr(loaded, function_name, None) is function:
+                    setattr(loaded, function_name, wrapper)
+    # Audit hooks cannot be removed, so one is only added once instrumentation is switched on
+    sys.addaudithook(count_io)
+
+# Function to switch instrumentation on from the command line or environment
+def configure_instrumentation(argv: list[str] = None) -> bool:
+    """
+    Reads --instrument, --instrument-log, and --profile from argv (ignoring any other arguments),
+    falling back to the ATTENDANCE_INSTRUMENT, ATTENDANCE_INSTRUMENT_LOG, and ATTENDANCE_PROFILE environment variables.
+    Installs the wrappers and starts the profiler as needed, and returns whether instrumentation is on.
+    """
+    global profiler
+    parser = argparse.ArgumentParser(add_help=False)
+    parser.add_argument("--instrument", action="store_true")
+    parser.add_argument("--instrument-log")
+    parser.add_argument("--profile")
+    args, _ = parser.parse_known_args(sys.argv[1:] if argv is None else argv)
+
+    log_path = args.instrument_log or os.environ.get("ATTENDANCE_INSTRUMENT_LOG")
+    settings["enabled"] = bool(args.instrument or log_path or os.environ.get("ATTENDANCE_INSTRUMENT", "") not in ("", "0"))
+    settings["log_path"] = log_path or LOG_PATH
+    settings["profile_path"] = args.profile or os.environ.get("ATTENDANCE_PROFILE")
+
+    if settings["enabled"]:
+        install()
+    if settings["profile_path"]:
+        import cProfile
+        profiler = cProfile.Profile()
+        profiler.enable()
+    return settings["enabled"]
+
+# Function to record a set of the app's counters
+def record_stats(name: str, values: dict) -> None:
+    """Keeps the counters to be written with every snapshot (replacing any recorded under the same name), if instrumentation is on."""
+    if settings["enabled"]:
+        app_stats[name] = dict(values)
+
+# Function to write a snapshot of every histogram to the log
+def write_snapshot(log_path: str = None) -> None:
+    """
+    Appends the current histograms and recorded counters to the log (CSV if its name ends in .csv, JSON lines otherwise),
+    rotating it first if it is too large. In a CSV log each set of counters is one row, with the counters as JSON in its details column.
+    """
+    log_path = log_path or settings["log_path"]
+    if os.path.exists(log_path) and os.path.getsize(log_path) > LOG_MAX_BYTES:
+        os.replace(log_path, log_path + ".1")
+
+    timestamp = time.strftime("%Y-%m-%dT%H:%M:%S")
+    used = {name: histogram for name, histogram in histograms.items() if histogram.count}
+    rows = [{"time": timestamp, "function": name, **histogram.summary()} for name, histogram in used.items()]
+    if log_path.endswith(".csv"):
+        new_file = not os.path.exists(log_path)
+        with open(log_path, "a", newline="") as file:
+            writer = csv.DictWriter(file, fieldnames=["time", "function", "calls", "mean_ms", "p50_ms", "p95_ms", "max_ms", *Histogram().io, "details"])
+            if new_file:
+                writer.writeheader()
+            writer.writerows(rows)
+            writer.writerows({"time": timestamp, "function": name, "details": json.dumps(values)} for name, values in app_stats.items())
+    else:
+        with open(log_path, "a") as file:
+            for row, histogram in zip(rows, used.values()):
+                row["buckets"] = dict(zip([str(bound) for bound in BUCKET_BOUNDS_MS] + ["overflow"], histogram.buckets))
+                file.write(json.dumps(row) + "\n")
+            for name, values in app_stats.items():
+                file.write(json.dumps({"time": timestamp, "stats": name, **values}) + "\n")
+
+# Function to write snapshots while the app is running
+def schedule_snapshots(root) -> None:
+    """Writes a snapshot to the log every LOG_INTERVAL_MS milliseconds using the Tk event loop, if instrumentation is on."""
+    if not settings["enabled"]:
+        return
+
+    def snapshot() -> None:
+        write_snapshot()
+        root.after(LOG_INTERVAL_MS, snapshot)
+    root.after(LOG_INTERVAL_MS, snapshot)
+
+# Function to finish instrumenting when the app closes
+def finish_instrumentation() -> None:
+    """
+    Writes a final snapshot and prints a summary (including the recorded counters) if instrumentation is on,
+    and dumps the cProfile stats if the session was profiled.
+    """
+    if settings["enabled"]:
+        write_snapshot()
+        for name, histogram in histograms.items():
+            if histogram.count:
+                summary = histogram.summary()
+                print(f"{name}: {summary['calls']} calls, mean {summary['mean_ms']} ms, p95 <= {summary['p95_ms']} ms, max {summary['max_ms']} ms, "
+                      f"{summary['opens']} opens, {summary['scans']} scans")
+        for name, values in app_stats.items():
+            print(f"{name}: {', '.join(f'{key} {value}' for key, value in values.items())}")
+        print(f"Instrumentation log written to {settings['log_path']}")
+    if profiler is not None:
+        profiler.disable()
+        profiler.dump_stats(settings["profile_path"])
+        import pstats
+        pstats.Stats(profiler).sort_stats("cumulative").print_stats(20)
+        print(f"Profile written to {settings['profile_path']}")
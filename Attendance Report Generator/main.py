@@ -1,12 +1,37 @@
 # Import modules from the standard library
+import time
+started = time.perf_counter()  # Startup is timed from here, before anything else is imported
+import os
 import tkinter as tk
-from tkinter import ttk 
+from tkinter import ttk, messagebox
 
 # Import functions from local modules
-from attendance_report_file_manager import save_attendance, remove_from_attendance, add_to_attendance, toggle_report_mode, on_report_selection
-from name_suggestion import on_name_entry
-from section_manager import load_sections, add_new_roster, remove_roster, on_section_selection
+from attendance_report_file_manager import save_attendance, remove_from_attendance, add_to_attendance, toggle_report_mode, on_report_selection, on_report_range_selection
+from report_catalog import REPORT_RANGES
+from name_suggestion import set_matching_service, set_scoring_backend, set_phonetic_matching, suggestion_cache
+from name_index import set_nicknames, read_nicknames
+from suggestion_engine import SuggestionEngine
+from matching_service import MatchingService
+from section_manager import RosterCache, load_sections, add_new_roster, remove_roster, on_section_selection
 from attendance_frequency import generate_frequency_report
+from attendance_set import AttendanceSet
+from storage import set_storage_backend
+from report_writer import start_report_writer, stop_report_writer
+from sign_in_import import import_sign_in_sheet
+from virtual_listbox import VirtualListbox
+from instrumentation import configure_instrumentation, schedule_snapshots, record_stats, finish_instrumentation
+from startup import StartupTimer, load_snapshot, restore_snapshot, save_snapshot, preload_modules
+
+# Time the hot-path handlers if the app was started with --instrument or ATTENDANCE_INSTRUMENT=1 (see instrumentation.py)
+configure_instrumentation()
+
+# Time each phase of startup, recorded in the instrumentation log once the window is showing
+startup_timer = StartupTimer(started)
+startup_timer.mark("imports")
+
+# Whether to start from the rosters and report catalogs saved when the app last closed, rather than rereading them,
+# and import the modules that are slow to import in the background once the window is showing (see startup.py)
+fast_start = True
 
 
 # Global font size variables
@@ -14,15 +39,42 @@ header_font_size = 18  # Font size for headers (labels, buttons, etc.)
 body_font_size_large = 16  # Larger of two body font sizes
 body_font_size_small = 12  # Smaller of two body font sizes
 
+# Milliseconds to wait after the last keystroke in the name entry before updating the suggestions
+suggestion_debounce_ms = 150
+
+# Backend used to score suggested names: "fuzzywuzzy", or "numpy" to score the whole roster in one vectorized pass
+scoring_backend = "fuzzywuzzy"
+set_scoring_backend(scoring_backend)
+
+# Whether suggestions first look for names that match the typed words by nickname or sound (e.g. "Bill Smyth" for "Smith, William").
+# Those names are then listed by how they matched rather than in the fuzzy order, so it is off unless turned on here
+phonetic_matching = False
+set_phonetic_matching(phonetic_matching)
+
+# Optional file of nicknames to match on top of the built-in ones, one "nickname,formal name,formal name,..." line per nickname
+nickname_file = "nicknames.csv"
+if os.path.exists(nickname_file):
+    set_nicknames(read_nicknames(nickname_file))
+
 # Directory containing roster files
 ROSTER_DIR = './rosters'
 
-# Load the sections when the program starts
-students = {}
-load_sections(ROSTER_DIR, students)
+# Where rosters and reports are kept: "text" for the rosters/ and reports/ files, or "sqlite" for a single database
+# (copy the existing files into it with "python storage.py migrate")
+storage_backend = "text"
+set_storage_backend(storage_backend, roster_dir=ROSTER_DIR)
+
+# Load the sections when the program starts (each section's students are read the first time it is selected,
+# unless they are in the snapshot and the roster has not changed since)
+students = RosterCache()
+load_sections(students)
+snapshot = load_snapshot() if fast_start else None
+if snapshot:
+    restore_snapshot(students, snapshot)
 
 # Attendance records
-attendance_reports = {section: [] for section in students}
+attendance_reports = {section: AttendanceSet() for section in students}
+startup_timer.mark("sections")
 
 
 #############################
@@ -33,6 +85,19 @@ attendance_reports = {section: [] for section in students}
 root = tk.Tk()
 root.title("Attendance Marking")
 root.geometry("1280x570")
+schedule_snapshots(root)
+startup_timer.mark("window")
+
+# Score name queries on a background thread so the window stays responsive with large rosters
+matching_service = MatchingService(students, root.after)
+set_matching_service(matching_service)
+
+# Save reports on a background thread, journaling the attendance being marked so it survives a crash,
+# and restore whatever was being marked when the app last closed
+restored_attendance = start_report_writer(attendance_reports)
+if restored_attendance:
+    messagebox.showinfo("Attendance Restored", "Restored the attendance that was being marked for: " + ", ".join(restored_attendance))
+startup_timer.mark("services")
 
 # Create a PanedWindow to split the layout into 3 vertical sections
 paned_window = tk.PanedWindow(root, orient="horizontal", sashwidth=0, sashrelief="flat")
@@ -54,11 +119,11 @@ list_frame.pack(fill=tk.Y, side=tk.LEFT, expand=False)
 # Create the listboxes and variables shared between sections #
 ##############################################################
 
-# Used for the list of suggested names
-suggestion_listbox = tk.Listbox(attendance_frame, font=("Arial", body_font_size_large), height=12, width=35)
+# Used for the list of suggested names (virtual listboxes only render the rows in view, so large rosters stay responsive)
+suggestion_listbox = VirtualListbox(attendance_frame, font=("Arial", body_font_size_large), height=12, width=35)
 
 # Used for the list of people in the attendance list
-attendance_listbox = tk.Listbox(list_frame, font=("Arial", body_font_size_large), height=16, width=35)
+attendance_listbox = VirtualListbox(list_frame, font=("Arial", body_font_size_large), height=16, width=35)
 
 # Variables for report mode and date/report selection
 report_mode_var = tk.StringVar(value="Create New Report")  # Default to "Create New Report"
@@ -82,10 +147,10 @@ section_dropdown.pack(pady=10)
 
 
 # Buttons to add and remove rosters
-add_roster_button = tk.Button(section_frame, text="Add New Section's Roster", command=lambda: add_new_roster(students, ROSTER_DIR, section_dropdown, section_var), font=("Arial", body_font_size_small))
+add_roster_button = tk.Button(section_frame, text="Add New Section's Roster", command=lambda: add_new_roster(students, section_dropdown, section_var, attendance_reports), font=("Arial", body_font_size_small))
 add_roster_button.pack(pady=10)
 
-remove_roster_button = tk.Button(section_frame, text="Remove Selected Section's Roster", command=lambda: remove_roster(students, section_var, ROSTER_DIR, section_dropdown), font=("Arial", body_font_size_small))
+remove_roster_button = tk.Button(section_frame, text="Remove Selected Section's Roster", command=lambda: remove_roster(students, section_var, section_dropdown), font=("Arial", body_font_size_small))
 remove_roster_button.pack(pady=0)
 
 
@@ -109,10 +174,10 @@ report_mode_label.pack(pady=15)
 
 
 # Add radio buttons for report selection mode
-create_report_radio = tk.Radiobutton(report_mode_frame, text="Create New Report", variable=report_mode_var, value="Create New Report", font=("Arial", body_font_size_small), command=lambda: toggle_report_mode(report_mode_var, report_mode_label, date_entry, section_var, report_dropdown, existing_reports, save_button, generate_frequency_report_button))
+create_report_radio = tk.Radiobutton(report_mode_frame, text="Create New Report", variable=report_mode_var, value="Create New Report", font=("Arial", body_font_size_small), command=lambda: toggle_report_mode(report_mode_var, report_mode_label, date_entry, section_var, report_dropdown, existing_reports, save_button, generate_frequency_report_button, report_range_dropdown))
 create_report_radio.pack(anchor="w")
 
-modify_report_radio = tk.Radiobutton(report_mode_frame, text="Modify Existing Report", variable=report_mode_var, value="Modify Existing Report", font=("Arial", body_font_size_small), command=lambda: toggle_report_mode(report_mode_var, report_mode_label, date_entry, section_var, report_dropdown, existing_reports, save_button, generate_frequency_report_button))
+modify_report_radio = tk.Radiobutton(report_mode_frame, text="Modify Existing Report", variable=report_mode_var, value="Modify Existing Report", font=("Arial", body_font_size_small), command=lambda: toggle_report_mode(report_mode_var, report_mode_label, date_entry, section_var, report_dropdown, existing_reports, save_button, generate_frequency_report_button, report_range_dropdown))
 modify_report_radio.pack(anchor="w")
 
 report_mode_frame.pack(anchor="center")
@@ -123,9 +188,15 @@ date_entry = tk.Entry(section_frame, font=("Arial", body_font_size_large), width
 date_entry.pack(pady=4)
 
 
+# Create a dropdown for narrowing the existing reports to a range of dates, initially hidden
+report_range_dropdown = ttk.Combobox(section_frame, values=REPORT_RANGES, font=("Arial", body_font_size_small), state="readonly", width=15)
+report_range_dropdown.set(REPORT_RANGES[0])
+report_range_dropdown.bind("<<ComboboxSelected>>", lambda event: on_report_range_selection(report_range_dropdown, report_mode_var, report_dropdown, existing_reports, section_var))
+
+
 # Create a dropdown for selecting existing reports, initially hidden
 report_dropdown = ttk.Combobox(section_frame, font=("Arial", body_font_size_large), state="readonly", width=30)
-report_dropdown.bind("<<ComboboxSelected>>", lambda event: on_report_selection(report_dropdown, existing_reports, section_var, attendance_listbox, attendance_reports, date_entry))
+report_dropdown.bind("<<ComboboxSelected>>", lambda event: on_report_selection(report_dropdown, existing_reports, section_var, attendance_listbox, attendance_reports, date_entry, report_mode_var))
 
 
 # Save report button 
@@ -146,7 +217,8 @@ name_label = tk.Label(attendance_frame, text="Enter Student's Name", font=("Aria
 name_label.pack(pady=10)
 
 name_entry = tk.Entry(attendance_frame, font=("Arial", body_font_size_large), width=30)
-name_entry.bind("<KeyRelease>", lambda event: on_name_entry(name_entry, section_var, students, suggestion_listbox))
+suggestion_engine = SuggestionEngine(name_entry, section_var, students, suggestion_listbox, debounce_ms=suggestion_debounce_ms, matching_service=matching_service)
+name_entry.bind("<KeyRelease>", suggestion_engine.on_key_release)
 name_entry.pack(pady=10)
 
 name_label = tk.Label(attendance_frame, text="Suggested Names", font=("Arial", header_font_size))
@@ -157,9 +229,17 @@ suggestion_listbox.bind("<Return>", func=lambda _: add_to_attendance(section_var
 suggestion_listbox.pack(pady=10)
 
 
+# Frame to hold the add and import buttons side by side
+add_buttons_frame = tk.Frame(attendance_frame)
+add_buttons_frame.pack(pady=10)
+
 # Button used for adding a user to the day's attendance
-add_button = tk.Button(attendance_frame, text="Add to Attendance", command=lambda: add_to_attendance(section_var, suggestion_listbox, attendance_listbox, attendance_reports), font=("Arial", body_font_size_large))
-add_button.pack(pady=10)
+add_button = tk.Button(add_buttons_frame, text="Add to Attendance", command=lambda: add_to_attendance(section_var, suggestion_listbox, attendance_listbox, attendance_reports), font=("Arial", body_font_size_large))
+add_button.pack(side=tk.LEFT, padx=5)
+
+# Button used for adding everyone on a sign-in sheet to the day's attendance
+import_button = tk.Button(add_buttons_frame, text="Import Sign-In Sheet", command=lambda: import_sign_in_sheet(root, section_var, students, attendance_listbox, attendance_reports), font=("Arial", body_font_size_small))
+import_button.pack(side=tk.LEFT, padx=5)
 
 #############################################
 # SECTION 3: Attendance list, remove button #
@@ -183,6 +263,27 @@ remove_button.pack(pady=10)
 paned_window.add(section_frame, minsize=340)
 paned_window.add(attendance_frame, minsize=420)
 paned_window.add(list_frame, minsize=420)
+startup_timer.mark("widgets")
+
+# Once the window has been drawn, record how long startup took and start importing the modules that were left out of it
+def on_startup_finished() -> None:
+    startup_timer.mark("first paint")
+    record_stats("startup", {**{f"{phase}_ms": round(ms, 1) for phase, ms in startup_timer.phases.items()}, "total_ms": round(startup_timer.total_ms(), 1)})
+    if fast_start:
+        preload_modules()
+root.after_idle(on_startup_finished)
 
 # Run the main loop
-root.mainloop()
\ No newline at end of file
+root.mainloop()
+matching_service.shutdown()
+# Write any reports that are still waiting to be saved
+stop_report_writer()
+# Save the rosters and report catalogs that were read, so the next start does not have to read them again
+if fast_start:
+    save_snapshot(students, snapshot)
+
+# Record how long it took from typing a name to seeing the suggestions, and how often the suggestion cache was hit,
+# in the instrumentation log (only if the app was started with --instrument)
+record_stats("suggestion_latency", suggestion_engine.latency_stats())
+record_stats("suggestion_cache", suggestion_cache.stats())
+finish_instrumentation()
\ No newline at end of file
@@ -0,0 +1,88 @@
+# Import modules from the standard library
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable
+import queue
+import sys
+
+# Import functions from local modules
+from name_suggestion import suggest_names
+
+# Default number of milliseconds between checks for finished queries
+POLL_MS = 15
+
+class MatchingService:
+    """
+    Scores name queries on a background thread so that the Tk main loop never blocks on fuzzy matching.
+    Finished queries are put on a thread-safe queue that is drained on the main thread by poll(), which reschedules
+    itself through the given scheduler (root.after in the GUI) while queries are outstanding.
+    Every submitted query supersedes the ones before it: the older query is cancelled if it has not started,
+    and its results are thrown away instead of being delivered if it has. A query that fails is reported on stderr and dropped.
+    The scheduler only has to accept (milliseconds, callback), so the service can be driven without a display.
+    """
+
+    def __init__(self, students: dict, schedule: Callable[[int, Callable[[], None]], object], poll_ms: int = POLL_MS, max_workers: int = 1) -> None:
+        self.students = students
+        self.schedule = schedule
+        self.poll_ms = poll_ms
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="matching")
+        self.results = queue.Queue()
+
+        self.generation = 0
+        self.future = None
+        self.outstanding = 0
+        self.polling = False
+        self.discarded = 0
+        self.failed = 0
+
+    def submit(self, query: str, section: str, on_results: Callable[[list[str]], None]) -> int:
+        """
+        Queues a query against the section's roster.
+        on_results is called on the main thread with the ranked names, unless a newer query is submitted first.
+        """
+        self.generation += 1
+        generation = self.generation
+        # The previous query is superseded, so it does not need to run if it has not started yet
+        if self.future is not None:
+            self.future.cancel()
+        # Hand the worker the roster list itself so that reloading the sections on the main thread cannot change it mid-query
+        student_list = self.students[section]
+        future = self.executor.submit(suggest_names, query, section, {section: student_list})
+        # Cancelled futures call this too, so every query is accounted for by poll()
+        future.add_done_callback(lambda done: self.results.put((generation, done, on_results)))
+        self.future = future
+
+        self.outstanding += 1
+        if not self.polling:
+            self.polling = True
+            self.schedule(self.poll_ms, self.poll)
+        return generation
+
+    def poll(self) -> None:
+        """Delivers the newest finished query and discards any superseded ones. Runs on the main thread."""
+        try:
+            while True:
+                try:
+                    generation, future, on_results = self.results.get_nowait()
+                except queue.Empty:
+                    break
+                self.outstanding -= 1
+                if generation != self.generation or future.cancelled():
+                    self.discarded += 1
+                    continue
+                try:
+                    suggestions = future.result()
+                except Exception as error:
+                    self.failed += 1
+                    print(f"Could not score the query: {error!r}", file=sys.stderr)
+                    continue
+                on_results(suggestions)
+        finally:
+            # Keep polling while queries are outstanding even if delivering one failed, so later queries are still delivered
+            if self.outstanding > 0:
+                self.schedule(self.poll_ms, self.poll)
+            else:
+                self.polling = False
+
+    def shutdown(self) -> None:
+        """Stops the worker thread, dropping any queries that have not started."""
+        self.executor.shutdown(wait=False, cancel_futures=True)
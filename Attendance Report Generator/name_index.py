@@ -0,0 +1,234 @@
+# Import modules from the standard library
+from bisect import bisect_left
+from collections import defaultdict
+import re
+
+# Import modules that are in requirements.txt
+from fuzzywuzzy import utils
+
+# Number of characters of each name token that are indexed as prefixes
+PREFIX_LENGTH = 4
+
+# Number of candidates (by index overlap) that are rescored with the fuzzy scorer, and so the most suggestions a large roster gets
+TOP_K = 100
+
+class NameIndex:
+    """
+    A search index over a single section's roster.
+    Every "Last, First" name is normalized the same way fuzzywuzzy normalizes it before scoring,
+    split into tokens, and each token is added to two posting lists:
+    - trigrams: every 3 character window of the token, padded with a leading space so that the first two characters also form a trigram
+    - prefixes: the first 1 to PREFIX_LENGTH characters of the token
+    The postings hold positions into the roster, so candidates can be handed back to the scorer in roster order.
+    """
+
+    def __init__(self, student_list: list[str]) -> None:
+        self.names = student_list
+        self.trigrams = defaultdict(list)
+        self.prefixes = defaultdict(list)
+
+        for position, name in enumerate(student_list):
+            for token in set(utils.full_process(name).split()):
+                for trigram in set(token_trigrams(token)):
+                    self.trigrams[trigram].append(position)
+                for length in range(1, min(len(token), PREFIX_LENGTH) + 1):
+                    self.prefixes[token[:length]].append(position)
+
+    def candidates(self, query: str, top_k: int = TOP_K) -> list[str]:
+        """
+        Returns up to top_k roster names that share the most trigrams and prefixes with the query.
+        The names are returned in roster order so that ties in the fuzzy scorer are broken the same way as a full scan.
+        """
+        overlap = defaultdict(int)
+        for token in utils.full_process(query).split():
+            for trigram in set(token_trigrams(token)):
+                for position in self.trigrams.get(trigram, ()):
+                    overlap[position] += 1
+            # A matching prefix is a much stronger signal than a single shared trigram
+            for position in self.prefixes.get(token[:PREFIX_LENGTH], ()):
+                overlap[position] += 2
+
+        best = sorted(overlap, key=lambda position: (-overlap[position], position))[:top_k]
+        return [self.names[position] for position in sorted(best)]
+
+# Function to split a token into its trigrams
+def token_trigrams(token: str) -> list[str]:
+    """Returns the trigrams of a token, padded with a leading space so that short tokens still produce one."""
+    padded = " " + token
+    return [padded[i:i + 3] for i in range(max(len(padded) - 2, 1))]
+
+# Function to build the index for a section's roster
+def build_name_index(student_list: list[str]) -> NameIndex:
+    """Builds a search index over the given list of "Last, First" names."""
+    return NameIndex(student_list)
+
+# Soundex digit of each letter: vowels (and y) separate consonants and are dropped, and h and w are skipped entirely
+SOUNDEX_TABLE = str.maketrans({**{letter: digit for digit, letters in {"1": "bfpv", "2": "cgjkqsxz", "3": "dt", "4": "l", "5": "mn", "6": "r", "0": "aeiouy"}.items() for letter in letters},
+                               "h": None, "w": None})
+
+# Spellings of a token's first sound that are rewritten before its Soundex code is taken, since Soundex keeps the first letter as is
+FIRST_SOUNDS = {"ph": "f", "kn": "n", "gn": "n", "wr": "r", "ps": "s", "wh": "w", "ce": "se", "ci": "si", "cy": "sy", "c": "k", "q": "k", "x": "z"}
+
+# Anything that is not a lowercase letter, which is left out of phonetic keys
+NON_LETTERS = re.compile("[^a-z]")
+
+# Common nicknames and the formal first names they are short for (more can be added with set_nicknames)
+NICKNAMES = {
+    "abby": ["abigail"], "al": ["albert", "alan", "alexander"], "alex": ["alexander", "alexandra", "alexis"], "andy": ["andrew"],
+    "becky": ["rebecca"], "ben": ["benjamin"], "beth": ["elizabeth"], "bill": ["william"], "billy": ["william"], "bob": ["robert"],
+    "bobby": ["robert"], "cathy": ["catherine", "katherine"], "chris": ["christopher", "christina", "christine"], "chuck": ["charles"],
+    "dan": ["daniel"], "danny": ["daniel"], "dave": ["david"], "dick": ["richard"], "don": ["donald"], "ed": ["edward"],
+    "eddie": ["edward"], "fred": ["frederick"], "greg": ["gregory"], "hank": ["henry"], "jack": ["john"], "jake": ["jacob"],
+    "jen": ["jennifer"], "jenny": ["jennifer"], "jim": ["james"], "jimmy": ["james"], "joe": ["joseph"], "joey": ["joseph"],
+    "john": ["jonathan"], "jon": ["jonathan"], "kate": ["katherine", "catherine"], "katie": ["katherine", "catherine"],
+    "ken": ["kenneth"], "kim": ["kimberly"], "larry": ["lawrence"], "liz": ["elizabeth"], "maggie": ["margaret"], "matt": ["matthew"],
+    "meg": ["margaret"], "mike": ["michael"], "nate": ["nathan", "nathaniel"], "nick": ["nicholas"], "pam": ["pamela"],
+    "pat": ["patrick", "patricia"], "peggy": ["margaret"], "pete": ["peter"], "phil": ["phillip", "philip"], "rich": ["richard"],
+    "rick": ["richard"], "rob": ["robert"], "ron": ["ronald"], "sam": ["samuel", "samantha"], "steve": ["steven", "stephen"],
+    "sue": ["susan"], "ted": ["theodore", "edward"], "tim": ["timothy"], "tom": ["thomas"], "tommy": ["thomas"], "tony": ["anthony"],
+    "vicky": ["victoria"], "will": ["william"], "zach": ["zachary"],
+}
+
+# Nickname map used by new phonetic indexes: every name (nickname or formal) mapped to the formal names it can stand for
+nickname_groups = {}
+
+# Strength of each kind of match between a query token and a name token, used to rank the phonetic candidates
+EXACT_MATCH = 4
+NICKNAME_MATCH = 3
+PREFIX_MATCH = 2
+SOUND_MATCH = 2
+
+# Shortest query token that is matched by prefix, and by sound
+MIN_PREFIX_LENGTH = 2
+MIN_SOUND_LENGTH = 3
+
+# Function to compute the sound of a token
+def phonetic_key(token: str) -> str:
+    """
+    Returns the Soundex code of a token, after rewriting the spelling of its first sound (e.g. "ph" as "f" and a hard "c" as "k"),
+    so that names that sound alike but start with different letters (Catherine and Katherine, Philip and Filip) share a code.
+    """
+    letters = NON_LETTERS.sub("", token.lower())
+    if not letters:
+        return ""
+    sound = FIRST_SOUNDS.get(letters[:2])
+    if sound is not None:
+        letters = sound + letters[2:]
+    elif letters[0] in FIRST_SOUNDS:
+        letters = FIRST_SOUNDS[letters[0]] + letters[1:]
+    code = letters[0].upper()
+    last_digit = letters[0].translate(SOUNDEX_TABLE)
+    for digit in letters[1:].translate(SOUNDEX_TABLE):
+        # A consonant with the same code as the one before it is dropped, unless a vowel came between them
+        if digit != last_digit and digit != "0":
+            code += digit
+            if len(code) == 4:
+                break
+        last_digit = digit
+    return code.ljust(4, "0")
+
+# Function to set the nickname map
+def set_nicknames(nicknames: dict[str, list[str]], extend: bool = True) -> None:
+    """
+    Sets the nicknames that phonetic indexes match (nickname -> formal names), adding them to NICKNAMES unless extend is False.
+    Indexes that have already been built keep the map they were built with.
+    """
+    combined = {name: list(formal) for name, formal in NICKNAMES.items()} if extend else {}
+    for nickname, formal_names in nicknames.items():
+        combined.setdefault(nickname.lower(), []).extend(name.lower() for name in formal_names)
+    nickname_groups.clear()
+    for nickname, formal_names in combined.items():
+        nickname_groups.setdefault(nickname, set()).update(formal_names)
+        for formal_name in formal_names:
+            nickname_groups.setdefault(formal_name, set()).add(formal_name)
+
+# Function to read a nickname file
+def read_nicknames(file_name: str) -> dict[str, list[str]]:
+    """Reads a nickname map from a file with one "nickname,formal name,formal name,..." line per nickname."""
+    nicknames = {}
+    with open(file_name, "r") as file:
+        for line in file:
+            cells = [cell.strip() for cell in line.split(",") if cell.strip()]
+            if len(cells) >= 2:
+                nicknames.setdefault(cells[0], []).extend(cells[1:])
+    return nicknames
+
+class PhoneticIndex:
+    """
+    A second index over a section's roster that matches whole name tokens instead of character n-grams, so that a typed nickname
+    ("Bill" for William) or a name spelled the way it sounds ("Jon Smyth") finds the right student before any fuzzy scoring.
+    Each "Last, First" name is split into its last-name and first-name tokens, and every token is indexed:
+    - as is, and in a sorted list of tokens for prefix lookups
+    - by its phonetic_key
+    - for first names, by the formal names it can be short for in the nickname map (a formal name also stands for itself)
+    candidates() returns only the names that match every token of the query, which is usually a handful of names.
+    """
+
+    def __init__(self, student_list: list[str], nicknames: dict[str, set[str]] = None) -> None:
+        self.names = student_list
+        self.nicknames = nickname_groups if nicknames is None else nicknames
+        self.tokens = defaultdict(list)
+        self.sounds = defaultdict(list)
+        self.formal_names = defaultdict(list)
+
+        for position, name in enumerate(student_list):
+            last_name, _, first_name = name.partition(", ")
+            first_tokens = utils.full_process(first_name).split()
+            for token in set(utils.full_process(last_name).split() + first_tokens):
+                self.tokens[token].append(position)
+            for token in set(first_tokens):
+                for formal_name in self.nicknames.get(token, ()):
+                    self.formal_names[formal_name].append(position)
+        # Each distinct token is only keyed once, however many students share it
+        for token, positions in self.tokens.items():
+            self.sounds[phonetic_key(token)].extend(positions)
+        self.sorted_tokens = sorted(self.tokens)
+
+    def token_matches(self, token: str) -> dict[int, int]:
+        """Returns the positions of the names that match a query token, mapped to the strength of their best match."""
+        strengths = {}
+
+        def add(positions, strength: int) -> None:
+            for position in positions:
+                if strengths.get(position, 0) < strength:
+                    strengths[position] = strength
+
+        if len(token) >= MIN_SOUND_LENGTH:
+            add(self.sounds.get(phonetic_key(token), ()), SOUND_MATCH)
+        if len(token) >= MIN_PREFIX_LENGTH:
+            # Every indexed token that starts with the query token is next to it in the sorted list
+            for i in range(bisect_left(self.sorted_tokens, token), len(self.sorted_tokens)):
+                if not self.sorted_tokens[i].startswith(token):
+                    break
+                add(self.tokens[self.sorted_tokens[i]], PREFIX_MATCH)
+        for formal_name in self.nicknames.get(token, ()):
+            add(self.formal_names.get(formal_name, ()), NICKNAME_MATCH)
+        add(self.tokens.get(token, ()), EXACT_MATCH)
+        return strengths
+
+    def candidates(self, query: str, limit: int = TOP_K) -> dict[str, int]:
+        """
+        Returns the names that match every token of the query (tokens too short to match on their own are skipped),
+        mapped to the total strength of their matches, in roster order. Returns nothing if no name matches every token,
+        or if more than limit names do, since the query is then too vague for the index to narrow down.
+        """
+        tokens = [token for token in utils.full_process(query).split() if len(token) >= MIN_PREFIX_LENGTH]
+        if not tokens:
+            return {}
+        totals = None
+        for token in tokens:
+            strengths = self.token_matches(token)
+            totals = strengths if totals is None else {position: totals[position] + strength for position, strength in strengths.items() if position in totals}
+            if not totals:
+                return {}
+        if len(totals) > limit:
+            return {}
+        return {self.names[position]: totals[position] for position in sorted(totals)}
+
+# Function to build the phonetic index for a section's roster
+def build_phonetic_index(student_list: list[str]) -> PhoneticIndex:
+    """Builds a phonetic and nickname index over the given list of "Last, First" names."""
+    return PhoneticIndex(student_list)
+
+# Start with the built-in nicknames
+set_nicknames({})
@@ -1,8 +1,41 @@
 # Import modules from the standard library
 import tkinter as tk
+import difflib
+import threading
 
 # Import modules that are in requirements.txt
-from fuzzywuzzy import process
+from fuzzywuzzy import utils
+
+# Import functions from local modules
+from name_index import NameIndex, PhoneticIndex, TOP_K, build_name_index, build_phonetic_index
+from suggestion_cache import SuggestionCache
+from virtual_listbox import VirtualListbox
+
+# Search indexes for each loaded section, built when the section's roster is loaded
+name_indexes: dict[str, NameIndex] = {}
+
+# Phonetic and nickname indexes for each loaded section, consulted before any fuzzy scoring if phonetic matching is on
+phonetic_indexes: dict[str, PhoneticIndex] = {}
+
+# Whether suggest_names consults the phonetic index first. Off by default, since its matches are listed by how they matched
+# (exact, nickname, prefix, or sound) before how similar they are, which is not the order fuzzy scoring alone gives
+phonetic_matching = False
+
+# Backend used to score names: "fuzzywuzzy" scores one name at a time, "numpy" scores the whole roster in one vectorized pass
+scoring_backend = "fuzzywuzzy"
+
+# Encoded rosters for the numpy backend, built the first time a section is scored with it
+batch_scorers = {}
+
+# Guards name_indexes, phonetic_indexes, and batch_scorers, which the matching service's worker thread fills in
+# (for sections that are searched before they are indexed) while the main thread indexes and forgets sections
+index_lock = threading.Lock()
+
+# Suggestions already computed for each section and query, so backspacing, retyping, and switching sections do not rescore them
+suggestion_cache = SuggestionCache()
+
+# Background service that scores queries off the Tk main loop, if one has been started (see matching_service.py)
+matching_service = None
 
 # Function to handle name entry
 def on_name_entry(name_entry: tk.Entry, section_var: tk.StringVar, students: dict, suggestion_listbox: tk.Listbox) -> None:
@@ -13,15 +46,188 @@ def on_name_entry(name_entry: tk.Entry, section_var: tk.StringVar, students: dic
     
     query = name_entry.get()
     section = section_var.get()     
+
+    # Score the query in the background if possible, updating the listbox once the results are ready
+    if matching_service is not None:
+        matching_service.submit(query, section, lambda suggestions: update_suggestion_listbox(suggestion_listbox, suggestions))
+        return
+
     suggestions = suggest_names(query, section, students)
     
     # Update suggestion listbox
-    suggestion_listbox.delete(0, tk.END)
-    for suggestion in suggestions:
-        suggestion_listbox.insert(tk.END, suggestion)
+    update_suggestion_listbox(suggestion_listbox, suggestions)
 
 # Function to suggest names
 def suggest_names(query: str, section: str, students: dict) -> list:
-    """Provides a list of suggested names that are similar to the passed query from the section"""
+    """
+    Provides a list of suggested names that are similar to the passed query from the section.
+    Rosters of up to TOP_K names are ranked in full. Larger ones are only ranked over the index's TOP_K best candidates
+    (see compute_suggestions), so their suggestions are at most TOP_K names rather than the whole roster.
+    """
     student_list = students[section]
-    return [name for name, score in process.extract(query, student_list, limit=len(student_list))]
+
+    # An empty query scores every name as 0, which leaves the roster in its original order
+    if query.strip() == "":
+        return list(student_list)
+
+    # Queries are scored the way fuzzywuzzy processes them (lowercased, with punctuation and extra spaces removed),
+    # so "smith," and "Smith" share a cache entry. Queries that process to nothing are not cached.
+    normalized = utils.full_process(query)
+    if normalized:
+        suggestions = suggestion_cache.get(section, normalized, student_list)
+        if suggestions is None:
+            suggestions = compute_suggestions(normalized, section, student_list)
+            suggestion_cache.put(section, normalized, student_list, suggestions)
+        return suggestions
+    return compute_suggestions(query, section, student_list)
+
+# Function to score the suggestions for a query
+def compute_suggestions(query: str, section: str, student_list: list[str]) -> list:
+    """
+    Scores the section's roster against the query, without the suggestion cache.
+    With the fuzzywuzzy backend, a roster larger than TOP_K is narrowed to the TOP_K names that share the most trigrams and prefixes
+    with the query, and only they are returned, in the fuzzy ranking's order. A name outside them can still have a higher fuzzy score,
+    so the list is the top of a full scan's ranking only as far as the index finds it. The numpy backend always ranks the whole roster.
+    """
+    # Names that match every word of the query by name, nickname, prefix, or sound are usually only a handful,
+    # so only they are scored, and they are listed by how strongly they matched before how similar they are
+    if phonetic_matching:
+        matches = get_phonetic_index(section, student_list).candidates(query)
+        if matches:
+            similarity = {name: rank for rank, name in enumerate(rank_names(query, list(matches)))}
+            ranked = sorted(matches, key=lambda name: (-matches[name], similarity[name]))
+            # Small rosters are listed in full, as they are without the index, with the rest of the names left unscored in roster order
+            if len(student_list) <= TOP_K:
+                ranked += [name for name in student_list if name not in matches]
+            return ranked
+
+    # The numpy backend is fast enough to score the whole (pre-encoded) roster every time
+    if scoring_backend == "numpy":
+        return get_batch_scorer(section, student_list).rank(query)
+
+    # Small rosters are cheap to score in full, so only narrow larger ones down to the names that share trigrams or prefixes with the query
+    if len(student_list) <= TOP_K:
+        return rank_names(query, student_list)
+    candidates = get_name_index(section, student_list).candidates(query)
+    if not candidates:
+        # Nothing in the index resembles the query, so fall back to scoring the whole roster
+        candidates = student_list
+
+    return rank_names(query, candidates)
+
+# Function to rank a list of names
+def rank_names(query: str, candidates: list[str]) -> list:
+    """Scores every candidate against the query and returns them from most to least similar."""
+    if scoring_backend == "numpy":
+        from batch_scorer import BatchScorer
+        return BatchScorer(candidates).rank(query)
+    # Imported here because fuzzywuzzy's scorers are slow to import, so the app starts without them (see startup.py)
+    from fuzzywuzzy import process
+    return [name for name, score in process.extract(query, candidates, limit=len(candidates))]
+
+# Function to set the background matching service
+def set_matching_service(service) -> None:
+    """Routes on_name_entry through the given matching service, or back to scoring on the main thread if it is None."""
+    global matching_service
+    matching_service = service
+
+# Function to switch the phonetic index on or off
+def set_phonetic_matching(enabled: bool) -> None:
+    """
+    Sets whether suggest_names consults the phonetic and nickname index before fuzzy scoring.
+    With it on, names that match every typed word are listed first, by how strongly they matched, instead of in fuzzy order.
+    """
+    global phonetic_matching
+    phonetic_matching = enabled
+    suggestion_cache.clear()
+
+# Function to choose the scoring backend
+def set_scoring_backend(backend: str) -> None:
+    """
+    Sets the backend used by suggest_names and rank_names, either "fuzzywuzzy" or "numpy".
+    The numpy backend scores names like WRatio, except that names much longer or shorter than the query can score higher,
+    so they may be suggested above where fuzzywuzzy ranks them.
+    """
+    global scoring_backend
+    if backend not in ("fuzzywuzzy", "numpy"):
+        raise ValueError(f"Unknown scoring backend: {backend}")
+    scoring_backend = backend
+    suggestion_cache.clear()
+
+# Function to get the encoded roster for the numpy backend
+def get_batch_scorer(section: str, student_list: list[str]):
+    """Returns the numpy batch scorer for the section, encoding the roster if it has not been encoded yet."""
+    # Imported here so that numpy is only needed when the numpy backend is chosen
+    from batch_scorer import BatchScorer
+
+    with index_lock:
+        scorer = batch_scorers.get(section)
+    if scorer is None or scorer.names is not student_list:
+        scorer = BatchScorer(student_list)
+        with index_lock:
+            batch_scorers[section] = scorer
+    return scorer
+
+# Function to forget the indexes of a section
+def forget_section(section: str) -> None:
+    """Drops the search indexes, encoded roster, and cached suggestions of a section whose roster has changed or been removed."""
+    with index_lock:
+        name_indexes.pop(section, None)
+        phonetic_indexes.pop(section, None)
+        batch_scorers.pop(section, None)
+    suggestion_cache.invalidate(section)
+
+# Function to build the search index for a section
+def index_section(section: str, student_list: list[str]) -> None:
+    """Builds and stores the search indexes for the given section's roster."""
+    # Built outside the lock, so the worker thread is never kept waiting on an index it does not use
+    name_index = build_name_index(student_list)
+    # The phonetic index is only built if it is used (it is otherwise built the first time phonetic matching needs it)
+    phonetic_index = build_phonetic_index(student_list) if phonetic_matching else None
+    with index_lock:
+        name_indexes[section] = name_index
+        if phonetic_index is None:
+            phonetic_indexes.pop(section, None)
+        else:
+            phonetic_indexes[section] = phonetic_index
+    suggestion_cache.invalidate(section)
+
+# Function to get the search index for a section
+def get_name_index(section: str, student_list: list[str]) -> NameIndex:
+    """Returns the search index for the section, rebuilding it if the roster list has been replaced since it was built."""
+    with index_lock:
+        index = name_indexes.get(section)
+    if index is None or index.names is not student_list:
+        index = build_name_index(student_list)
+        with index_lock:
+            name_indexes[section] = index
+    return index
+
+# Function to get the phonetic index for a section
+def get_phonetic_index(section: str, student_list: list[str]) -> PhoneticIndex:
+    """Returns the phonetic index for the section, rebuilding it if the roster list has been replaced since it was built."""
+    with index_lock:
+        index = phonetic_indexes.get(section)
+    if index is None or index.names is not student_list:
+        index = build_phonetic_index(student_list)
+        with index_lock:
+            phonetic_indexes[section] = index
+    return index
+
+# Function to update a listbox with only the rows that changed
+def update_suggestion_listbox(listbox: tk.Listbox, suggestions: list[str]) -> None:
+    """Updates the listbox to show the suggestions by deleting and inserting only the rows that differ."""
+    # A virtual listbox only renders the rows in view, so it is simply handed the new suggestions
+    if isinstance(listbox, VirtualListbox):
+        listbox.set_items(suggestions)
+        return
+    current = list(listbox.get(0, tk.END))
+    opcodes = difflib.SequenceMatcher(None, current, suggestions, autojunk=False).get_opcodes()
+    # Apply the changes from the bottom up so that earlier row indexes stay valid
+    for tag, i1, i2, j1, j2 in reversed(opcodes):
+        if tag == "equal":
+            continue
+        if i2 > i1:
+            listbox.delete(i1, i2 - 1)
+        if j2 > j1:
+            listbox.insert(i1, *suggestions[j1:j2])
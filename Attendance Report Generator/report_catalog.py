@@ -0,0 +1,181 @@
+# Import modules from the standard library
+from bisect import bisect_left, bisect_right, insort
+import datetime
+import os
+
+# Import functions from local modules
+from atomic_file import atomic_write
+
+# Name of the file, inside each section's report directory, that lists the section's reports in date order
+CATALOG_FILENAME = "catalog.index"
+
+# Number of reports shown in the report dropdown at a time
+PAGE_SIZE = 20
+
+# Ranges of reports that the report dropdown can be narrowed to
+REPORT_RANGES = ["All Reports", "This Week", "This Month", "This Year"]
+
+# Sort key of reports whose names are not dates, which puts them after every dated report
+UNDATED_KEY = datetime.date.max.toordinal() + 1
+
+# Catalogs that have already been read, kept until their file changes on disk
+report_catalogs = {}
+
+class ReportCatalog:
+    """
+    The dates of a section's attendance reports, kept sorted by the date they are for rather than by their MM-DD-YYYY names.
+    Each report is held as a (sort key, name) pair, where the key is the parsed date's ordinal,
+    so range queries are two binary searches and adding a report is a single sorted insert.
+    Report files whose names are not dates (e.g. ones added by hand) are kept after every dated report.
+    On disk the catalog is one report name per line, oldest first, so reopening a section does not have to parse every name again.
+    directory_mtime is the mtime of the section's report directory when the catalog was last checked against the report files
+    (None if it has not been), so the directory is only listed again once a file has been added, removed, or renamed in it.
+    """
+
+    def __init__(self, section: str, names: list[str] = ()) -> None:
+        self.section = section
+        self.entries = sorted((report_key(name), name) for name in names)
+        self.directory_mtime = None
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def __contains__(self, name: str) -> bool:
+        index = bisect_left(self.entries, (report_key(name), name))
+        return index < len(self.entries) and self.entries[index][1] == name
+
+    def dates(self) -> list[str]:
+        """Returns every report name, oldest first."""
+        return [name for _, name in self.entries]
+
+    def sync(self, names: set[str]) -> bool:
+        """Adds the reports in names that are missing and removes the ones that are not in names, returning whether anything changed."""
+        known = {name for _, name in self.entries}
+        if known == names:
+            return False
+        self.entries = sorted([entry for entry in self.entries if entry[1] in names] + [(report_key(name), name) for name in names - known])
+        return True
+
+    def add(self, name: str) -> bool:
+        """Adds the report in date order, returning whether it was not already in the catalog."""
+        if name in self:
+            return False
+        insort(self.entries, (report_key(name), name))
+        return True
+
+    def remove(self, name: str) -> bool:
+        """Removes the report, returning whether it was in the catalog."""
+        if name not in self:
+            return False
+        self.entries.pop(bisect_left(self.entries, (report_key(name), name)))
+        return True
+
+    def between(self, start_date: datetime.date = None, end_date: datetime.date = None) -> list[str]:
+        """Returns the reports from start_date to end_date (inclusive, either may be left open), oldest first, leaving out undated reports."""
+        low = bisect_left(self.entries, (start_date.toordinal(), "")) if start_date else 0
+        high = bisect_right(self.entries, (end_date.toordinal(), chr(0x10FFFF))) if end_date else bisect_left(self.entries, (UNDATED_KEY, ""))
+        return [name for _, name in self.entries[low:high]]
+
+    def save(self) -> None:
+        """Writes the catalog to reports/<section>/catalog.index."""
+        os.makedirs(f"reports/{self.section}", exist_ok=True)
+        path = catalog_path(self.section)
+        atomic_write(path, "".join(name + "\n" for _, name in self.entries))
+        # Writing the catalog changes the directory's mtime, and the catalog is up to date with the directory as it now is
+        self.directory_mtime = os.stat(f"reports/{self.section}").st_mtime_ns
+        report_catalogs[self.section] = (os.stat(path).st_mtime_ns, self)
+
+# Function to get the first and last dates of a range
+def range_dates(report_range: str, today: datetime.date) -> tuple[datetime.date, datetime.date]:
+    """Returns the (start, end) dates of one of REPORT_RANGES, with None for both if every report is included."""
+    if report_range == "This Week":
+        start = today - datetime.timedelta(days=today.weekday())
+        return start, start + datetime.timedelta(days=6)
+    if report_range == "This Month":
+        next_month = (today.replace(day=28) + datetime.timedelta(days=4)).replace(day=1)
+        return today.replace(day=1), next_month - datetime.timedelta(days=1)
+    if report_range == "This Year":
+        return today.replace(month=1, day=1), today.replace(month=12, day=31)
+    return None, None
+
+# Function to get the sort key of a report
+def report_key(name: str) -> int:
+    """Returns the ordinal of the date a report is named for, or a key after every date if its name is not a date."""
+    try:
+        return datetime.datetime.strptime(name, "%m-%d-%Y").toordinal()
+    except ValueError:
+        return UNDATED_KEY
+
+# Function to check whether a report is in a range of dates
+def in_range(name: str, start_date: datetime.date = None, end_date: datetime.date = None) -> bool:
+    """
+    Returns whether the report is from start_date to end_date (inclusive, either may be left open), like ReportCatalog.between,
+    or True for every report if neither date is given, like the storage backends' report_dates.
+    """
+    if start_date is None and end_date is None:
+        return True
+    key = report_key(name)
+    return key != UNDATED_KEY and (start_date is None or key >= start_date.toordinal()) and (end_date is None or key <= end_date.toordinal())
+
+# Function to split a list of reports into pages
+def paginate(names: list[str], page: int, page_size: int = PAGE_SIZE) -> tuple[list[str], bool, bool]:
+    """Returns the page (0 is the first) of names, and whether there are earlier and later pages."""
+    page = max(page, 0)
+    return names[page * page_size:(page + 1) * page_size], page > 0, (page + 1) * page_size < len(names)
+
+# Function to get the path of a section's catalog
+def catalog_path(section: str) -> str:
+    """Returns the path of the file that lists the section's reports."""
+    return os.path.join("reports", section, CATALOG_FILENAME)
+
+# Function to find the reports of a section
+def report_names(section: str) -> set[str]:
+    """Returns the names of the section's report files (without .txt), using only os.scandir and no file reads or stats."""
+    with os.scandir(f"reports/{section}") as entries:
+        return {entry.name[:-4] for entry in entries if entry.name.endswith(".txt")}
+
+# Function to load the report catalog for a section
+def load_report_catalog(section: str) -> ReportCatalog:
+    """
+    Returns the report catalog for the section, reading it from disk only if it has changed since it was last read.
+    The report files' names are only listed again when the report directory's mtime differs from the one the catalog was last
+    checked at, so report files added or removed by hand are then added to or removed from it (and it is saved again).
+    If there is no catalog yet, it is built from those names.
+    """
+    try:
+        directory_mtime = os.stat(f"reports/{section}").st_mtime_ns
+    except FileNotFoundError:
+        return ReportCatalog(section)
+    path = catalog_path(section)
+    try:
+        catalog_mtime = os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+        catalog = ReportCatalog(section, report_names(section))
+        catalog.save()
+        return catalog
+
+    cached = report_catalogs.get(section)
+    if cached is not None and cached[0] == catalog_mtime:
+        catalog = cached[1]
+    else:
+        with open(path, "r") as file:
+            catalog = ReportCatalog(section, [line.strip() for line in file if line.strip()])
+        report_catalogs[section] = (catalog_mtime, catalog)
+    if catalog.directory_mtime != directory_mtime:
+        if catalog.sync(report_names(section)):
+            catalog.save()
+        else:
+            catalog.directory_mtime = directory_mtime
+    return catalog
+
+# Function to restore a catalog that was read in an earlier session
+def restore_report_catalog(section: str, catalog_mtime: int, entries: list[tuple[int, str]], directory_mtime: int = None) -> None:
+    """
+    Caches a catalog's (sort key, name) entries as if its file, with the given mtime, had just been read,
+    along with the report directory's mtime when it was last checked against the report files.
+    load_report_catalog only uses it if the file still has that mtime, and checks it against the report files if the directory has changed.
+    """
+    catalog = ReportCatalog(section)
+    catalog.entries = [tuple(entry) for entry in entries]
+    catalog.directory_mtime = directory_mtime
+    report_catalogs[section] = (catalog_mtime, catalog)
@@ -0,0 +1,283 @@
+"""
+Saves attendance reports off the Tk main loop, without losing the attendance being marked if the app crashes.
+- Every change to the attendance being marked, and every save, is first appended to a journal (attendance.journal),
+  so the marking in progress and any saves that had not reached the disk are restored the next time the app starts.
+- Saves are handed to a background writer thread. Saves of the same section and date that are still waiting
+  are coalesced (the last one wins), and each section's waiting reports are written with a single save_reports call.
+  Until they are written, pending_reports() returns them, so the GUI can show them without waiting on the writer.
+- The text backend replaces each report file atomically (see atomic_file.py), so a crash mid-write never truncates a report.
+"""
+# Import modules from the standard library
+from typing import Iterable
+import json
+import os
+import sys
+import threading
+import time
+
+# Import functions from local modules
+from atomic_file import atomic_write
+from attendance_set import AttendanceSet
+from storage import get_storage
+
+# Journal of the attendance being marked and the saves that have not been written yet
+JOURNAL_PATH = "attendance.journal"
+
+# Seconds the writer waits after a save before writing, so that saves made in quick succession are written together
+COALESCE_SECONDS = .05
+
+# Seconds to wait before trying a failed write again
+RETRY_SECONDS = 2
+
+class AttendanceJournal:
+    """
+    An append-only log, one JSON object per line. Each line is flushed as soon as it is written, so it survives the app crashing,
+    and the log is synced to disk whenever the writer thread writes reports. Entries are one of:
+    - {"section", "event": "add" | "remove", "name"} and {"section", "event": "reset", "names"}: a change to a section's attendance
+    - {"id", "section", "event": "save", "date", "names"}: a report that was saved
+    - {"id", "event": "written"}: the save with that id has been written to the storage backend
+    """
+
+    def __init__(self, path: str = JOURNAL_PATH) -> None:
+        self.path = path
+        self.lock = threading.Lock()
+        self.file = None
+
+    def append(self, entry: dict) -> None:
+        with self.lock:
+            if self.file is None:
+                self.file = open(self.path, "a")
+            self.file.write(json.dumps(entry) + "\n")
+            self.file.flush()
+
+    def sync(self) -> None:
+        """Flushes the journal to disk."""
+        with self.lock:
+            if self.file is not None:
+                os.fsync(self.file.fileno())
+
+    def read(self) -> list[dict]:
+        """Returns every entry, skipping a last line that was cut off by a crash."""
+        if not os.path.exists(self.path):
+            return []
+        entries = []
+        with open(self.path, "r") as file:
+            for line in file:
+                try:
+                    entries.append(json.loads(line))
+                except json.JSONDecodeError:
+                    continue
+        return entries
+
+    def rewrite(self, entries: list[dict]) -> None:
+        """Atomically replaces the journal with the given entries, e.g. to drop everything that has been written."""
+        with self.lock:
+            if self.file is not None:
+                self.file.close()
+                self.file = None
+            atomic_write(self.path, "".join(json.dumps(entry) + "\n" for entry in entries))
+
+    def watch(self, section: str, attendance_set: AttendanceSet) -> None:
+        """Journals every change made to a section's attendance."""
+        def listener(event: str, name: str, row: int) -> None:
+            if event == "reset":
+                self.append({"section": section, "event": "reset", "names": list(attendance_set)})
+            else:
+                self.append({"section": section, "event": event, "name": name})
+        attendance_set.subscribe(listener)
+
+    def close(self) -> None:
+        with self.lock:
+            if self.file is not None:
+                self.file.close()
+                self.file = None
+
+# Function to replay a journal
+def replay_journal(entries: Iterable[dict]) -> tuple[dict[str, list[str]], list[dict]]:
+    """Returns the attendance being marked in each section, and the save entries that were never written, in the order they were made."""
+    marking = {}
+    saves = {}
+    for entry in entries:
+        event = entry.get("event")
+        if event == "reset":
+            marking[entry["section"]] = dict.fromkeys(entry["names"])
+        elif event == "add":
+            marking.setdefault(entry["section"], {})[entry["name"]] = None
+        elif event == "remove":
+            marking.setdefault(entry["section"], {}).pop(entry["name"], None)
+        elif event == "save":
+            saves[entry["id"]] = entry
+        elif event == "written":
+            saves.pop(entry["id"], None)
+    return {section: list(names) for section, names in marking.items()}, list(saves.values())
+
+class ReportWriter:
+    """
+    Writes saved reports through the storage backend on a background thread.
+    submit() only journals the save and queues it, so the main loop never waits on the disk (or a network drive).
+    Waiting saves are keyed by (section, date), so saving the same report again before it is written replaces the waiting copy.
+    A failed write is kept (and left in the journal) and tried again after RETRY_SECONDS.
+    """
+
+    def __init__(self, journal: AttendanceJournal, coalesce_seconds: float = COALESCE_SECONDS) -> None:
+        self.journal = journal
+        self.coalesce_seconds = coalesce_seconds
+        self.pending = {}  # (section, date) -> (ids of the journaled saves, students who attended)
+        self.batch = {}  # The saves being written, in the same form
+        self.next_id = int(time.time() * 1000)
+        self.condition = threading.Condition()
+        self.writing = False
+        self.closing = False
+        self.writes = 0
+        self.error = None
+        self.thread = threading.Thread(target=self.run, name="report-writer", daemon=True)
+        self.thread.start()
+
+    def submit(self, section: str, date: str, names: list[str], save_id: int = None) -> None:
+        """Journals the save (unless it is being replayed from the journal under save_id) and queues it for the writer thread."""
+        with self.condition:
+            if save_id is None:
+                self.next_id += 1
+                save_id = self.next_id
+                self.journal.append({"id": save_id, "section": section, "event": "save", "date": date, "names": list(names)})
+            ids = self.pending.get((section, date), ([], None))[0]
+            self.pending[(section, date)] = (ids + [save_id], list(names))
+            self.condition.notify_all()
+
+    def run(self) -> None:
+        while True:
+            with self.condition:
+                while not self.pending and not self.closing:
+                    self.condition.wait()
+                if not self.pending:
+                    return
+            # Let any saves made right after this one join the batch
+            if not self.closing:
+                time.sleep(self.coalesce_seconds)
+            with self.condition:
+                batch, self.pending = self.pending, {}
+                self.batch = batch
+                self.writing = True
+            try:
+                self.write(batch)
+                self.error = None
+            except Exception as error:
+                self.error = error
+                print(f"Could not save attendance reports, retrying in {RETRY_SECONDS} s: {error}", file=sys.stderr)
+                with self.condition:
+                    # Keep the failed saves unless a newer save of the same report has replaced them
+                    for key, (ids, names) in batch.items():
+                        if key in self.pending:
+                            self.pending[key] = (ids + self.pending[key][0], self.pending[key][1])
+                        else:
+                            self.pending[key] = (ids, names)
+                    # When closing, the saves stay in the journal and are tried again the next time the app starts
+                    if self.closing:
+                        return
+                    self.condition.wait(RETRY_SECONDS)
+            finally:
+                with self.condition:
+                    self.batch = {}
+                    self.writing = False
+                    self.condition.notify_all()
+
+    def write(self, batch: dict[tuple[str, str], tuple[list[int], list[str]]]) -> None:
+        """Writes each section's reports with one save_reports call, then journals them as written."""
+        by_section = {}
+        for (section, date), (ids, names) in batch.items():
+            by_section.setdefault(section, {})[date] = names
+        for section, reports in by_section.items():
+            get_storage().save_reports(section, reports)
+            self.writes += 1
+        for ids, _ in batch.values():
+            for save_id in ids:
+                self.journal.append({"id": save_id, "event": "written"})
+        self.journal.sync()
+
+    def waiting(self, section: str) -> dict[str, list[str]]:
+        """Returns the section's saves that have not been written yet (date -> students who attended), including the ones being written."""
+        with self.condition:
+            # A waiting save is newer than one of the same report that is being written
+            return {date: list(names) for (save_section, date), (_, names) in [*self.batch.items(), *self.pending.items()] if save_section == section}
+
+    def flush(self, timeout: float = None) -> bool:
+        """Waits until every queued save has been written, and returns whether they were (False if it timed out or a write is failing)."""
+        with self.condition:
+            return self.condition.wait_for(lambda: (not self.pending or self.error is not None) and not self.writing, timeout) and not self.pending
+
+    def close(self, timeout: float = None) -> bool:
+        """Writes the queued saves and stops the thread, returning whether everything was written."""
+        with self.condition:
+            self.closing = True
+            self.condition.notify_all()
+        self.thread.join(timeout)
+        return not self.pending and not self.thread.is_alive()
+
+# Writer the GUI saves through, if one has been started
+report_writer = None
+
+# Function to start saving reports in the background
+def start_report_writer(attendance_reports: dict[str, AttendanceSet], journal_path: str = JOURNAL_PATH) -> dict[str, list[str]]:
+    """
+    Restores the attendance that was being marked when the app last closed (or crashed) into attendance_reports,
+    requeues any saves that were not written, starts the writer thread, and journals every change from then on.
+    Returns the restored attendance by section.
+    """
+    global report_writer
+    journal = AttendanceJournal(journal_path)
+    entries = journal.read()
+    marking, saves = replay_journal(entries)
+
+    restored = {}
+    for section, names in marking.items():
+        if section in attendance_reports and names:
+            attendance_reports[section].replace(names)
+            restored[section] = names
+    # Start the journal afresh with just what is still outstanding, unless that is all it holds already (as it is after a clean exit),
+    # so that starting the app does not have to wait on rewriting and syncing it
+    outstanding = saves + [{"section": section, "event": "reset", "names": names} for section, names in marking.items() if names]
+    if outstanding != entries:
+        journal.rewrite(outstanding)
+
+    report_writer = ReportWriter(journal)
+    for save in saves:
+        report_writer.next_id = max(report_writer.next_id, save["id"])
+        report_writer.submit(save["section"], save["date"], save["names"], save_id=save["id"])
+    for section, attendance_set in attendance_reports.items():
+        journal.watch(section, attendance_set)
+    return restored
+
+# Function to journal a section added after the writer started
+def watch_attendance(section: str, attendance_set: AttendanceSet) -> None:
+    """Journals every change made to the attendance of a section that was not in attendance_reports when the writer started."""
+    if report_writer is not None:
+        report_writer.journal.watch(section, attendance_set)
+
+# Function to save a report
+def save_report_later(section: str, date: str, names: list[str]) -> None:
+    """Queues the report on the writer thread if one has been started, and otherwise saves it right away."""
+    if report_writer is None:
+        get_storage().save_report(section, date, names)
+    else:
+        report_writer.submit(section, date, names)
+
+# Function to get the saved reports that have not been written yet
+def pending_reports(section: str) -> dict[str, list[str]]:
+    """Returns the section's reports that are queued on the writer thread (date -> students who attended), so they can be read without waiting for them."""
+    if report_writer is None:
+        return {}
+    return report_writer.waiting(section)
+
+# Function to stop saving reports in the background
+def stop_report_writer() -> None:
+    """Writes any queued saves and stops the writer thread. The journal is cleared of everything that was written."""
+    global report_writer
+    if report_writer is None:
+        return
+    if not report_writer.close():
+        print(f"Some attendance reports could not be saved; they are kept in {report_writer.journal.path} and will be saved the next time the app starts", file=sys.stderr)
+    journal = report_writer.journal
+    marking, saves = replay_journal(journal.read())
+    journal.rewrite(saves + [{"section": section, "event": "reset", "names": names} for section, names in marking.items() if names])
+    journal.close()
+    report_writer = None
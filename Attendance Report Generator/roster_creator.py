@@ -1,5 +1,30 @@
+import argparse
+import csv
 import os
-from bs4 import BeautifulSoup
+import re
+from html.parser import HTMLParser
+from typing import Iterator
+
+# Number of characters read from the input file at a time when streaming
+STREAM_CHUNK_SIZE = 1 << 16
+
+# Positions of the cells (td/th) in a row that hold the first name, last name, and course ID
+FIRST_NAME_CELL = 2
+LAST_NAME_CELL = 3
+COURSE_ID_CELL = 8
+
+# Header names (compared in lowercase, ignoring extra whitespace) that identify each column a roster needs
+COLUMN_ALIASES = {
+    'first_name': ('first name', 'first', 'given name', 'preferred first name', 'first_name'),
+    'last_name': ('last name', 'last', 'surname', 'family name', 'last_name'),
+    'course_id': ('course id', 'course', 'class', 'section', 'class section', 'course section', 'course_id'),
+}
+
+# Number of rows at the top of a file that are searched for the header row
+HEADER_SEARCH_ROWS = 10
+
+# Number of students buffered for a section before they are written to its roster
+WRITE_BATCH_SIZE = 512
 
 def create_rosters(input_file_name, sections, output_dir_names):
     """
@@ -12,6 +37,9 @@ def create_rosters(input_file_name, sections, output_dir_names):
     - sections: a map between the section ID and the name of the section
     - output_dir_names: a map between the section name and the file to save the output to for that section.
     """
+    # Only needed for this path, since create_rosters_streaming uses the standard library's parser
+    from bs4 import BeautifulSoup
+
     # Open the input file
     with open(input_file_name, 'r') as input_file:
         # Read the HTML content
@@ -20,12 +48,6 @@ def create_rosters(input_file_name, sections, output_dir_names):
     # Parse the HTML content using BeautifulSoup
     soup = BeautifulSoup(html_content, 'html.parser')
 
-    # Extract the text from the HTML content
-    text = soup.get_text()
-
-    # Split the text into lines
-    lines = text.split('\n')
-
     # A map to a list of students in each section
     students_in_sections = {}
 
@@ -54,22 +76,242 @@ def create_rosters(input_file_name, sections, output_dir_names):
             for student in students_in_sections[section_id]:
                 output_file.write(student + '\n')
 
-# Create a dictionary of section IDs and their corresponding names
-sections = {
-    '2252-UTDAL-CS-4349-SEC001-23154': 'CS 4349.001 - MW 11_30am',
-    '2252-UTDAL-CS-4349-SEC002-23043': 'CS 4349.002 - MW 8_30am'
-}
+class RosterRowParser(HTMLParser):
+    """
+    An event-based parser that collects the text of each cell in a <tr> row and hands the finished row to a callback,
+    so only the row currently being parsed is ever held in memory.
+    """
 
-# Create a dictionary of section names and their corresponding output file names
-output_dir_names = {
-    'CS 4349.001 - MW 11_30am': './rosters/CS 4349.001 - MW 11_30am.txt',
-    'CS 4349.002 - MW 8_30am': './rosters/CS 4349.002 - MW 8_30am.txt'
-}
+    def __init__(self, on_row) -> None:
+        super().__init__(convert_charrefs=True)
+        self.on_row = on_row
+        self.cells = None
+        self.cell_text = None
+
+    def handle_starttag(self, tag: str, attrs: list) -> None:
+        if tag == "tr":
+            self.cells = []
+        elif tag in ("td", "th") and self.cells is not None:
+            self.finish_cell()
+            self.cell_text = []
+
+    def handle_endtag(self, tag: str) -> None:
+        if tag in ("td", "th"):
+            self.finish_cell()
+        elif tag == "tr" and self.cells is not None:
+            self.finish_cell()
+            self.on_row(self.cells)
+            self.cells = None
+
+    def handle_data(self, data: str) -> None:
+        if self.cell_text is not None:
+            self.cell_text.append(data)
+
+    def finish_cell(self) -> None:
+        """Adds the text of the cell being parsed (if any) to the current row."""
+        if self.cell_text is not None:
+            self.cells.append("".join(self.cell_text))
+            self.cell_text = None
+
+def create_rosters_streaming(input_file_name, sections, output_dir_names):
+    """
+    Does the same as create_rosters, but without ever holding the whole HTML file or a parse tree in memory.
+    The file is fed to an event-based parser a chunk at a time, and each student is written to their section's roster
+    as soon as their row has been parsed. Rows for sections that are not in the sections map are skipped.
+
+    Input:
+    - input_file_name: the name of the file containing the HTML content
+    - sections: a map between the section ID and the name of the section
+    - output_dir_names: a map between the section name and the file to save the output to for that section.
+    """
+    # Open every section's output file up front, so that sections without any students still get an (empty) roster
+    output_files = {section_id: open(output_dir_names[sections[section_id]], 'w') for section_id in sections}
+    try:
+        def write_row(cells):
+            if len(cells) <= COURSE_ID_CELL:
+                return
+            # The cells are padded with whitespace, which these offsets remove (the same as create_rosters)
+            first_name = cells[FIRST_NAME_CELL][14:-1]
+            last_name = cells[LAST_NAME_CELL][13:-1]
+            course_id = cells[COURSE_ID_CELL][19:-2]
+            if course_id in output_files:
+                output_files[course_id].write(f"{last_name}, {first_name}\n")
+
+        parser = RosterRowParser(write_row)
+        with open(input_file_name, 'r') as input_file:
+            while True:
+                chunk = input_file.read(STREAM_CHUNK_SIZE)
+                if not chunk:
+                    break
+                parser.feed(chunk)
+        parser.close()
+    finally:
+        for output_file in output_files.values():
+            output_file.close()
+
+# Function to read the rows of an export in any supported format
+def read_rows(input_file_name: str, input_format: str = 'auto') -> Iterator[list[str]]:
+    """
+    Yields each row of the export as a list of cell strings.
+    The format is 'html' (every <tr>, streamed), 'csv', 'tsv', or 'auto' to pick one from the file extension.
+    """
+    if input_format == 'auto':
+        extension = os.path.splitext(input_file_name)[1].lower()
+        input_format = {'.csv': 'csv', '.tsv': 'tsv', '.tab': 'tsv'}.get(extension, 'html')
+
+    if input_format in ('csv', 'tsv'):
+        with open(input_file_name, 'r', newline='') as input_file:
+            yield from csv.reader(input_file, delimiter=',' if input_format == 'csv' else '\t')
+        return
+
+    rows = []
+    parser = RosterRowParser(rows.append)
+    with open(input_file_name, 'r') as input_file:
+        while True:
+            chunk = input_file.read(STREAM_CHUNK_SIZE)
+            if not chunk:
+                break
+            parser.feed(chunk)
+            # Hand over the rows completed by this chunk so that they do not pile up in memory
+            yield from rows
+            rows.clear()
+    parser.close()
+    yield from rows
+
+# Function to find the roster columns in a header row
+def detect_columns(header: list[str], column_names: dict[str, str] = None) -> dict[str, int]:
+    """
+    Returns the position of the first name, last name, and course ID columns if the row is a header row, otherwise None.
+    column_names can name the header of any column whose header is not one of the usual COLUMN_ALIASES.
+    """
+    normalized = [' '.join(cell.split()).lower() for cell in header]
+    columns = {}
+    for column, aliases in COLUMN_ALIASES.items():
+        if column_names and column in column_names:
+            aliases = (' '.join(column_names[column].split()).lower(),)
+        for alias in aliases:
+            if alias in normalized:
+                columns[column] = normalized.index(alias)
+                break
+        else:
+            return None
+    return columns
+
+# Function to make a section name safe to use as a file name
+def safe_filename(name: str) -> str:
+    """Replaces the characters that cannot appear in file names (on any platform) with underscores."""
+    return re.sub(r'[<>:"/\\|?*]', '_', name).strip()
+
+# Function to read the students in an export
+def read_students(input_file_name: str, input_format: str = 'auto', section_names: dict[str, str] = None, column_names: dict[str, str] = None) -> Iterator[tuple[str, str]]:
+    """
+    Yields (section name, "Last, First") for every student in the export, in the order they are listed, in a single pass over the file.
+    The columns are found from the export's header row; exports without one (like the registrar's HTML table)
+    fall back to the fixed cell positions used by create_rosters.
+    Sections are discovered from the course ID column rather than listed ahead of time:
+    a student's section name comes from section_names if their course ID has one, and is the course ID otherwise.
+    """
+    section_names = section_names or {}
+
+    def student(columns, row):
+        if len(row) <= max(columns.values()):
+            return None
+        course_id = row[columns['course_id']].strip()
+        first_name = row[columns['first_name']].strip()
+        last_name = row[columns['last_name']].strip()
+        if not course_id or not (first_name or last_name):
+            return None
+        return section_names.get(course_id, course_id), f"{last_name}, {first_name}"
+
+    columns = None
+    leading_rows = []
+    for row in read_rows(input_file_name, input_format):
+        if columns is None:
+            columns = detect_columns(row, column_names)
+            if columns is not None:
+                # Anything above the header row is a title or a blank line
+                leading_rows = []
+                continue
+            leading_rows.append(row)
+            if len(leading_rows) < HEADER_SEARCH_ROWS:
+                continue
+            # No header row, so this is the registrar's layout
+            columns = {'first_name': FIRST_NAME_CELL, 'last_name': LAST_NAME_CELL, 'course_id': COURSE_ID_CELL}
+            rows, leading_rows = leading_rows, []
+        else:
+            rows = [row]
+        for row in rows:
+            found = student(columns, row)
+            if found is not None:
+                yield found
+
+    # Short files without a header row
+    if columns is None:
+        columns = {'first_name': FIRST_NAME_CELL, 'last_name': LAST_NAME_CELL, 'course_id': COURSE_ID_CELL}
+        for leading_row in leading_rows:
+            found = student(columns, leading_row)
+            if found is not None:
+                yield found
+
+def import_rosters(input_file_name: str, output_dir: str, input_format: str = 'auto', section_names: dict[str, str] = None, column_names: dict[str, str] = None) -> dict[str, int]:
+    """
+    Writes a roster for every section found in the export (see read_students), in a single pass over the file.
+    Each section is written to <output_dir>/<name>.txt, replacing any roster already there
+    (roster_sync.py instead updates existing rosters with only the students who were added or dropped).
+    Students are buffered per section and written in batches of WRITE_BATCH_SIZE.
+
+    Input:
+    - input_file_name: the name of the export file
+    - output_dir: the directory to write the rosters to
+    - input_format: 'html', 'csv', 'tsv', or 'auto' to choose from the file extension
+    - section_names: an optional map between course IDs and the names of their sections
+    - column_names: an optional map from 'first_name', 'last_name', or 'course_id' to the header of that column
+
+    Returns a map between the name of each section written and the number of students in it.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    buffers = {}
+    counts = {}
+
+    def flush(section_name):
+        # The first batch creates (or replaces) the roster, and later batches are appended to it
+        mode = 'w' if counts[section_name] == len(buffers[section_name]) else 'a'
+        with open(os.path.join(output_dir, f"{safe_filename(section_name)}.txt"), mode) as output_file:
+            output_file.writelines(buffers[section_name])
+        buffers[section_name] = []
+
+    for section_name, name in read_students(input_file_name, input_format, section_names, column_names):
+        buffers.setdefault(section_name, []).append(name + "\n")
+        counts[section_name] = counts.get(section_name, 0) + 1
+        if len(buffers[section_name]) >= WRITE_BATCH_SIZE:
+            flush(section_name)
+
+    for section_name in buffers:
+        if buffers[section_name]:
+            flush(section_name)
+    return counts
+
+# Function to read the names of the sections from a CSV file
+def read_section_names(file_name: str) -> dict[str, str]:
+    """Reads a two column CSV file of course IDs and the names of their sections."""
+    with open(file_name, 'r', newline='') as names_file:
+        return {row[0].strip(): row[1].strip() for row in csv.reader(names_file) if len(row) >= 2}
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Create a roster for every section in a registrar export (HTML table, CSV, or TSV).")
+    parser.add_argument("input_file", help="the export to read, e.g. 'raw_rosters/CS 4349 - S25.html'")
+    parser.add_argument("--output-dir", default="./rosters", help="directory to write the rosters to (defaults to ./rosters)")
+    parser.add_argument("--format", choices=["auto", "html", "csv", "tsv"], default="auto", help="format of the export (defaults to choosing from the file extension)")
+    parser.add_argument("--section-names", help="CSV file of course IDs and the section names to use for their rosters, e.g. 2252-UTDAL-CS-4349-SEC001-23154,CS 4349.001 - MW 11_30am")
+    parser.add_argument("--first-name-column", help="header of the first name column, if it is not one of the usual names")
+    parser.add_argument("--last-name-column", help="header of the last name column, if it is not one of the usual names")
+    parser.add_argument("--course-id-column", help="header of the course ID column, if it is not one of the usual names")
+    args = parser.parse_args()
 
-# Create the output directories if they don't exist
-for dir_name in output_dir_names.values():
-    os.makedirs(os.path.dirname(dir_name), exist_ok=True)
-    print(f"Created directory {os.path.dirname(dir_name)}")
+    column_names = {column: name for column, name in [('first_name', args.first_name_column), ('last_name', args.last_name_column), ('course_id', args.course_id_column)] if name}
+    section_names = read_section_names(args.section_names) if args.section_names else None
 
-# Create the rosters
-create_rosters('raw_rosters/CS 4349 - S25.html', sections, output_dir_names)
\ No newline at end of file
+    # Create the rosters
+    counts = import_rosters(args.input_file, args.output_dir, args.format, section_names, column_names)
+    for section_name, count in counts.items():
+        print(f"Wrote {count} students to {os.path.join(args.output_dir, safe_filename(section_name))}.txt")
@@ -0,0 +1,176 @@
+"""
+Updates the rosters from a new registrar export with only the students who were added or dropped, instead of rewriting every roster.
+Students are matched by their key (their name, ignoring case and spacing), so a student whose name is only formatted differently
+in the new export keeps the spelling their attendance reports use. Rosters whose students have not changed are not written at all,
+so their versions, and everything cached against them (loaded rosters, search indexes, suggestions, the startup snapshot), stay valid.
+Every add and drop is appended to a change log (roster_changes.csv), and each dropped student is reported with the dates
+of the attendance reports they appear in.
+
+From the command line (run from the directory that contains rosters/ and reports/):
+    python roster_sync.py "raw_rosters/CS 4349 - S25.html" --section-names sections.csv [--dry-run]
+"""
+# Import modules from the standard library
+from collections import Counter
+from typing import Iterable
+import argparse
+import csv
+import datetime
+import os
+
+# Import functions from local modules
+from roster_creator import read_students, read_section_names, safe_filename
+from storage import get_storage, set_storage_backend, ROSTER_DIR, DATABASE_PATH
+
+# Log of every student added to or dropped from a roster by a sync
+CHANGE_LOG_PATH = "roster_changes.csv"
+
+class RosterDiff:
+    """
+    The students a new export adds to and drops from a section's roster, and the roster that results:
+    the existing roster in its order without the dropped students, with each added student placed after
+    the student listed before them in the export. Once the diff has been synced, dropped_attendance maps each dropped student
+    to the dates of the reports they appear in, and version is the roster's new version (None if it was not written).
+    """
+
+    def __init__(self, section: str, added: list[str], dropped: list[str], roster: list[str]) -> None:
+        self.section = section
+        self.added = added
+        self.dropped = dropped
+        self.roster = roster
+        self.dropped_attendance = {}
+        self.version = None
+
+    @property
+    def changed(self) -> bool:
+        return bool(self.added or self.dropped)
+
+# Function to get the key a student is matched by
+def student_key(name: str) -> str:
+    """Returns the name in lowercase with its spacing normalized, so "Smith ,Jo" and "smith, jo" are the same student."""
+    return ", ".join(" ".join(part.split()) for part in name.split(",")).casefold()
+
+# Function to compare a roster with the students in a new export
+def diff_roster(section: str, existing: list[str], incoming: list[str]) -> RosterDiff:
+    """
+    Returns the students in incoming that are not in existing (added) and the ones in existing that are not in incoming (dropped).
+    Students are compared by key, and by count, so that two students with the same name are only matched to two in the export.
+    """
+    # Most sections are unchanged from one export to the next, which needs no keys to tell
+    if existing == incoming:
+        return RosterDiff(section, [], [], list(existing))
+    existing_keys = [student_key(name) for name in existing]
+    incoming_keys = [student_key(name) for name in incoming]
+    existing_counts = Counter(existing_keys)
+    incoming_counts = Counter(incoming_keys)
+
+    # The last occurrences of a name are the ones dropped, and the last occurrences in the export the ones added
+    kept, dropped, seen = [], [], Counter()
+    for name, key in zip(existing, existing_keys):
+        seen[key] += 1
+        (kept if seen[key] <= incoming_counts[key] else dropped).append(name)
+
+    added, followers, seen = [], {}, Counter()
+    previous = None
+    for name, key in zip(incoming, incoming_keys):
+        seen[key] += 1
+        if seen[key] > existing_counts[key]:
+            added.append(name)
+            followers.setdefault(previous, []).append(name)
+        previous = key
+
+    # Place each added student after the student before them in the export (the ones at the top of the export go first)
+    roster = []
+    for root in [None, *kept]:
+        stack = [root]
+        while stack:
+            name = stack.pop()
+            if name is not None:
+                roster.append(name)
+            stack.extend(reversed(followers.pop(None if name is None else student_key(name), [])))
+    return RosterDiff(section, added, dropped, roster)
+
+# Function to find the reports that dropped students appear in
+def find_dropped_attendance(section: str, dropped: list[str]) -> dict[str, list[str]]:
+    """Returns the dates of the section's reports that each dropped student appears in, leaving out students in none of them."""
+    dropped = set(dropped)
+    attendance = {}
+    for date, names in get_storage().read_reports(section).items():
+        for name in names or []:
+            if name in dropped:
+                attendance.setdefault(name, []).append(date)
+    return attendance
+
+# Function to append to the change log
+def log_changes(diffs: Iterable[RosterDiff], log_path: str = CHANGE_LOG_PATH) -> None:
+    """Appends a (time, section, change, student) row for every student added or dropped."""
+    rows = [(diff.section, change, name) for diff in diffs for change, names in [("add", diff.added), ("drop", diff.dropped)] for name in names]
+    if not rows:
+        return
+    new_log = not os.path.exists(log_path)
+    now = datetime.datetime.now().isoformat(timespec="seconds")
+    with open(log_path, "a", newline="") as log_file:
+        writer = csv.writer(log_file)
+        if new_log:
+            writer.writerow(["time", "section", "change", "student"])
+        writer.writerows((now, *row) for row in rows)
+
+# Function to update one roster
+def sync_roster(section: str, incoming: list[str], existing: list[str] = None, dry_run: bool = False, log_path: str = CHANGE_LOG_PATH) -> RosterDiff:
+    """
+    Updates the section's roster (existing, which is read from storage if it is not given) to the students in incoming,
+    writing it only if students were added or dropped, logging the changes, and finding the reports the dropped students appear in.
+    A section without a roster gets one with every student.
+    """
+    storage = get_storage()
+    if existing is None:
+        existing = storage.read_roster(section) if section in storage.list_sections() else []
+    diff = diff_roster(section, existing, incoming)
+    if diff.dropped:
+        diff.dropped_attendance = find_dropped_attendance(section, diff.dropped)
+    if diff.changed and not dry_run:
+        diff.version = storage.write_roster(section, diff.roster)
+        log_changes([diff], log_path)
+    return diff
+
+# Function to update every roster in an export
+def sync_rosters(input_file_name: str, input_format: str = 'auto', section_names: dict[str, str] = None, column_names: dict[str, str] = None,
+                 dry_run: bool = False, log_path: str = CHANGE_LOG_PATH) -> tuple[list[RosterDiff], list[str]]:
+    """
+    Syncs the roster of every section in the export (see roster_creator.read_students) with the students it lists.
+    Sections that have a roster but are not in the export are left as they are, since an export may only cover some courses.
+    Returns the diff of every section in the export, and the sections that were not in it.
+    """
+    incoming = {}
+    for section_name, name in read_students(input_file_name, input_format, section_names, column_names):
+        incoming.setdefault(safe_filename(section_name), []).append(name)
+
+    storage = get_storage()
+    existing = storage.list_sections()
+    diffs = [sync_roster(section, names, storage.read_roster(section) if section in existing else [], dry_run, log_path) for section, names in incoming.items()]
+    return diffs, sorted(section for section in existing if section not in incoming)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Update the rosters with the students added to or dropped from a registrar export (HTML table, CSV, or TSV).")
+    parser.add_argument("input_file", help="the export to read, e.g. 'raw_rosters/CS 4349 - S25.html'")
+    parser.add_argument("--format", choices=["auto", "html", "csv", "tsv"], default="auto", help="format of the export (defaults to choosing from the file extension)")
+    parser.add_argument("--section-names", help="CSV file of course IDs and the section names their rosters are saved under")
+    parser.add_argument("--dry-run", action="store_true", help="report the changes without writing any roster or logging them")
+    parser.add_argument("--storage", choices=["text", "sqlite"], default="text", help="where the rosters and reports are kept (defaults to the rosters/ and reports/ text files)")
+    parser.add_argument("--database", default=DATABASE_PATH, help="database file for --storage sqlite (defaults to attendance.db)")
+    args = parser.parse_args()
+    set_storage_backend(args.storage, ROSTER_DIR, args.database)
+
+    section_names = read_section_names(args.section_names) if args.section_names else None
+    diffs, missing = sync_rosters(args.input_file, args.format, section_names, dry_run=args.dry_run)
+    for diff in diffs:
+        if not diff.changed:
+            continue
+        print(f"{diff.section}: {len(diff.added)} added, {len(diff.dropped)} dropped{' (not written)' if args.dry_run else ''}")
+        for name in diff.added:
+            print(f"  + {name}")
+        for name in diff.dropped:
+            dates = diff.dropped_attendance.get(name)
+            print(f"  - {name}" + (f" (in {len(dates)} reports: {', '.join(dates)})" if dates else ""))
+    print(f"{sum(diff.changed for diff in diffs)} of {len(diffs)} sections changed")
+    if missing:
+        print(f"Not in the export, left unchanged: {', '.join(missing)}")
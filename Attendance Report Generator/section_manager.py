@@ -1,37 +1,99 @@
 # Import modules from the standard library
 import tkinter as tk
 from tkinter import simpledialog, messagebox, filedialog, ttk
-import os
 
 # Import functions from local modules
 from attendance_report_file_manager import update_report_mode_dropdown
-from name_suggestion import on_name_entry
+from attendance_set import AttendanceSet
+from name_suggestion import on_name_entry, index_section, forget_section
+from report_writer import watch_attendance
+from roster_sync import sync_roster
+from storage import get_storage
+
+class RosterCache(dict):
+    """
+    The map between section names and their students that the rest of the app uses, with the rosters read lazily.
+    load_sections only records each section and its roster's version (the file's mtime with the text backend);
+    a roster is read (and indexed for name suggestions) the first time its section is looked up,
+    and is only read again if its version has changed since.
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.versions = {}  # Section name -> version of its roster when it was tracked
+
+    def __getitem__(self, section: str) -> list[str]:
+        student_list = super().__getitem__(section)
+        if student_list is None:
+            student_list = get_storage().read_roster(section)
+            super().__setitem__(section, student_list)
+            index_section(section, student_list)
+        return student_list
+
+    def get(self, section: str, default=None):
+        return self[section] if section in self else default
+
+    def track(self, section: str, version: int) -> None:
+        """Records the section's roster version, dropping the loaded students if the roster has changed since they were read."""
+        if self.versions.get(section) != version:
+            self.versions[section] = version
+            super().__setitem__(section, None)
+            forget_section(section)
+
+    def add(self, section: str, version: int, student_list: list[str]) -> None:
+        """Adds a section whose students are already known, e.g. because the app just wrote its roster."""
+        self.versions[section] = version
+        super().__setitem__(section, student_list)
+        index_section(section, student_list)
+
+    def restore(self, section: str, version: int, student_list: list[str]) -> bool:
+        """
+        Fills in students read in an earlier session (see startup.py) if the section's roster is still at that version and is not loaded yet,
+        and returns whether it was. The search indexes are built the first time the section is searched.
+        """
+        if self.versions.get(section) != version or super().get(section) is not None:
+            return False
+        super().__setitem__(section, student_list)
+        return True
+
+    def loaded(self) -> dict[str, tuple[int, list[str]]]:
+        """Returns the version and students of every section whose roster has been read."""
+        return {section: (self.versions[section], student_list) for section, student_list in self.items() if student_list is not None}
+
+    def __delitem__(self, section: str) -> None:
+        super().__delitem__(section)
+        self.versions.pop(section, None)
+        forget_section(section)
 
 # Function to dynamically load sections and students
-def load_sections(ROSTER_DIR: str, sections: dict) -> None:
-    """Loads sections and their corresponding students from the /rosters directory."""
-    sections.clear()
-
-    # Check if the rosters directory exists
-    if not os.path.exists(ROSTER_DIR):
-        os.makedirs(ROSTER_DIR)
-
-    # Loop through all text files in the /rosters directory
-    for filename in os.listdir(ROSTER_DIR):
-        if filename.endswith('.txt'):
-            section_name = os.path.splitext(filename)[0]  # Extract section name from filename
-            student_list = load_students_from_file(os.path.join(ROSTER_DIR, filename))
+def load_sections(sections: dict) -> None:
+    """
+    Loads sections and their corresponding students from the storage backend (the /rosters directory by default).
+    With a RosterCache only the section names are loaded here, and each roster is read when its section is first used;
+    sections whose rosters have not changed since the last call keep their students without rereading them.
+    """
+    # Find every section that has a roster, along with its roster's version
+    found = get_storage().list_sections()
+
+    # Forget the sections whose rosters have been removed
+    for section_name in [section_name for section_name in sections if section_name not in found]:
+        del sections[section_name]
+        # A RosterCache drops the section's search indexes itself
+        if not isinstance(sections, RosterCache):
+            forget_section(section_name)
+
+    for section_name, version in found.items():
+        if isinstance(sections, RosterCache):
+            sections.track(section_name, version)
+        else:
+            student_list = get_storage().read_roster(section_name)
             sections[section_name] = student_list
+            # Build the search index once here so that typing in the name entry does not have to scan the whole roster
+            index_section(section_name, student_list)
 
-# Function to read student names from a roster file
-def load_students_from_file(filename: str) -> list[str]:
-    """Reads student names from a file and returns them as a list."""
-    with open(filename, 'r') as file:
-        return [line.strip() for line in file.readlines()]
-    
 # Function to add a new roster
-def add_new_roster(students: dict, ROSTER_DIR: str, section_dropdown: ttk.Combobox, section_var: tk.StringVar) -> None:
-    """Adds a new roster to the /rosters directory."""
+def add_new_roster(students: dict, section_dropdown: ttk.Combobox, section_var: tk.StringVar, attendance_reports: dict[str, AttendanceSet]) -> None:
+    """Adds a new roster to the storage backend (the /rosters directory by default), and a new section's attendance to attendance_reports."""
     # Open a file dialog to select a file containing student names
     file_path = filedialog.askopenfilename(title="Select a File", filetypes=(("Text Files", "*.txt"), ("All Files", "*.*")))
     
@@ -47,32 +109,51 @@ def add_new_roster(students: dict, ROSTER_DIR: str, section_dropdown: ttk.Combob
         # Ask for a section name for the new roster
         section_name = simpledialog.askstring("New Section", "Enter the name of the new section:")
         if section_name:
-            # Save the student names to a new roster file
-            roster_file_path = os.path.join(ROSTER_DIR, f"{section_name}.txt")
-            with open(roster_file_path, 'w') as file:
-                for name in student_list:
-                    file.write(name + '\n')
-                file.flush()
-                file.close()
-            
-            # Reload sections and update the dropdown
-            load_sections(ROSTER_DIR, students)  # Reload students after adding a new roster
+            if section_name in students:
+                # The section already has a roster, so only the students who were added or dropped are changed,
+                # and the roster is not rewritten at all (keeping everything cached against it) if none were
+                diff = sync_roster(section_name, student_list, existing=students[section_name])
+                if not diff.changed:
+                    messagebox.showinfo("Roster Unchanged", f"The roster for {section_name} already has these students.")
+                else:
+                    message = f"Updated the roster for {section_name}: {len(diff.added)} added, {len(diff.dropped)} dropped."
+                    if diff.dropped_attendance:
+                        message += "\n\nDropped students who appear in attendance reports:\n" + "\n".join(
+                            f"{name}: {len(dates)} reports" for name, dates in diff.dropped_attendance.items())
+                    messagebox.showinfo("Roster Updated", message)
+                version, student_list = diff.version, diff.roster
+            else:
+                # Save the student names as the new section's roster
+                version = get_storage().write_roster(section_name, student_list)
+
+            # Add the new (or changed) section without rereading every roster, and update the dropdown
+            if version is not None:
+                if isinstance(students, RosterCache):
+                    students.add(section_name, version, student_list)
+                else:
+                    students[section_name] = student_list
+                    index_section(section_name, student_list)
+            # Give a new section somewhere to mark attendance, journaled like the sections loaded at startup
+            if section_name not in attendance_reports:
+                attendance_reports[section_name] = AttendanceSet()
+                watch_attendance(section_name, attendance_reports[section_name])
             section_dropdown['values'] = list(students.keys())
             section_var.set(section_name)  # Set the new section as the current one
 
 # Function to remove an existing roster
-def remove_roster(students: dict, section_var: tk.StringVar, ROSTER_DIR: str, section_dropdown: ttk.Combobox) -> None:
-    """Removes an existing roster from the /rosters directory."""
+def remove_roster(students: dict, section_var: tk.StringVar, section_dropdown: ttk.Combobox) -> None:
+    """Removes an existing roster from the storage backend (the /rosters directory by default)."""
     section_to_remove = section_var.get()
     if section_to_remove in students:
         confirm = messagebox.askyesno("Confirm Deletion", f"Are you sure you want to delete the roster for {section_to_remove}?")
         if confirm:
-            # Remove the file
-            file_path = os.path.join(ROSTER_DIR, f"{section_to_remove}.txt")
-            os.remove(file_path)
+            # Remove the roster, keeping the section's attendance reports
+            get_storage().delete_roster(section_to_remove)
 
-            # Reload sections and update the dropdown
-            load_sections(ROSTER_DIR, students)  # Reload students after removing a roster
+            # Remove just this section instead of rereading every roster, and update the dropdown
+            del students[section_to_remove]
+            if not isinstance(students, RosterCache):
+                forget_section(section_to_remove)
             section_dropdown['values'] = list(students.keys())
             if students:
                 section_var.set(list(students.keys())[0])  # Set to the first section if available
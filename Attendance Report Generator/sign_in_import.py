@@ -0,0 +1,254 @@
+"""
+Marks attendance from a sign-in sheet (a text file with one name per line, or a CSV export of a sign-in form)
+by resolving every free-typed name against the section's roster in one pass.
+Names that match a student confidently are added to the report, and the rest are left for review.
+The command line resolves large sheets with a pool of worker processes; the GUI resolves them on a background thread,
+since the Tk process already runs other threads (the matching service and report writer) and forking it is not safe.
+
+From the command line (run from the directory that contains rosters/ and reports/):
+    python sign_in_import.py "CS 4349.001 - MW 11_30am" 02-03-2025 sign_ins.csv
+"""
+# Import modules from the standard library
+import tkinter as tk
+from tkinter import filedialog, messagebox
+import argparse
+import csv
+import datetime
+import os
+
+# Import functions from local modules
+from name_index import NameIndex, TOP_K, build_name_index
+from attendance_set import AttendanceSet
+from attendance_report_file_manager import update_attendance_listbox
+from storage import get_storage, set_storage_backend, ROSTER_DIR, DATABASE_PATH
+
+# Lowest score (0 to 100) at which a typed name is added to the report without being reviewed
+CONFIDENCE_THRESHOLD = 88
+
+# Number of possible matches kept for each name that needs review
+REVIEW_CHOICES = 5
+
+# Sheets with fewer names than this are resolved in this process, since starting a process pool would take longer
+PARALLEL_MIN_NAMES = 500
+
+# Number of names each worker process resolves at a time
+CHUNK_SIZE = 250
+
+# Header names (compared in lowercase) of the column holding the typed name in a CSV sign-in sheet
+NAME_COLUMN_ALIASES = ('name', 'full name', 'student', 'student name', 'your name')
+
+# Milliseconds between checks for a sign-in sheet that is being resolved in the background
+POLL_MS = 50
+
+# Index of the roster being resolved against, set once in each worker process
+worker_index = None
+
+class Resolution:
+    """
+    A typed name from a sign-in sheet and the roster names it may be, best first.
+    score is the fuzzy score of the best match, and confident says whether it can be added without review:
+    the score must reach the threshold and no other student may share it.
+    """
+
+    def __init__(self, typed_name: str, matches: list[tuple[str, int]], threshold: int = CONFIDENCE_THRESHOLD) -> None:
+        self.typed_name = typed_name
+        self.matches = matches
+        self.match = matches[0][0] if matches else None
+        self.score = matches[0][1] if matches else 0
+        tied = len(matches) > 1 and matches[1][1] == self.score
+        self.confident = self.score >= threshold and not tied
+
+# Function to read the typed names from a sign-in sheet
+def read_sign_ins(file_name: str) -> list[str]:
+    """
+    Returns the non-empty names in a sign-in sheet.
+    A .csv file is read from its name column (or joins its first and last name columns), and any other file has one name per line.
+    """
+    if os.path.splitext(file_name)[1].lower() != '.csv':
+        with open(file_name, 'r') as file:
+            return [line.strip() for line in file if line.strip()]
+
+    with open(file_name, 'r', newline='') as file:
+        rows = list(csv.reader(file))
+    if not rows:
+        return []
+    header = [' '.join(cell.split()).lower() for cell in rows[0]]
+    if any(alias in header for alias in NAME_COLUMN_ALIASES):
+        column = next(header.index(alias) for alias in NAME_COLUMN_ALIASES if alias in header)
+        return [row[column].strip() for row in rows[1:] if len(row) > column and row[column].strip()]
+    if 'first name' in header and 'last name' in header:
+        first, last = header.index('first name'), header.index('last name')
+        return [f"{row[first].strip()} {row[last].strip()}".strip() for row in rows[1:] if len(row) > max(first, last) and (row[first].strip() or row[last].strip())]
+    # Without a recognizable header, every row is a name in its first cell
+    return [row[0].strip() for row in rows if row and row[0].strip()]
+
+# Function to score one typed name against the roster
+def resolve_name(typed_name: str, name_index: NameIndex, threshold: int = CONFIDENCE_THRESHOLD) -> Resolution:
+    """Scores the typed name against the roster names the index finds for it (or the whole roster if it is small)."""
+    # Imported here (like the worker pool below) so that it is not imported when the app starts, only when a sheet is imported
+    from fuzzywuzzy import process
+    candidates = name_index.names if len(name_index.names) <= TOP_K else name_index.candidates(typed_name) or name_index.names
+    return Resolution(typed_name, process.extract(typed_name, candidates, limit=REVIEW_CHOICES), threshold)
+
+# Function to set up a worker process
+def init_worker(name_index: NameIndex) -> None:
+    """Keeps the roster index in the worker, so it is sent to each worker once instead of with every chunk of names."""
+    global worker_index
+    worker_index = name_index
+
+# Function to resolve a chunk of names in a worker process
+def resolve_chunk(typed_names: list[str], threshold: int) -> list[Resolution]:
+    return [resolve_name(typed_name, worker_index, threshold) for typed_name in typed_names]
+
+# Function to resolve every name on a sign-in sheet
+def resolve_sign_ins(typed_names: list[str], student_list: list[str], threshold: int = CONFIDENCE_THRESHOLD, workers: int = None) -> list[Resolution]:
+    """
+    Resolves every typed name against the roster, in the order they were given.
+    The roster index is built once and shared with a pool of worker processes, which each resolve chunks of names;
+    small sheets (or workers=1) are resolved in this process instead.
+    """
+    name_index = build_name_index(student_list)
+    if workers == 1 or len(typed_names) < PARALLEL_MIN_NAMES:
+        return [resolve_name(typed_name, name_index, threshold) for typed_name in typed_names]
+
+    from concurrent.futures import ProcessPoolExecutor
+    chunks = [typed_names[i:i + CHUNK_SIZE] for i in range(0, len(typed_names), CHUNK_SIZE)]
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_worker, initargs=(name_index,)) as executor:
+        return [resolution for resolutions in executor.map(resolve_chunk, chunks, [threshold] * len(chunks)) for resolution in resolutions]
+
+# Function to split resolved names into the ones to add and the ones to review
+def split_resolutions(resolutions: list[Resolution]) -> tuple[list[str], list[Resolution]]:
+    """Returns the confidently matched students (each once, in sign-in order) and the resolutions that need review."""
+    accepted = AttendanceSet(resolution.match for resolution in resolutions if resolution.confident)
+    review = [resolution for resolution in resolutions if not resolution.confident]
+    return list(accepted), review
+
+# Function to import a sign-in sheet into the attendance list
+def import_sign_in_sheet(root: tk.Tk, section_var: tk.StringVar, students: dict, attendance_listbox: tk.Listbox, attendance_reports: dict[str, AttendanceSet]) -> None:
+    """
+    Adds every confidently matched name from a sign-in sheet to the attendance list, and opens a review window for the rest.
+    The names are resolved on a background thread, so the window keeps responding while a large sheet is scored.
+    """
+    section = section_var.get()
+    if section not in students:
+        messagebox.showwarning("Warning", "Please select a section first.")
+        return
+
+    file_path = filedialog.askopenfilename(title="Select a Sign-In Sheet", filetypes=(("Sign-In Sheets", "*.csv *.txt"), ("All Files", "*.*")))
+    if not file_path:
+        return
+
+    typed_names = read_sign_ins(file_path)
+    # Resolved in this process (workers=1): worker processes would have to be forked from the multithreaded Tk process
+    from concurrent.futures import ThreadPoolExecutor
+    executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="sign-in-import")
+    future = executor.submit(resolve_sign_ins, typed_names, students[section], workers=1)
+    executor.shutdown(wait=False)
+
+    def check() -> None:
+        if not future.done():
+            root.after(POLL_MS, check)
+            return
+        try:
+            accepted, review = split_resolutions(future.result())
+        except Exception as error:
+            messagebox.showerror("Error", f"Could not import the sign-in sheet: {error}")
+            return
+        for name in accepted:
+            attendance_reports[section].add(name)
+        update_attendance_listbox(section_var, attendance_listbox, attendance_reports)
+
+        messagebox.showinfo("Sign-In Sheet Imported", f"Added {len(accepted)} students from {len(typed_names)} sign-ins. {len(review)} sign-ins need review.")
+        if review:
+            open_review_queue(root, section_var, attendance_listbox, attendance_reports, review, section)
+    root.after(POLL_MS, check)
+
+# Function to open the review queue for unresolved sign-ins
+def open_review_queue(root: tk.Tk, section_var: tk.StringVar, attendance_listbox: tk.Listbox, attendance_reports: dict[str, AttendanceSet], review: list[Resolution], section: str = None) -> None:
+    """
+    Opens a window listing the sign-ins that need review, where each can be matched to one of its possible students or skipped.
+    The students are added to the given section (the one the sheet was imported into), or the selected section if none is given.
+    """
+    section = section or section_var.get()
+    window = tk.Toplevel(root)
+    window.title(f"Review Sign-Ins - {section}")
+
+    tk.Label(window, text="Sign-Ins to Review", font=("Arial", 14)).grid(row=0, column=0, padx=10, pady=5)
+    tk.Label(window, text="Possible Students", font=("Arial", 14)).grid(row=0, column=1, padx=10, pady=5)
+    queue_listbox = tk.Listbox(window, font=("Arial", 12), height=14, width=30, exportselection=False)
+    queue_listbox.grid(row=1, column=0, padx=10)
+    match_listbox = tk.Listbox(window, font=("Arial", 12), height=14, width=36, exportselection=False)
+    match_listbox.grid(row=1, column=1, padx=10)
+    queue_listbox.insert(tk.END, *(resolution.typed_name for resolution in review))
+
+    def show_matches(event=None) -> None:
+        match_listbox.delete(0, tk.END)
+        selection = queue_listbox.curselection()
+        if selection:
+            match_listbox.insert(tk.END, *(f"{name} ({score})" for name, score in review[selection[0]].matches))
+            match_listbox.selection_set(0)
+
+    def finish(row: int) -> None:
+        # Take the sign-in off the queue and move on to the next one
+        del review[row]
+        queue_listbox.delete(row)
+        if not review:
+            window.destroy()
+            return
+        queue_listbox.selection_set(min(row, len(review) - 1))
+        show_matches()
+
+    def accept() -> None:
+        selection, match = queue_listbox.curselection(), match_listbox.curselection()
+        if selection and match:
+            if attendance_reports[section].add(review[selection[0]].matches[match[0]][0]):
+                update_attendance_listbox(section_var, attendance_listbox, attendance_reports)
+            finish(selection[0])
+
+    def skip() -> None:
+        selection = queue_listbox.curselection()
+        if selection:
+            finish(selection[0])
+
+    queue_listbox.bind("<<ListboxSelect>>", show_matches)
+    match_listbox.bind("<Double-Button-1>", lambda event: accept())
+    buttons = tk.Frame(window)
+    buttons.grid(row=2, column=0, columnspan=2, pady=10)
+    tk.Button(buttons, text="Add Selected Student", command=accept, font=("Arial", 12)).pack(side=tk.LEFT, padx=5)
+    tk.Button(buttons, text="Skip Sign-In", command=skip, font=("Arial", 12)).pack(side=tk.LEFT, padx=5)
+    queue_listbox.selection_set(0)
+    show_matches()
+
+# Function to parse a date argument
+def parse_date(value: str) -> str:
+    """Checks that the date is in the same MM-DD-YYYY format that the reports are named with."""
+    try:
+        datetime.datetime.strptime(value, "%m-%d-%Y")
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"'{value}' is not a date in the format MM-DD-YYYY")
+    return value
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Add the students on a sign-in sheet to a section's attendance report, without the GUI.")
+    parser.add_argument("section", help="name of the section, as in rosters/<section>.txt")
+    parser.add_argument("date", type=parse_date, help="date of the report to add the students to (MM-DD-YYYY)")
+    parser.add_argument("sign_in_file", help="text file with one name per line, or a CSV file with a name column")
+    parser.add_argument("--threshold", type=int, default=CONFIDENCE_THRESHOLD, help=f"lowest score at which a name is added without review (defaults to {CONFIDENCE_THRESHOLD})")
+    parser.add_argument("--workers", type=int, default=None, help="number of worker processes (defaults to the number of CPUs)")
+    parser.add_argument("--storage", choices=["text", "sqlite"], default="text", help="where the rosters and reports are kept (defaults to the rosters/ and reports/ text files)")
+    parser.add_argument("--database", default=DATABASE_PATH, help="database file for --storage sqlite (defaults to attendance.db)")
+    args = parser.parse_args()
+    set_storage_backend(args.storage, ROSTER_DIR, args.database)
+
+    typed_names = read_sign_ins(args.sign_in_file)
+    accepted, review = split_resolutions(resolve_sign_ins(typed_names, get_storage().read_roster(args.section), args.threshold, args.workers))
+
+    # Add the students to any report already saved for the date
+    report = AttendanceSet(get_storage().read_report(args.section, args.date) or [])
+    added = sum(report.add(name) for name in accepted)
+    get_storage().save_report(args.section, args.date, list(report))
+    print(f"Added {added} students from {len(typed_names)} sign-ins to the report for {args.date}")
+
+    for resolution in review:
+        suggestions = ", ".join(f"{name} ({score})" for name, score in resolution.matches[:3])
+        print(f"Needs review: '{resolution.typed_name}' -> {suggestions or 'no matches'}")
@@ -0,0 +1,107 @@
+"""
+Fast start for the GUI app:
+- The modules that are slow to import (numpy, fuzzywuzzy's scorers, multiprocessing, sqlite3) are only imported where they are used,
+  and preload_modules() imports them on a background thread once the window is showing, so the first keystroke does not wait on them.
+- The rosters and report catalogs read during a session are saved as a snapshot (startup.snapshot) when the app closes,
+  and restored when it starts, so reopening a section does not reread or reparse its files.
+  A snapshot roster is only used if its version (its file's mtime) is the one load_sections found,
+  and a snapshot catalog is only used if its file's mtime is unchanged, and is then checked against the report files like one read from disk
+  (only if the report directory's mtime has changed since the catalog was last checked).
+- StartupTimer times each phase of startup, which main.py records in the instrumentation log once the window is showing.
+"""
+# Import modules from the standard library
+import importlib
+import marshal
+import os
+import sys
+import threading
+import time
+
+# Import functions from local modules
+import report_catalog
+from atomic_file import atomic_write
+from storage import get_storage
+
+# Snapshot of the rosters and report catalogs read in earlier sessions
+SNAPSHOT_PATH = "startup.snapshot"
+
+# Changed whenever the layout of the snapshot changes, so that older snapshots are ignored
+SNAPSHOT_FORMAT = 2
+
+# Modules that are imported on a background thread once the window is showing
+PRELOAD_MODULES = ["fuzzywuzzy.process", "attendance_store", "numpy"]
+
+class StartupTimer:
+    """Records how long each phase of startup took. Phases are marked in order, each one timed from the end of the previous one."""
+
+    def __init__(self, started: float = None) -> None:
+        self.started = time.perf_counter() if started is None else started
+        self.last = self.started
+        self.phases = {}  # Phase -> milliseconds
+
+    def mark(self, phase: str) -> None:
+        now = time.perf_counter()
+        self.phases[phase] = (now - self.last) * 1000
+        self.last = now
+
+    def total_ms(self) -> float:
+        return (self.last - self.started) * 1000
+
+# Function to identify the storage the snapshot was taken from
+def storage_key() -> str:
+    """Returns the storage backend and where it keeps its data, so a snapshot is not used with a different roster directory or database."""
+    storage = get_storage()
+    return f"{type(storage).__name__}:{os.path.abspath(getattr(storage, 'roster_dir', getattr(storage, 'database', '')))}"
+
+# Function to read the snapshot
+def load_snapshot(path: str = SNAPSHOT_PATH) -> dict:
+    """Returns the snapshot, or an empty one if there is none or it was written by another format, Python version, or storage backend."""
+    empty = {"rosters": {}, "catalogs": {}}
+    try:
+        with open(path, "rb") as file:
+            snapshot = marshal.load(file)
+    except (OSError, EOFError, ValueError, TypeError):
+        return empty
+    if not isinstance(snapshot, dict) or snapshot.get("header") != (SNAPSHOT_FORMAT, sys.version_info[:2], storage_key()):
+        return empty
+    return snapshot
+
+# Function to restore the rosters and report catalogs of a snapshot
+def restore_snapshot(students, snapshot: dict) -> int:
+    """
+    Fills in the students of every section in the RosterCache whose roster has not changed since the snapshot,
+    and the report catalogs of the sections in the snapshot. Returns the number of rosters restored.
+    """
+    restored = 0
+    for section, (version, student_list) in snapshot["rosters"].items():
+        restored += students.restore(section, version, student_list)
+    for section, (mtime, entries, directory_mtime) in snapshot["catalogs"].items():
+        report_catalog.restore_report_catalog(section, mtime, entries, directory_mtime)
+    return restored
+
+# Function to save the snapshot
+def save_snapshot(students, snapshot: dict, path: str = SNAPSHOT_PATH) -> bool:
+    """
+    Saves the rosters and report catalogs that are loaded (the ones restored from the snapshot and the ones read in this session),
+    unless they are the same as in the snapshot the app started with. Returns whether the snapshot was written.
+    """
+    rosters = students.loaded()
+    catalogs = {section: (mtime, catalog.entries, catalog.directory_mtime) for section, (mtime, catalog) in report_catalog.report_catalogs.items() if section in students}
+    if rosters == snapshot["rosters"] and catalogs == snapshot["catalogs"]:
+        return False
+    header = (SNAPSHOT_FORMAT, sys.version_info[:2], storage_key())
+    atomic_write(path, marshal.dumps({"header": header, "rosters": rosters, "catalogs": catalogs}))
+    return True
+
+# Function to import the slow modules in the background
+def preload_modules(modules: list[str] = PRELOAD_MODULES) -> threading.Thread:
+    """Imports the modules on a background thread, so that they are already loaded the first time they are used."""
+    def preload() -> None:
+        for module in modules:
+            try:
+                importlib.import_module(module)
+            except ImportError:
+                continue
+    thread = threading.Thread(target=preload, name="preload-modules", daemon=True)
+    thread.start()
+    return thread
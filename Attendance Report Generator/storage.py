@@ -0,0 +1,361 @@
+"""
+Where the app keeps its rosters and attendance reports, behind one interface that the GUI modules use for both backends:
+- text: the original layout of rosters/<section>.txt and reports/<section>/<date>.txt files,
+  with the attendance store and report catalog kept alongside the reports
+- sqlite: a single attendance.db database with sections, students, sessions, and attendance tables
+
+Existing text rosters and reports can be copied into a database with:
+    python storage.py migrate --database attendance.db
+"""
+# Import modules from the standard library
+from contextlib import contextmanager
+import argparse
+import datetime
+import os
+import threading
+import time
+
+# Import functions from local modules
+from atomic_file import atomic_write
+from report_catalog import load_report_catalog, report_key, UNDATED_KEY
+
+# Directory containing roster files for the text backend
+ROSTER_DIR = "rosters"
+
+# Database file for the sqlite backend
+DATABASE_PATH = "attendance.db"
+
+# Tables of the sqlite backend. A section's roster is the students with a position, in order of it;
+# students who attended but are no longer on the roster keep their attendance with a NULL position.
+# Sessions are the dates a report was saved for, with day holding the date's ordinal so they sort and filter by date.
+# An attendance row's position is the order the student was marked in, so a report reads back in the order it was saved.
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sections (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE,
+    roster_version INTEGER
+);
+CREATE TABLE IF NOT EXISTS students (
+    id INTEGER PRIMARY KEY,
+    section_id INTEGER NOT NULL REFERENCES sections(id) ON DELETE CASCADE,
+    name TEXT NOT NULL,
+    position INTEGER,
+    UNIQUE (section_id, name)
+);
+CREATE TABLE IF NOT EXISTS sessions (
+    id INTEGER PRIMARY KEY,
+    section_id INTEGER NOT NULL REFERENCES sections(id) ON DELETE CASCADE,
+    date TEXT NOT NULL,
+    day INTEGER,
+    UNIQUE (section_id, date)
+);
+CREATE TABLE IF NOT EXISTS attendance (
+    session_id INTEGER NOT NULL REFERENCES sessions(id) ON DELETE CASCADE,
+    student_id INTEGER NOT NULL REFERENCES students(id) ON DELETE CASCADE,
+    position INTEGER,
+    PRIMARY KEY (session_id, student_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS students_by_position ON students (section_id, position);
+CREATE INDEX IF NOT EXISTS sessions_by_day ON sessions (section_id, day);
+CREATE INDEX IF NOT EXISTS attendance_by_student ON attendance (student_id);
+"""
+
+class TextBackend:
+    """
+    Keeps rosters as rosters/<section>.txt files and reports as reports/<section>/<date>.txt files, as the app always has.
+    Reads go through the attendance store and report catalog, so they avoid rereading every report file,
+    and only look at the report files at all once the section's report directory has changed.
+    A roster's version is its file's mtime.
+    Every read and write holds the backend's lock, since the report writer thread updates the same cached stores and catalogs
+    that the main thread reads (and brings up to date with the report files).
+    """
+
+    def __init__(self, roster_dir: str = ROSTER_DIR) -> None:
+        self.roster_dir = roster_dir
+        self.lock = threading.RLock()
+
+    def roster_path(self, section: str) -> str:
+        return os.path.join(self.roster_dir, f"{section}.txt")
+
+    def store(self, section: str):
+        """Returns the section's attendance store."""
+        # Imported here so that numpy is only imported once a section's reports are used, not when the app starts
+        from attendance_store import load_attendance_store
+        with self.lock:
+            return load_attendance_store(section)
+
+    def list_sections(self) -> dict[str, int]:
+        """Returns every section that has a roster, mapped to a version that changes whenever its roster does."""
+        with self.lock:
+            os.makedirs(self.roster_dir, exist_ok=True)
+            sections = {}
+            with os.scandir(self.roster_dir) as entries:
+                for entry in entries:
+                    if entry.name.endswith(".txt"):
+                        sections[os.path.splitext(entry.name)[0]] = entry.stat().st_mtime_ns
+            return sections
+
+    def read_roster(self, section: str) -> list[str]:
+        """Returns the section's students in roster order."""
+        with self.lock:
+            with open(self.roster_path(section), "r") as file:
+                return [line.strip() for line in file]
+
+    def write_roster(self, section: str, names: list[str]) -> int:
+        """Replaces the section's roster and returns its new version."""
+        with self.lock:
+            os.makedirs(self.roster_dir, exist_ok=True)
+            atomic_write(self.roster_path(section), "".join(name + "\n" for name in names))
+            return os.stat(self.roster_path(section)).st_mtime_ns
+
+    def delete_roster(self, section: str) -> None:
+        """Removes the section's roster, keeping its attendance reports."""
+        with self.lock:
+            os.remove(self.roster_path(section))
+
+    def report_dates(self, section: str, start_date: datetime.date = None, end_date: datetime.date = None) -> list[str]:
+        """Returns the dates of the section's reports, oldest first, optionally only those from start_date to end_date (inclusive)."""
+        with self.lock:
+            if not os.path.exists(f"reports/{section}"):
+                return []
+            catalog = load_report_catalog(section)
+            if start_date is None and end_date is None:
+                return catalog.dates()
+            return catalog.between(start_date, end_date)
+
+    def read_report(self, section: str, date: str) -> list[str]:
+        """Returns the students who attended on the date, in the order they were marked, or None if there is no report for the date."""
+        with self.lock:
+            if not os.path.exists(f"reports/{section}"):
+                return None
+            return self.store(section).get(date)
+
+    def read_reports(self, section: str) -> dict[str, list[str]]:
+        """Returns every report of the section (date -> students who attended, in the order they were marked), oldest first."""
+        with self.lock:
+            dates = self.report_dates(section)
+            if not dates:
+                return {}
+            # The store is loaded (and checked against the report files) once, rather than once per report
+            store = self.store(section)
+            return {date: store.get(date) for date in dates}
+
+    def save_reports(self, section: str, reports: dict[str, list[str]]) -> None:
+        """Saves several reports at once (date -> students who attended), writing the store and catalog only once."""
+        with self.lock:
+            os.makedirs(f"reports/{section}", exist_ok=True)
+            # Load the store and catalog before the text reports are written, so the new reports are added to them here
+            # rather than being found (and reread) as reports added by hand
+            store = self.store(section)
+            catalog = load_report_catalog(section)
+            for date, names in reports.items():
+                # Each report is replaced atomically, so a crash mid-save leaves the previous report (or none) rather than a truncated one
+                atomic_write(f"reports/{section}/{date}.txt", "".join(name + "\n" for name in names))
+                store.set(date, list(names))
+                store.stamp(date)
+                catalog.add(date)
+            catalog.save()
+            store.save()
+            # Saving the store changed the directory's mtime again, but not the report files the catalog lists
+            catalog.directory_mtime = store.directory_mtime
+
+    def save_report(self, section: str, date: str, names: list[str]) -> None:
+        """Saves the students who attended on the date, replacing any earlier report for it."""
+        self.save_reports(section, {date: names})
+
+    def frequency(self, section: str, start_date: datetime.date = None, end_date: datetime.date = None) -> dict[str, int]:
+        """Returns the number of reports each student appears in, optionally only counting reports from start_date to end_date."""
+        with self.lock:
+            if not os.path.exists(f"reports/{section}"):
+                return {}
+            # The tallies are read straight from the store: its reports are only compared with the report files (and the tallies
+            # updated by the difference) if the report directory has changed since they last were, so counting takes O(roster) time
+            store = self.store(section)
+            if start_date is None and end_date is None:
+                return store.frequency()
+            return store.frequency(self.report_dates(section, start_date, end_date))
+
+class SQLiteBackend:
+    """
+    Keeps every section's roster and reports in one SQLite database.
+    Each call runs in a single transaction, so saving a report replaces its attendance all at once,
+    and frequency reports are a single GROUP BY query. A roster's version is a counter bumped whenever it is written.
+    The connection is shared with the name matching and report writer threads (behind a lock) and reopened in forked worker processes.
+    The lock is reentrant, so a caller can hold it across several calls to read them as of the same moment.
+    """
+
+    def __init__(self, database: str = DATABASE_PATH) -> None:
+        self.database = database
+        self.connection = None
+        self.pid = None
+        self.lock = threading.RLock()
+
+    @contextmanager
+    def transaction(self):
+        """Yields the connection inside a transaction that is committed on success and rolled back on error."""
+        with self.lock:
+            if self.connection is None or self.pid != os.getpid():
+                # Imported here so that sqlite3 is only imported when the sqlite backend is used
+                import sqlite3
+                self.connection = sqlite3.connect(self.database, check_same_thread=False)
+                self.connection.execute("PRAGMA foreign_keys = ON")
+                self.connection.executescript(SCHEMA)
+                # Databases created before the marking order was kept get the column, and their reports read back in roster order
+                if "position" not in [column[1] for column in self.connection.execute("PRAGMA table_info(attendance)")]:
+                    self.connection.execute("ALTER TABLE attendance ADD COLUMN position INTEGER")
+                self.pid = os.getpid()
+            with self.connection:
+                yield self.connection
+
+    def section_id(self, connection: "sqlite3.Connection", section: str) -> int:
+        """Returns the id of the section, adding it if it is not in the database yet."""
+        connection.execute("INSERT OR IGNORE INTO sections (name) VALUES (?)", (section,))
+        return connection.execute("SELECT id FROM sections WHERE name = ?", (section,)).fetchone()[0]
+
+    def list_sections(self) -> dict[str, int]:
+        """Returns every section that has a roster, mapped to a version that changes whenever its roster does."""
+        with self.transaction() as connection:
+            return dict(connection.execute("SELECT name, roster_version FROM sections WHERE roster_version IS NOT NULL ORDER BY name"))
+
+    def read_roster(self, section: str) -> list[str]:
+        """Returns the section's students in roster order."""
+        with self.transaction() as connection:
+            rows = connection.execute(
+                "SELECT students.name FROM students JOIN sections ON sections.id = students.section_id "
+                "WHERE sections.name = ? AND students.position IS NOT NULL ORDER BY students.position", (section,))
+            return [name for (name,) in rows]
+
+    def write_roster(self, section: str, names: list[str]) -> int:
+        """Replaces the section's roster and returns its new version."""
+        with self.transaction() as connection:
+            section_id = self.section_id(connection, section)
+            # Students who are no longer on the roster keep their attendance, but without a position
+            connection.execute("UPDATE students SET position = NULL WHERE section_id = ?", (section_id,))
+            connection.executemany(
+                "INSERT INTO students (section_id, name, position) VALUES (?, ?, ?) "
+                "ON CONFLICT (section_id, name) DO UPDATE SET position = excluded.position",
+                ((section_id, name, position) for position, name in enumerate(names)))
+            connection.execute("UPDATE sections SET roster_version = COALESCE(roster_version, 0) + 1 WHERE id = ?", (section_id,))
+            return connection.execute("SELECT roster_version FROM sections WHERE id = ?", (section_id,)).fetchone()[0]
+
+    def delete_roster(self, section: str) -> None:
+        """Removes the section's roster, keeping its attendance reports."""
+        with self.transaction() as connection:
+            connection.execute("UPDATE students SET position = NULL WHERE section_id = (SELECT id FROM sections WHERE name = ?)", (section,))
+            connection.execute("UPDATE sections SET roster_version = NULL WHERE name = ?", (section,))
+
+    def report_dates(self, section: str, start_date: datetime.date = None, end_date: datetime.date = None) -> list[str]:
+        """Returns the dates of the section's reports, oldest first, optionally only those from start_date to end_date (inclusive)."""
+        query = "SELECT date FROM sessions WHERE section_id = (SELECT id FROM sections WHERE name = ?)"
+        parameters = [section]
+        if start_date is not None or end_date is not None:
+            # Reports that are not named by a date have a NULL day, so they are left out of any range
+            query += " AND day BETWEEN ? AND ?"
+            parameters += [start_date.toordinal() if start_date else 0, end_date.toordinal() if end_date else datetime.date.max.toordinal()]
+        with self.transaction() as connection:
+            return [date for (date,) in connection.execute(query + " ORDER BY day IS NULL, day, date", parameters)]
+
+    def read_report(self, section: str, date: str) -> list[str]:
+        """Returns the students who attended on the date, in the order they were marked, or None if there is no report for the date."""
+        with self.transaction() as connection:
+            session = connection.execute(
+                "SELECT sessions.id FROM sessions JOIN sections ON sections.id = sessions.section_id "
+                "WHERE sections.name = ? AND sessions.date = ?", (section, date)).fetchone()
+            if session is None:
+                return None
+            rows = connection.execute(
+                "SELECT students.name FROM attendance JOIN students ON students.id = attendance.student_id "
+                "WHERE attendance.session_id = ? ORDER BY attendance.position IS NULL, attendance.position, "
+                "students.position IS NULL, students.position, students.id", session)
+            return [name for (name,) in rows]
+
+    def read_reports(self, section: str) -> dict[str, list[str]]:
+        """Returns every report of the section (date -> students who attended, in the order they were marked), oldest first."""
+        return {date: self.read_report(section, date) for date in self.report_dates(section)}
+
+    def save_reports(self, section: str, reports: dict[str, list[str]]) -> None:
+        """Saves several reports at once (date -> students who attended) in a single transaction."""
+        with self.transaction() as connection:
+            section_id = self.section_id(connection, section)
+            for date, names in reports.items():
+                day = report_key(date)
+                connection.execute("INSERT OR IGNORE INTO sessions (section_id, date, day) VALUES (?, ?, ?)",
+                                   (section_id, date, day if day != UNDATED_KEY else None))
+                session_id = connection.execute("SELECT id FROM sessions WHERE section_id = ? AND date = ?", (section_id, date)).fetchone()[0]
+                connection.execute("DELETE FROM attendance WHERE session_id = ?", (session_id,))
+                # Anyone who is not on the roster (e.g. added to the class late) is added to the section without a position
+                connection.executemany("INSERT OR IGNORE INTO students (section_id, name) VALUES (?, ?)", ((section_id, name) for name in names))
+                # A name listed twice keeps its first position, as it does in the text backend's store
+                connection.executemany(
+                    "INSERT OR IGNORE INTO attendance (session_id, student_id, position) SELECT ?, id, ? FROM students WHERE section_id = ? AND name = ?",
+                    ((session_id, position, section_id, name) for position, name in enumerate(names)))
+
+    def save_report(self, section: str, date: str, names: list[str]) -> None:
+        """Saves the students who attended on the date, replacing any earlier report for it."""
+        self.save_reports(section, {date: names})
+
+    def frequency(self, section: str, start_date: datetime.date = None, end_date: datetime.date = None) -> dict[str, int]:
+        """Returns the number of reports each student appears in, optionally only counting reports from start_date to end_date."""
+        query = ("SELECT students.name, COUNT(*) FROM attendance "
+                 "JOIN sessions ON sessions.id = attendance.session_id "
+                 "JOIN students ON students.id = attendance.student_id "
+                 "WHERE sessions.section_id = (SELECT id FROM sections WHERE name = ?)")
+        parameters = [section]
+        if start_date is not None or end_date is not None:
+            query += " AND sessions.day BETWEEN ? AND ?"
+            parameters += [start_date.toordinal() if start_date else 0, end_date.toordinal() if end_date else datetime.date.max.toordinal()]
+        with self.transaction() as connection:
+            return dict(connection.execute(query + " GROUP BY attendance.student_id", parameters))
+
+# Backend that the GUI modules read and write through
+storage = TextBackend()
+
+# Function to choose the storage backend
+def set_storage_backend(backend: str, roster_dir: str = ROSTER_DIR, database: str = DATABASE_PATH) -> None:
+    """Sets the backend returned by get_storage, either "text" (using roster_dir) or "sqlite" (using database)."""
+    global storage
+    if backend == "text":
+        storage = TextBackend(roster_dir)
+    elif backend == "sqlite":
+        storage = SQLiteBackend(database)
+    else:
+        raise ValueError(f"Unknown storage backend: {backend}")
+
+# Function to get the storage backend
+def get_storage():
+    """Returns the backend that rosters and reports are read from and written to."""
+    return storage
+
+# Function to copy the text rosters and reports into a database
+def migrate_text_to_sqlite(roster_dir: str = ROSTER_DIR, database: str = DATABASE_PATH) -> tuple[int, int]:
+    """
+    Copies every roster under roster_dir and every report under reports/ into the database, one transaction per section.
+    Migrating again replaces the rosters and reports already in the database with the ones on disk.
+    Returns the number of (rosters, reports) copied.
+    """
+    text = TextBackend(roster_dir)
+    sqlite = SQLiteBackend(database)
+    rosters = text.list_sections()
+    for section in rosters:
+        sqlite.write_roster(section, text.read_roster(section))
+
+    reports = 0
+    if os.path.exists("reports"):
+        with os.scandir("reports") as entries:
+            for entry in entries:
+                if entry.is_dir():
+                    section_reports = text.store(entry.name).as_reports()
+                    sqlite.save_reports(entry.name, section_reports)
+                    reports += len(section_reports)
+    return len(rosters), reports
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Manage where the rosters and attendance reports are stored.")
+    parser.add_argument("command", choices=["migrate"], help="copy the text rosters and reports into an SQLite database")
+    parser.add_argument("--roster-dir", default=ROSTER_DIR, help="directory containing the roster files (defaults to rosters)")
+    parser.add_argument("--database", default=DATABASE_PATH, help="database file to migrate into (defaults to attendance.db)")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    rosters, reports = migrate_text_to_sqlite(args.roster_dir, args.database)
+    print(f"Migrated {rosters} rosters and {reports} reports into {args.database} in {time.perf_counter() - start:.2f} s")
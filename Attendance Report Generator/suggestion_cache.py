@@ -0,0 +1,82 @@
+# Import modules from the standard library
+from collections import OrderedDict
+import sys
+import threading
+
+# Default number of queries kept, and the default cap on their approximate memory use
+MAX_ENTRIES = 2048
+MAX_BYTES = 8 * 2**20
+
+class SuggestionCache:
+    """
+    Suggestions that have already been computed, keyed by (section, normalized query), with least recently used eviction.
+    Each entry remembers the roster list it was computed from; RosterCache replaces that list whenever the roster's version changes,
+    so an entry is only a hit for the same version of the roster, and invalidate() drops a section's entries as soon as it changes.
+    The cache is bounded both by its number of entries and by the approximate memory of their suggestion lists
+    (the names themselves are shared with the roster, so only the lists and keys are counted).
+    It is shared between the Tk main loop and the matching service's worker thread, so every operation takes a lock.
+    """
+
+    def __init__(self, max_entries: int = MAX_ENTRIES, max_bytes: int = MAX_BYTES) -> None:
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()  # (section, query) -> (roster list, suggestions, approximate bytes)
+        self.bytes = 0
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, section: str, query: str, student_list: list[str]) -> list[str]:
+        """Returns a copy of the cached suggestions for the query against this roster list, or None if they are not cached."""
+        with self.lock:
+            entry = self.entries.get((section, query))
+            if entry is None or entry[0] is not student_list:
+                self.misses += 1
+                return None
+            self.entries.move_to_end((section, query))
+            self.hits += 1
+            return list(entry[1])
+
+    def put(self, section: str, query: str, student_list: list[str], suggestions: list[str]) -> None:
+        """Caches the suggestions, evicting the least recently used entries until the cache is back within its caps."""
+        size = sys.getsizeof(suggestions) + sys.getsizeof(query)
+        if size > self.max_bytes:
+            return
+        with self.lock:
+            old = self.entries.pop((section, query), None)
+            if old is not None:
+                self.bytes -= old[2]
+            self.entries[(section, query)] = (student_list, list(suggestions), size)
+            self.bytes += size
+            while len(self.entries) > self.max_entries or self.bytes > self.max_bytes:
+                _, (_, _, evicted_size) = self.entries.popitem(last=False)
+                self.bytes -= evicted_size
+                self.evictions += 1
+
+    def invalidate(self, section: str) -> None:
+        """Drops every cached query of a section, e.g. because its roster was replaced or removed."""
+        with self.lock:
+            for key in [key for key in self.entries if key[0] == section]:
+                self.bytes -= self.entries.pop(key)[2]
+
+    def clear(self) -> None:
+        """Drops every cached query, e.g. because the way names are scored has changed."""
+        with self.lock:
+            self.entries.clear()
+            self.bytes = 0
+
+    def stats(self) -> dict:
+        """Returns the hits, misses, and evictions so far, and the current number of entries and their approximate memory."""
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+                "evictions": self.evictions,
+                "entries": len(self.entries),
+                "bytes": self.bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+            }
@@ -0,0 +1,96 @@
+# Import modules from the standard library
+import tkinter as tk
+import time
+
+# Import functions from local modules
+from name_suggestion import suggest_names, update_suggestion_listbox
+from matching_service import MatchingService
+
+# Default number of milliseconds to wait after the last keystroke before scoring the query
+DEBOUNCE_MS = 150
+
+class SuggestionEngine:
+    """
+    Drives the suggestion listbox from the name entry's <KeyRelease> events.
+    - Keystrokes are debounced: each one cancels the pending query and schedules a new one debounce_ms later,
+      so a burst of typing only scores the final query.
+    - A query that extends the previous one is scored like any other, through the suggestion cache and indexes:
+      a longer query can rank a name above the previous suggestions that was not among them, so rescoring only those could differ.
+    - The listbox is updated with the difference between its current rows and the new suggestions.
+    - The time from the first keystroke of a burst to the listbox being painted is recorded in the latency counters.
+    - If a matching service is given, the scoring runs on its worker thread and the listbox is updated when the results arrive.
+    """
+
+    def __init__(self, name_entry: tk.Entry, section_var: tk.StringVar, students: dict, suggestion_listbox: tk.Listbox, debounce_ms: int = DEBOUNCE_MS, matching_service: MatchingService = None) -> None:
+        self.name_entry = name_entry
+        self.section_var = section_var
+        self.students = students
+        self.suggestion_listbox = suggestion_listbox
+        self.debounce_ms = debounce_ms
+        self.matching_service = matching_service
+
+        # The pending after() callback and the time of the first keystroke it covers
+        self.pending_id = None
+        self.first_keystroke_time = None
+
+        # Latency counters (keystroke to paint)
+        self.keystrokes = 0
+        self.queries_run = 0
+        self.queries_cancelled = 0
+        self.latency_total_ms = 0.0
+        self.latency_max_ms = 0.0
+        self.latency_last_ms = 0.0
+
+    def on_key_release(self, event: tk.Event = None) -> None:
+        """Schedules the query in the name entry, cancelling the query that is still waiting to run."""
+        self.keystrokes += 1
+        if self.pending_id is not None:
+            self.name_entry.after_cancel(self.pending_id)
+            self.queries_cancelled += 1
+        else:
+            self.first_keystroke_time = time.perf_counter()
+        self.pending_id = self.name_entry.after(self.debounce_ms, self.run_query)
+
+    def run_query(self) -> None:
+        """Scores the current query and updates the suggestion listbox."""
+        self.pending_id = None
+        section = self.section_var.get()
+        # Ignore if no selection has been made
+        if section == "" or section == "Select a section..." or section not in self.students:
+            return
+
+        query = self.name_entry.get()
+        if self.matching_service is not None:
+            self.matching_service.submit(query, section, self.show_suggestions)
+        else:
+            self.show_suggestions(suggest_names(query, section, self.students))
+
+    def show_suggestions(self, suggestions: list[str]) -> None:
+        """Paints the suggestions for the latest query."""
+        self.queries_run += 1
+
+        update_suggestion_listbox(self.suggestion_listbox, suggestions)
+        self.record_latency()
+
+    def record_latency(self) -> None:
+        """Records the time between the first keystroke of the burst and the listbox being painted."""
+        if self.first_keystroke_time is None:
+            return
+        # Let Tk paint the listbox so the measurement covers the whole keystroke-to-paint path
+        self.suggestion_listbox.update_idletasks()
+        latency_ms = (time.perf_counter() - self.first_keystroke_time) * 1000
+        self.first_keystroke_time = None
+        self.latency_last_ms = latency_ms
+        self.latency_total_ms += latency_ms
+        self.latency_max_ms = max(self.latency_max_ms, latency_ms)
+
+    def latency_stats(self) -> dict[str, float]:
+        """Returns the latency counters collected since the engine was created."""
+        return {
+            "keystrokes": self.keystrokes,
+            "queries_run": self.queries_run,
+            "queries_cancelled": self.queries_cancelled,
+            "latency_last_ms": self.latency_last_ms,
+            "latency_max_ms": self.latency_max_ms,
+            "latency_mean_ms": self.latency_total_ms / self.queries_run if self.queries_run else 0.0,
+        }
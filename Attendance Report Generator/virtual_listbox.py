@@ -0,0 +1,201 @@
+# Import modules from the standard library
+import tkinter as tk
+from itertools import islice
+from typing import Iterable
+
+# Rows rendered above and below the visible ones, so that short scrolls do not have to re-render the listbox
+OVERSCAN = 10
+
+class VirtualListbox(tk.Frame):
+    """
+    A listbox for lists of any length that only ever holds the visible rows (plus OVERSCAN rows on each side) in its Tk widget.
+    The full list lives in Python: set_items() takes a list or any iterator of ranked results, which is only pulled from
+    as the user scrolls towards its end, and a scrollbar drives which window of rows is rendered.
+    It has the parts of the tk.Listbox interface the app uses (get, insert, delete, index, see, activate, size, bind), with indexes
+    into the full list and tk.ACTIVE and tk.END accepted as usual, so it is a drop-in replacement for the app's listboxes.
+    Changes are rendered once the Tk event loop is idle, so a burst of inserts or deletes only re-renders the window once.
+    """
+
+    def __init__(self, master, height: int = 10, overscan: int = OVERSCAN, **listbox_options) -> None:
+        super().__init__(master)
+        self.height = height
+        self.overscan = overscan
+        self.listbox = tk.Listbox(self, height=height, activestyle="dotbox", exportselection=False, **listbox_options)
+        self.scrollbar = tk.Scrollbar(self, orient=tk.VERTICAL, command=self.yview)
+        self.listbox.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+
+        self.items = []  # Rows pulled from the source so far
+        self.source = None  # Iterator with the rest of the rows, or None once it is exhausted
+        self.offset = 0  # Row shown at the top
+        self.active = 0  # Row that tk.ACTIVE refers to
+        self.rendered_start = 0  # First row held by the Tk listbox
+        self.rendered_count = 0  # Number of rows held by the Tk listbox
+        self.render_pending = None
+        self.renders = 0
+
+        # Scrolling and moving the active row are handled here, since the Tk listbox only holds a window of the rows
+        for sequence, rows in [("<Up>", -1), ("<Down>", 1), ("<Prior>", -height), ("<Next>", height)]:
+            self.listbox.bind(sequence, lambda event, rows=rows: self.move_active(rows))
+        self.listbox.bind("<Home>", lambda event: self.move_active(-self.active))
+        self.listbox.bind("<End>", lambda event: self.move_active(self.size()))
+        self.listbox.bind("<MouseWheel>", lambda event: self.scroll(-1 if event.delta > 0 else 1, "units"))
+        self.listbox.bind("<Button-4>", lambda event: self.scroll(-1, "units"))
+        self.listbox.bind("<Button-5>", lambda event: self.scroll(1, "units"))
+        self.listbox.bind("<ButtonRelease-1>", self.on_click, add="+")
+
+    # Keyboard and mouse bindings (like <Return>) go to the Tk listbox, which is the part that takes focus
+    def bind(self, sequence: str = None, func=None, add: str = None):
+        return self.listbox.bind(sequence, func, add)
+
+    def focus_set(self) -> None:
+        self.listbox.focus_set()
+
+    def set_items(self, items: Iterable[str]) -> None:
+        """Replaces every row. A list is copied, and any other iterable is only consumed as far as the user scrolls."""
+        if isinstance(items, list):
+            self.items, self.source = list(items), None
+        else:
+            self.items, self.source = [], iter(items)
+        self.offset = 0
+        self.active = 0
+        self.render()
+
+    def pull(self, count: int) -> None:
+        """Makes sure the first count rows have been pulled from the source."""
+        if self.source is not None and len(self.items) < count:
+            self.items.extend(islice(self.source, count - len(self.items)))
+            if len(self.items) < count:
+                self.source = None
+
+    def resolve(self, index) -> int:
+        """Turns a Listbox index (a row number, tk.ACTIVE, or tk.END) into a row number."""
+        if index == tk.ACTIVE:
+            return self.active
+        if index == tk.END:
+            self.pull(float("inf"))
+            return len(self.items)
+        return int(index)
+
+    def size(self) -> int:
+        """Returns the number of rows (pulling every row from the source)."""
+        self.pull(float("inf"))
+        return len(self.items)
+
+    def get(self, first, last=None):
+        """Returns the row at first, or a tuple of the rows from first to last (inclusive), like tk.Listbox.get."""
+        start = self.resolve(first)
+        if last is None:
+            self.pull(start + 1)
+            return self.items[start] if 0 <= start < len(self.items) else ""
+        end = self.resolve(last)
+        self.pull(end + 1)
+        return tuple(self.items[start:end + 1])
+
+    def index(self, index) -> int:
+        return self.resolve(index)
+
+    def insert(self, index, *names: str) -> None:
+        index = self.resolve(index)
+        self.pull(index)
+        # Rows inserted above the active row push it down, as they do in a tk.Listbox
+        if index <= self.active < len(self.items):
+            self.active += len(names)
+        self.items[index:index] = names
+        self.schedule_render()
+
+    def delete(self, first, last=None) -> None:
+        start = self.resolve(first)
+        end = start if last is None else self.resolve(last)
+        # tk.END as the last index means "through the last row"
+        end = min(end, len(self.items) - 1)
+        if end < start:
+            return
+        del self.items[start:end + 1]
+        if self.active > end:
+            self.active -= end - start + 1
+        self.active = max(0, min(self.active, len(self.items) - 1))
+        self.offset = max(0, min(self.offset, len(self.items) - self.height))
+        self.schedule_render()
+
+    def activate(self, index) -> None:
+        self.active = max(0, min(self.resolve(index), self.size() - 1))
+        self.schedule_render()
+
+    def see(self, index) -> None:
+        """Scrolls so that the row is visible."""
+        row = self.resolve(index)
+        if index == tk.END:
+            row -= 1
+        if row < self.offset:
+            self.offset = max(0, row)
+        elif row >= self.offset + self.height:
+            self.offset = row - self.height + 1
+        self.render()
+
+    def curselection(self) -> tuple:
+        return (self.active,) if 0 <= self.active < len(self.items) else ()
+
+    def selection_set(self, first, last=None) -> None:
+        self.activate(first)
+
+    def move_active(self, rows: int) -> str:
+        """Moves the active row by the given number of rows, scrolling to keep it visible."""
+        self.pull(self.active + rows + 1)
+        if self.items:
+            self.active = max(0, min(self.active + rows, len(self.items) - 1))
+            self.see(self.active)
+        return "break"
+
+    def on_click(self, event: tk.Event) -> None:
+        """Makes the clicked row the active one."""
+        clicked = self.listbox.nearest(event.y)
+        if 0 <= clicked < self.rendered_count:
+            self.active = self.rendered_start + clicked
+
+    def scroll(self, amount: int, what: str) -> str:
+        """Scrolls by rows ("units") or by screens ("pages")."""
+        rows = int(amount) * (self.height if what == "pages" else 1)
+        self.pull(self.offset + rows + self.height + self.overscan)
+        self.offset = max(0, min(self.offset + rows, len(self.items) - self.height))
+        self.render()
+        return "break"
+
+    def yview(self, *args) -> None:
+        """Handles the scrollbar's commands: ("moveto", fraction) and ("scroll", amount, "units" | "pages")."""
+        if args and args[0] == "moveto":
+            # Dragging to the end of a list that is still being pulled pulls another window of rows
+            self.pull(self.offset + 2 * (self.height + self.overscan))
+            self.offset = max(0, min(int(float(args[1]) * len(self.items)), len(self.items) - self.height))
+            self.render()
+        elif args and args[0] == "scroll":
+            self.scroll(int(args[1]), args[2])
+
+    def schedule_render(self) -> None:
+        """Renders once the event loop is idle, so that several changes in a row are rendered together."""
+        if self.render_pending is None:
+            self.render_pending = self.after_idle(self.render)
+
+    def render(self) -> None:
+        """Puts the visible rows, plus the overscan on either side, into the Tk listbox, and updates the scrollbar."""
+        if self.render_pending is not None:
+            self.after_cancel(self.render_pending)
+            self.render_pending = None
+        self.pull(self.offset + self.height + self.overscan)
+        self.offset = max(0, min(self.offset, len(self.items) - self.height))
+        start = max(0, self.offset - self.overscan)
+        rows = self.items[start:self.offset + self.height + self.overscan]
+
+        self.listbox.delete(0, tk.END)
+        if rows:
+            self.listbox.insert(tk.END, *rows)
+        self.listbox.yview(self.offset - start)
+        self.rendered_start, self.rendered_count = start, len(rows)
+        if start <= self.active < start + len(rows):
+            self.listbox.activate(self.active - start)
+            self.listbox.selection_set(self.active - start)
+        self.renders += 1
+
+        # While rows are still being pulled, the scrollbar treats the rows pulled so far (plus a window) as the whole list
+        total = max(len(self.items) + (self.height if self.source is not None else 0), 1)
+        self.scrollbar.set(self.offset / total, min((self.offset + self.height) / total, 1))